@@ -24,25 +24,45 @@ Usage:
 """
 
 import argparse
+import asyncio
 import concurrent.futures as cf
+import contextlib
 import difflib
 import hashlib
+import http.server
+import importlib.metadata
+import itertools
 import json
 import logging
 import os
 from pathlib import Path
+import mmap
 import re
+import sqlite3
+import struct
 import sys
+import threading
 import time
+import zlib
+from array import array
+from collections import OrderedDict, deque
 from functools import lru_cache
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
 
 import requests
 import torch
-from transformers import AutoModelForMaskedLM, AutoTokenizer, pipeline
+from transformers import (AutoConfig, AutoModelForMaskedLM, AutoModelForTokenClassification, AutoTokenizer,
+                          pipeline)
 
 # Constants
-API_BASE = "https://clarino.uib.no/ordbank-api-prod"
+API_BASE = os.getenv("ORDBANK_API_BASE", "https://clarino.uib.no/ordbank-api-prod")
+POS_MODEL = os.getenv("ALTMORPH_POS_MODEL", "NbAiLab/nb-bert-base-pos")
+MLM_MODEL = os.getenv("ALTMORPH_MLM_MODEL", "NbAiLab/nb-bert-base")
+POS_BACKEND = os.getenv("ALTMORPH_POS_BACKEND", "bert")
+SPACY_MODEL = os.getenv("ALTMORPH_SPACY_MODEL", "nb_core_news_lg")
+# Subword tokens of context kept on each side of the mask when scoring; 0 keeps
+# as much as the model accepts
+MLM_CONTEXT_WINDOW = int(os.getenv("ALTMORPH_MLM_CONTEXT_WINDOW", "64"))
 SESSION = requests.Session()
 
 logger = logging.getLogger(__name__)
@@ -50,7 +70,483 @@ logger = logging.getLogger(__name__)
 # Global cache configuration
 _cache_enabled = True
 _cache_dir = Path.home() / ".ordbank_cache"
-_cache_stats = {"hits": 0, "misses": 0}
+
+# Optional local lexicon replacing the Ordbank API (see set_lexicon)
+_lexicon = None
+
+# Optional precompiled get_alternatives results (see set_alternatives_table)
+_alternatives_table = None
+
+# POS backend (name, model, options) used when no tagger is given (see set_pos_backend)
+_pos_backend = (POS_BACKEND, None, ())
+
+# In-process paradigm index per (lemma_id, lang), filled by get_paradigm
+_paradigm_cache = {}
+
+# In-process unfiltered resolutions per (word, lang, POS), filled by resolve_alternatives
+_resolution_cache = {}
+
+# Optional stage profiler and trace recorder (see set_profiler, set_tracer);
+# with both None, instrumentation is off
+_profiler = None
+_tracer = None
+
+
+# ========================= Profiling =========================
+
+class _NullStage:
+    """Stage context used when profiling is off; does nothing."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add(self, items: int):
+        pass
+
+    def annotate(self, **args):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    """Times one stage occurrence and reports it to the profiler and tracer on exit."""
+    __slots__ = ("profiler", "tracer", "name", "items", "args", "start")
+
+    def __init__(self, profiler, tracer, name: str, items: int, args: Optional[Dict] = None):
+        self.profiler = profiler
+        self.tracer = tracer
+        self.name = name
+        self.items = items
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        if self.profiler is not None:
+            self.profiler.record(self.name, end - self.start, self.items)
+        if self.tracer is not None:
+            args = self.args or {}
+            if self.items:
+                args["items"] = self.items
+            self.tracer.complete(self.name, self.start, end, args)
+        return False
+
+    def add(self, items: int):
+        """Count items processed in this stage (words, sentences, ...)."""
+        self.items += items
+
+    def annotate(self, **args):
+        """Attach details (cache hit, HTTP status, ...) to the trace event."""
+        if self.args is None:
+            self.args = args
+        else:
+            self.args.update(args)
+
+
+class StageProfiler:
+    """Accumulates wall time, calls and items per pipeline stage.
+    
+    Totals are kept for the whole run and for each batch started with
+    ``profile_batch``. Stages run inside worker threads (cache_read, http, ...)
+    report summed thread time, and stages nest (http runs inside lookup),
+    so stage times do not add up to the batch time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.totals = {}
+        self.batches = []
+        self._batch = None
+        self.started = time.perf_counter()
+
+    def record(self, name: str, seconds: float, items: int = 0):
+        with self._lock:
+            entry = self.totals.get(name)
+            if entry is None:
+                entry = self.totals[name] = [0.0, 0, 0]
+            entry[0] += seconds
+            entry[1] += 1
+            entry[2] += items
+            if self._batch is not None:
+                stages = self._batch["stages"]
+                stages[name] = stages.get(name, 0.0) + seconds
+
+    def start_batch(self, sentences: int):
+        with self._lock:
+            self._batch = {"batch": len(self.batches), "sentences": sentences,
+                           "stages": {}, "start": time.perf_counter()}
+
+    def end_batch(self):
+        with self._lock:
+            batch, self._batch = self._batch, None
+            if batch is None:
+                return
+            batch["seconds"] = round(time.perf_counter() - batch.pop("start"), 6)
+            batch["stages"] = {name: round(seconds, 6) for name, seconds in batch["stages"].items()}
+            self.batches.append(batch)
+
+    def report(self) -> Dict:
+        """Profile as a JSON-serializable dict."""
+        with self._lock:
+            stages = {
+                name: {"seconds": round(seconds, 6), "calls": calls, "items": items,
+                       "ms_per_call": round(seconds * 1000 / calls, 3) if calls else 0.0}
+                for name, (seconds, calls, items) in sorted(self.totals.items())
+            }
+            return {
+                "elapsed_seconds": round(time.perf_counter() - self.started, 6),
+                "stages": stages,
+                "batches": list(self.batches),
+            }
+
+    def summary_table(self) -> str:
+        """Per-stage totals as a fixed-width table."""
+        report = self.report()
+        lines = [f"{'stage':<14}{'seconds':>10}{'calls':>9}{'items':>9}{'ms/call':>10}"]
+        for name, entry in sorted(report["stages"].items(), key=lambda item: -item[1]["seconds"]):
+            lines.append(f"{name:<14}{entry['seconds']:>10.3f}{entry['calls']:>9}"
+                         f"{entry['items']:>9}{entry['ms_per_call']:>10.2f}")
+        lines.append(f"{'elapsed':<14}{report['elapsed_seconds']:>10.3f}")
+        return "\n".join(lines)
+
+    def write_report(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+
+
+class TraceRecorder:
+    """Collects spans as Chrome Trace Event JSON (chrome://tracing, Perfetto).
+    
+    Every stage becomes a complete ("X") event on the thread that ran it, so
+    lookups in the worker pool, HTTP retries and BERT forwards line up on one
+    timeline. Events are kept in memory until ``write`` is called.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.events = []
+        self._threads = set()
+        self.pid = os.getpid()
+        self.origin = time.perf_counter()
+
+    def complete(self, name: str, start: float, end: float, args: Optional[Dict] = None):
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            with self._lock:
+                self._threads.add(tid)
+                self.events.append({
+                    "name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid,
+                    "args": {"name": threading.current_thread().name},
+                })
+        event = {
+            "name": name, "cat": "altmorph", "ph": "X", "pid": self.pid, "tid": tid,
+            "ts": round((start - self.origin) * 1e6, 3),
+            "dur": round((end - start) * 1e6, 3),
+        }
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def write(self, path: str):
+        with self._lock:
+            events = list(self.events)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False, default=str)
+
+
+class _BatchScope:
+    """Marks a batch boundary for the active profiler and tracer."""
+    __slots__ = ("profiler", "span", "sentences")
+
+    def __init__(self, profiler, tracer, sentences: int):
+        self.profiler = profiler
+        self.span = _Stage(None, tracer, "batch", sentences) if tracer is not None else _NULL_STAGE
+        self.sentences = sentences
+
+    def __enter__(self):
+        if self.profiler is not None:
+            self.profiler.start_batch(self.sentences)
+        self.span.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        self.span.__exit__(*exc)
+        if self.profiler is not None:
+            self.profiler.end_batch()
+        return False
+
+
+def set_profiler(profiler: Optional[StageProfiler]):
+    """Enable stage profiling with ``profiler``, or disable it with None."""
+    global _profiler
+    _profiler = profiler
+
+
+def get_profiler() -> Optional[StageProfiler]:
+    """Return the active stage profiler, if any."""
+    return _profiler
+
+
+def set_tracer(tracer: Optional[TraceRecorder]):
+    """Record trace spans with ``tracer``, or stop tracing with None."""
+    global _tracer
+    _tracer = tracer
+
+
+def get_tracer() -> Optional[TraceRecorder]:
+    """Return the active trace recorder, if any."""
+    return _tracer
+
+
+def profile_stage(name: str, items: int = 0):
+    """Context manager timing a stage; a shared no-op when instrumentation is off."""
+    profiler, tracer = _profiler, _tracer
+    if profiler is None and tracer is None:
+        return _NULL_STAGE
+    return _Stage(profiler, tracer, name, items)
+
+
+def trace_span(name: str, **args):
+    """Context manager for a trace-only span (not counted as a profiler stage)."""
+    tracer = _tracer
+    if tracer is None:
+        return _NULL_STAGE
+    return _Stage(None, tracer, name, 0, args)
+
+
+def profile_batch(sentences: int):
+    """Context manager grouping stages into one batch of the profile and trace."""
+    profiler, tracer = _profiler, _tracer
+    if profiler is None and tracer is None:
+        return _NULL_STAGE
+    return _BatchScope(profiler, tracer, sentences)
+
+
+# ========================= Metrics =========================
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    escaped = []
+    for name, value in labels:
+        value = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        escaped.append(f'{name}="{value}"')
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[Tuple[str, str], ...]:
+        return tuple((name, str(labels[name])) for name in self.labelnames)
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        """Value for one label set; sums over all label sets when none are given."""
+        with self._lock:
+            if labels or not self.labelnames:
+                return self._values.get(self._key(labels), 0)
+            return sum(self._values.values())
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, value) for key, value in sorted(self._values.items())]
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {",".join(f"{n}={v}" for n, v in key) or "": value
+                    for key, value in sorted(self._values.items())}
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels."""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...],
+                 labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple((name, str(labels[name])) for name in self.labelnames)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            counts = entry[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    samples.append((f"{self.name}_bucket", key + (("le", _format_value(bound)),), cumulative))
+                samples.append((f"{self.name}_sum", key, total))
+                samples.append((f"{self.name}_count", key, count))
+        return samples
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {",".join(f"{n}={v}" for n, v in key) or "": {
+                        "count": count, "sum": round(total, 6),
+                        "mean": round(total / count, 6) if count else 0.0}
+                    for key, (counts, total, count) in sorted(self._values.items())}
+
+
+class MetricsRegistry:
+    """Thread-safe collection of counters and histograms, exportable as Prometheus text."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, buckets: Tuple[float, ...],
+                  labelnames: Tuple[str, ...] = ()) -> Histogram:
+        return self._register(Histogram(name, help, buckets, labelnames))
+
+    def reset(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict:
+        """All metric values as a JSON-serializable dict."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+    def write_prometheus(self, path: str):
+        """Write the metrics atomically, e.g. for the node_exporter textfile collector."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+
+METRICS = MetricsRegistry()
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+RATIO_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.8, 1.0)
+
+CACHE_HITS = METRICS.counter("altmorph_cache_hits_total", "Ordbank cache hits", ("kind",))
+CACHE_MISSES = METRICS.counter("altmorph_cache_misses_total", "Ordbank cache misses", ("kind",))
+HTTP_REQUESTS = METRICS.counter("altmorph_http_requests_total",
+                                "Ordbank HTTP request attempts by status", ("status",))
+HTTP_LATENCY = METRICS.histogram("altmorph_http_request_seconds",
+                                 "Ordbank HTTP request attempt latency", LATENCY_BUCKETS)
+MLM_BATCH_SIZE = METRICS.histogram("altmorph_mlm_batch_size",
+                                   "Masked sentences per BERT forward pass", BATCH_SIZE_BUCKETS)
+MLM_PADDING_RATIO = METRICS.histogram("altmorph_mlm_padding_ratio",
+                                      "Share of padding tokens per BERT forward pass", RATIO_BUCKETS)
+MLM_FORWARD_LATENCY = METRICS.histogram("altmorph_mlm_forward_seconds",
+                                        "BERT forward pass latency", LATENCY_BUCKETS)
+SENTENCES_PROCESSED = METRICS.counter("altmorph_sentences_processed_total", "Sentences processed")
+ALTERNATIVES = METRICS.counter("altmorph_alternatives_total",
+                               "Scored alternatives by acceptability decision", ("decision",))
+SENTENCE_CACHE_LOOKUPS = METRICS.counter("altmorph_sentence_cache_lookups_total",
+                                         "Sentence cache lookups by result (memory, disk, batch, miss)",
+                                         ("result",))
+
+
+class _MetricsHandler(http.server.BaseHTTPRequestHandler):
+    registry = METRICS
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.registry.to_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1",
+                         registry: Optional[MetricsRegistry] = None) -> http.server.ThreadingHTTPServer:
+    """Serve ``/metrics`` in Prometheus format from a daemon thread."""
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry or METRICS})
+    server = http.server.ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info("Serving metrics on http://%s:%d/metrics", host, server.server_port)
+    return server
 
 
 # ========================= Cache Management =========================
@@ -62,32 +558,24 @@ def set_cache_enabled(enabled: bool):
 
 
 def get_cache_stats():
-    """Get cache hit/miss statistics."""
-    return _cache_stats.copy()
+    """Get cache hit/miss statistics (summed over all cache key kinds)."""
+    return {"hits": CACHE_HITS.value(), "misses": CACHE_MISSES.value()}
 
 
 def reset_cache_stats():
     """Reset cache statistics."""
-    global _cache_stats
-    _cache_stats = {"hits": 0, "misses": 0}
+    CACHE_HITS.reset()
+    CACHE_MISSES.reset()
 
 
 def ensure_cache_dir():
     """Ensure cache directory exists."""
-    if _cache_enabled:
-        _cache_dir.mkdir(exist_ok=True)
+    _default_client.ensure_cache_dir()
 
 
 def delete_cache():
     """Delete all cache files."""
-    if _cache_dir.exists():
-        cache_files = list(_cache_dir.glob("*.json"))
-        file_count = len(cache_files)
-        for cache_file in cache_files:
-            cache_file.unlink()
-        logger.info("Cache cleared: deleted %d files", file_count)
-    else:
-        logger.info("Cache cleared: no cache directory found")
+    _default_client.delete_cache()
 
 
 def make_cache_key(prefix: str, *args) -> str:
@@ -100,114 +588,528 @@ def make_cache_key(prefix: str, *args) -> str:
 
 def load_from_cache(cache_key: str) -> Optional[any]:
     """Load data from cache file."""
-    if not _cache_enabled:
-        return None
-    
-    cache_file = _cache_dir / f"{cache_key}.json"
-    if cache_file.exists():
-        try:
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                _cache_stats["hits"] += 1
-                
-                # Fix inflection data: convert tags from lists back to tuples
-                if isinstance(data, list) and data and isinstance(data[0], dict) and "tags" in data[0]:
-                    for item in data:
-                        if "tags" in item and isinstance(item["tags"], list):
-                            item["tags"] = tuple(item["tags"])
-                
-                return data
-        except (json.JSONDecodeError, IOError) as e:
-            logger.warning("Failed to load cache file %s: %s", cache_file, e)
-            # Delete corrupted cache file
-            cache_file.unlink(missing_ok=True)
-    
-    _cache_stats["misses"] += 1
-    return None
+    return _default_client.load_from_cache(cache_key)
 
 
 def save_to_cache(cache_key: str, data: any):
     """Save data to cache file."""
-    if not _cache_enabled:
-        return
-    
-    ensure_cache_dir()
-    cache_file = _cache_dir / f"{cache_key}.json"
-    try:
-        with open(cache_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
-    except IOError as e:
-        logger.warning("Failed to save cache file %s: %s", cache_file, e)
+    _default_client.save_to_cache(cache_key, data)
+
+
+# ========================= Sentence Cache =========================
+
+SENTENCE_CACHE_FORMAT = 2
+
+SENTENCE_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sentences (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def sentence_cache_key(sentence: str, lang: str, thresholds, include_imperatives: bool,
+                       include_determinatives: bool, include_gender_adj: bool, lemma_threshold: int,
+                       include_number_ambiguous: bool, pos_id: str, mlm_model: str,
+                       context_window: int = 0) -> str:
+    """Content address of one finished output line.
+
+    Covers everything the output depends on: the exact sentence text (spacing
+    is preserved in the output, so it is not normalized), language, effective
+    filter flags, logit threshold(s), POS backend and model, MLM model and context window.
+    Pass model ids that include model_revision, so updated weights get new keys.
+    """
+    content = json.dumps([
+        SENTENCE_CACHE_FORMAT, sentence, lang, thresholds, include_imperatives,
+        include_determinatives, include_gender_adj, lemma_threshold,
+        include_number_ambiguous, pos_id, mlm_model, context_window,
+    ], ensure_ascii=False)
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+class SentenceCache:
+    """Cache of finished output lines for whole sentences.
+
+    A bounded LRU tier in memory answers repeated lines (boilerplate,
+    "Presidenten: Takk.") without POS tagging, lookups or BERT. With ``path``,
+    a SQLite tier keeps results across runs and processes. Keys include the
+    model revisions, but not the Ordbank data: clear it when that changes.
+    Values must be JSON-serializable.
+    """
+
+    def __init__(self, max_entries: int = 100000, path=None):
+        self.max_entries = max_entries
+        self.path = Path(path) if path else None
+        self._memory: "OrderedDict[str, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if self.path is not None:
+            self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            self._conn.executescript(SENTENCE_CACHE_SCHEMA)
+        self.lookups = 0
+        self.hits = {"memory": 0, "disk": 0, "batch": 0}
+
+    def _remember(self, key: str, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _record(self, result: str):
+        self.lookups += 1
+        if result != "miss":
+            self.hits[result] += 1
+        SENTENCE_CACHE_LOOKUPS.inc(result=result)
+
+    def get(self, key: str):
+        """Return the cached value for ``key``, or None."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._record("memory")
+                return self._memory[key]
+            if self._conn is not None:
+                row = self._conn.execute("SELECT value FROM sentences WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    value = json.loads(row[0])
+                    if self.max_entries > 0:
+                        self._remember(key, value)
+                    self._record("disk")
+                    return value
+            self._record("miss")
+            return None
+
+    def lookup_batch(self, keys: List[str]) -> Tuple[List, Dict[str, int]]:
+        """Look up a batch: (values with None for misses, {missing key: first index}).
+        
+        Repeats of a missing key within the batch count as hits ("batch"), as
+        they are answered from the first occurrence.
+        """
+        values = []
+        missing: Dict[str, int] = {}
+        for i, key in enumerate(keys):
+            if key in missing:
+                with self._lock:
+                    self._record("batch")
+                values.append(None)
+                continue
+            value = self.get(key)
+            if value is None:
+                missing[key] = i
+            values.append(value)
+        return values, missing
+
+    def put_many(self, items):
+        """Store (key, value) pairs in both tiers."""
+        items = list(items)
+        with self._lock:
+            if self.max_entries > 0:
+                for key, value in items:
+                    self._remember(key, value)
+            if self._conn is not None and items:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO sentences (key, value) VALUES (?, ?)",
+                        [(key, json.dumps(value, ensure_ascii=False)) for key, value in items],
+                    )
+
+    def put(self, key: str, value):
+        """Store one value."""
+        self.put_many([(key, value)])
+
+    def stats(self) -> Dict:
+        """Lookup counts and the share of sentences answered from the cache."""
+        hits = sum(self.hits.values())
+        return {
+            "lookups": self.lookups,
+            "hits": dict(self.hits),
+            "misses": self.lookups - hits,
+            "duplicate_rate": hits / self.lookups if self.lookups else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
 
 
 # ========================= Model Loading =========================
 
-@lru_cache(maxsize=1)
-def get_pos_tagger():
-    """Load POS tagger model (lazy initialization)."""
-    logger.info("Loading POS tagger...")
-    tagger = pipeline(
-        "token-classification",
-        model="NbAiLab/nb-bert-base-pos",
-        aggregation_strategy="none"
-    )
+MODEL_SNAPSHOT_MARKER = "altmorph_snapshot.json"
+MODEL_SNAPSHOT_WEIGHTS = "weights.pt"
+MODEL_SNAPSHOT_MIN_TORCH = (2, 1)
+
+
+def is_model_snapshot(model_name: str) -> bool:
+    """Whether ``model_name`` is a directory written by save_model_snapshot."""
+    return (Path(model_name) / MODEL_SNAPSHOT_MARKER).is_file()
+
+
+@lru_cache(maxsize=None)
+def model_revision(model_name: str, hub: bool = True) -> str:
+    """Identify the weights behind a model name without loading them.
+
+    A local directory (including snapshots) is identified by the names, sizes
+    and modification times of its files, an installed package (spaCy models)
+    by its version and, with ``hub``, a Hugging Face Hub model by the commit
+    its config resolves to. Returns "" if none of these applies.
+    """
+    path = Path(model_name)
+    if path.is_dir():
+        files = sorted(p for p in path.rglob("*") if p.is_file())
+        stats = [(str(p.relative_to(path)), p.stat().st_size, p.stat().st_mtime_ns) for p in files]
+        return hashlib.sha1(json.dumps(stats).encode("utf-8")).hexdigest()
+    with contextlib.suppress(Exception):
+        return importlib.metadata.version(model_name)
+    if hub:
+        with contextlib.suppress(Exception):
+            return AutoConfig.from_pretrained(model_name)._commit_hash or ""
+    return ""
+
+
+def save_model_snapshot(model, tokenizer, directory) -> Path:
+    """Write a model as a snapshot whose weights load_model_snapshot memory-maps.
+
+    The directory holds the config, tokenizer and one torch file with all
+    parameters and buffers; pass it wherever a model name is accepted
+    (ALTMORPH_MLM_MODEL, ALTMORPH_POS_MODEL, AltMorph(mlm_model=...)).
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    model.config.save_pretrained(directory)
+    tokenizer.save_pretrained(directory)
+    persistent = model.state_dict()
+    buffers = {name: buffer for name, buffer in model.named_buffers() if name not in persistent}
+    torch.save({"state_dict": persistent, "buffers": buffers}, directory / MODEL_SNAPSHOT_WEIGHTS)
+    (directory / MODEL_SNAPSHOT_MARKER).write_text(json.dumps({
+        "format": 1,
+        "architecture": type(model).__name__,
+        "source": model.name_or_path,
+    }, indent=2), encoding="utf-8")
+    return directory
+
+
+def load_model_snapshot(directory, auto_class):
+    """Build an ``auto_class`` model whose weights are memory-mapped from a snapshot.
+
+    The model is created without allocating weights and the tensors are
+    assigned straight from a read-only file mapping (torch.load(mmap=True),
+    torch >= 2.1), so loading takes no time for weights and every process
+    mapping the same snapshot shares one copy in the page cache. Older torch
+    raises RuntimeError; load the original model name instead.
+    """
+    version = tuple(int(part) for part in re.findall(r"\d+", torch.__version__)[:2])
+    if version < MODEL_SNAPSHOT_MIN_TORCH:
+        raise RuntimeError(
+            f"Model snapshot {directory} needs torch >= "
+            f"{'.'.join(map(str, MODEL_SNAPSHOT_MIN_TORCH))} (found {torch.__version__}); "
+            f"upgrade torch or use the original model name"
+        )
+    directory = Path(directory)
+    config = AutoConfig.from_pretrained(directory)
+    with torch.device("meta"):
+        model = auto_class.from_config(config)
+    snapshot = torch.load(directory / MODEL_SNAPSHOT_WEIGHTS, mmap=True, weights_only=True, map_location="cpu")
+    model.load_state_dict(snapshot["state_dict"], assign=True)
+    for name, buffer in snapshot["buffers"].items():
+        module_name, _, buffer_name = name.rpartition(".")
+        model.get_submodule(module_name).register_buffer(buffer_name, buffer, persistent=False)
+    return model.eval()
+
+
+@lru_cache(maxsize=None)
+def load_pos_tagger(model_name: str = POS_MODEL):
+    """Load a POS tagger once per process; engines using the same model share it."""
+    logger.info("Loading POS tagger %s...", model_name)
+    if is_model_snapshot(model_name):
+        tagger = pipeline(
+            "token-classification",
+            model=load_model_snapshot(model_name, AutoModelForTokenClassification),
+            tokenizer=AutoTokenizer.from_pretrained(model_name),
+            aggregation_strategy="none"
+        )
+    else:
+        tagger = pipeline(
+            "token-classification",
+            model=model_name,
+            aggregation_strategy="none"
+        )
     logger.info("POS tagger loaded")
     return tagger
 
 
-@lru_cache(maxsize=1)
-def get_masked_lm() -> Tuple[AutoTokenizer, AutoModelForMaskedLM]:
-    """Load masked language model (lazy initialization)."""
-    logger.info("Loading masked language model...")
-    tokenizer = AutoTokenizer.from_pretrained("NbAiLab/nb-bert-base")
-    model = AutoModelForMaskedLM.from_pretrained("NbAiLab/nb-bert-base")
+@lru_cache(maxsize=None)
+def load_masked_lm(model_name: str = MLM_MODEL) -> Tuple[AutoTokenizer, AutoModelForMaskedLM]:
+    """Load a masked language model once per process; engines using the same model share it."""
+    logger.info("Loading masked language model %s...", model_name)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    if is_model_snapshot(model_name):
+        model = load_model_snapshot(model_name, AutoModelForMaskedLM)
+    else:
+        model = AutoModelForMaskedLM.from_pretrained(model_name)
     logger.info("Masked language model loaded")
     return tokenizer, model
 
 
+def get_pos_tagger():
+    """Load POS tagger model (lazy initialization)."""
+    return load_pos_tagger(POS_MODEL)
+
+
+def get_masked_lm() -> Tuple[AutoTokenizer, AutoModelForMaskedLM]:
+    """Load masked language model (lazy initialization)."""
+    return load_masked_lm(MLM_MODEL)
+
+
+_model_locks: Dict[int, threading.Lock] = {}
+
+
+def model_lock(model) -> threading.Lock:
+    """Lock serializing calls into a shared model.
+
+    Fast tokenizers raise "Already borrowed" when one instance is used from
+    several threads at once, and engines share models, so pipeline stages take
+    this lock around tagging and scoring.
+    """
+    lock = _model_locks.get(id(model))
+    if lock is None:
+        lock = _model_locks.setdefault(id(model), threading.Lock())
+    return lock
+
+
 # ========================= POS Tagging =========================
 
-def extract_pos_tags(sentence: str) -> Dict[str, str]:
-    """Extract POS tags for all words in sentence."""
-    try:
-        tagger = get_pos_tagger()
-        pos_results = tagger(sentence)
-        
-        # Parse sub-token output and map to original words
-        word_pos_map = {}
-        current_word = ""
-        current_pos = None
+class PosBackend:
+    """A POS tagger for tokenize_preserve token lists.
+    
+    Subclasses set ``name``, implement ``tag_batch`` (one UPOS tag or None per
+    token position, None for whitespace) and ``default_model``.
+    """
+    name = ""
+    
+    def __init__(self, model_name: Optional[str] = None):
+        self.model_name = model_name or self.default_model()
+    
+    @staticmethod
+    def default_model() -> str:
+        raise NotImplementedError
+    
+    @property
+    def model_id(self) -> str:
+        """Backend and model, e.g. "spacy:nb_core_news_lg"."""
+        return f"{self.name}:{self.model_name}"
+    
+    def tag_batch(self, token_lists: List[List[str]]) -> List[List[Optional[str]]]:
+        raise NotImplementedError
+    
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.model_name!r})"
+
+
+def _words(token_lists: List[List[str]]) -> Tuple[List[int], List[List[str]]]:
+    """Indexes of token lists containing words, and their non-whitespace tokens."""
+    rows = [i for i, tokens in enumerate(token_lists) if any(not token.isspace() for token in tokens)]
+    return rows, [[token for token in token_lists[i] if not token.isspace()] for i in rows]
+
+
+def _spread_tags(tokens: List[str], word_tags: Iterable[Optional[str]]) -> List[Optional[str]]:
+    """Per-word tags to per-token-position tags (None for whitespace)."""
+    tags = iter(word_tags)
+    return [None if token.isspace() else next(tags) for token in tokens]
+
+
+class BertPosBackend(PosBackend):
+    """POS tags from a BERT token-classification model (the default backend).
+    
+    The model is called directly, ``batch_size`` token lists per forward
+    pass: non-whitespace tokens go in as pre-split words
+    (``is_split_into_words``), and each word gets the tag of its first subword
+    containing a letter (its first subword otherwise), found through
+    ``word_ids`` and the offset mapping. Words cut off beyond the model's
+    maximum length get None. ``tagger`` wraps an already loaded pipeline.
+    """
+    name = "bert"
+    
+    def __init__(self, model_name: Optional[str] = None, tagger=None, batch_size: int = 32):
+        if tagger is not None:
+            model_name = tagger.model.name_or_path
+        super().__init__(model_name)
+        self.tagger = tagger if tagger is not None else load_pos_tagger(self.model_name)
+        self.batch_size = batch_size
+    
+    @staticmethod
+    def default_model() -> str:
+        return POS_MODEL
+    
+    def tag_batch(self, token_lists: List[List[str]]) -> List[List[Optional[str]]]:
+        results = [[None] * len(tokens) for tokens in token_lists]
+        rows, words = _words(token_lists)
+        tokenizer, model = self.tagger.tokenizer, self.tagger.model
+        max_length = min(tokenizer.model_max_length, model.config.max_position_embeddings)
+        labels = model.config.id2label
         
-        for token_info in pos_results:
-            token = token_info['word']
-            pos_tag = token_info['entity']
+        for chunk_start in range(0, len(rows), self.batch_size):
+            chunk = rows[chunk_start:chunk_start + self.batch_size]
+            chunk_words = words[chunk_start:chunk_start + self.batch_size]
             
-            if token.startswith('##'):
-                current_word += token[2:]  # Remove ## prefix
-            else:
-                # Save previous word
-                if current_word and current_pos:
-                    word_pos_map[current_word.lower()] = current_pos
-                # Start new word
-                current_word = token
-                current_pos = pos_tag
-        
-        # Don't forget last word
-        if current_word and current_pos:
-            word_pos_map[current_word.lower()] = current_pos
+            with model_lock(self.tagger), profile_stage("pos", len(chunk)):
+                inputs = tokenizer(chunk_words, is_split_into_words=True, return_offsets_mapping=True,
+                                   padding=True, truncation=True, max_length=max_length, return_tensors="pt")
+                offsets = inputs.pop("offset_mapping").tolist()
+                with torch.no_grad():
+                    predictions = model(**inputs).logits.argmax(dim=-1).tolist()
             
-        return word_pos_map
+            for row, (i, row_words) in enumerate(zip(chunk, chunk_words)):
+                word_tags: List[Optional[str]] = [None] * len(row_words)
+                has_letter = [False] * len(row_words)
+                for col, word_index in enumerate(inputs.word_ids(row)):
+                    if word_index is None or has_letter[word_index]:
+                        continue
+                    start, end = offsets[row][col]
+                    letter = is_word(row_words[word_index][start:end])
+                    if word_tags[word_index] is None or letter:
+                        word_tags[word_index] = labels[predictions[row][col]]
+                        has_letter[word_index] = letter
+                results[i] = _spread_tags(token_lists[i], word_tags)
         
+        return results
+
+
+class SpacyPosBackend(PosBackend):
+    """POS tags from a spaCy pipeline (nb_core_news_lg by default), far cheaper than BERT on CPU.
+    
+    Words go in as pre-tokenized Docs, so tags align with token positions, and
+    ``nlp.pipe`` batches them ``batch_size`` at a time over ``n_process``
+    processes. Needs ``pip install spacy`` and the model
+    (``python -m spacy download nb_core_news_lg``).
+    """
+    name = "spacy"
+    
+    def __init__(self, model_name: Optional[str] = None, batch_size: int = 256, n_process: int = 1):
+        super().__init__(model_name)
+        try:
+            import spacy
+            from spacy.tokens import Doc
+        except ImportError as e:
+            raise ImportError("The spaCy POS backend needs spaCy: pip install spacy && "
+                              f"python -m spacy download {self.model_name}") from e
+        self._doc = Doc
+        self.nlp = spacy.load(self.model_name, disable=["parser", "ner", "lemmatizer"])
+        self.batch_size = batch_size
+        self.n_process = n_process
+    
+    @staticmethod
+    def default_model() -> str:
+        return SPACY_MODEL
+    
+    def tag_batch(self, token_lists: List[List[str]]) -> List[List[Optional[str]]]:
+        results = [[None] * len(tokens) for tokens in token_lists]
+        rows, words = _words(token_lists)
+        docs = [self._doc(self.nlp.vocab, words=row_words) for row_words in words]
+        with model_lock(self.nlp), profile_stage("pos", len(rows)):
+            tagged = list(self.nlp.pipe(docs, batch_size=self.batch_size, n_process=self.n_process))
+        for i, doc in zip(rows, tagged):
+            results[i] = _spread_tags(token_lists[i], (token.pos_ or None for token in doc))
+        return results
+
+
+POS_BACKENDS = {"bert": BertPosBackend, "spacy": SpacyPosBackend}
+
+
+@lru_cache(maxsize=None)
+def load_pos_backend(name: str = "bert", model_name: Optional[str] = None,
+                     options: Tuple = ()) -> PosBackend:
+    """Load a POS backend once per process; ``options`` are (keyword, value) pairs for its class."""
+    if name not in POS_BACKENDS:
+        raise ValueError(f"Unknown POS backend {name!r} (choose from {', '.join(POS_BACKENDS)})")
+    return POS_BACKENDS[name](model_name, **dict(options))
+
+
+def pos_backend_id(name: str, model_name: Optional[str] = None) -> str:
+    """model_id of a backend without loading it."""
+    if name not in POS_BACKENDS:
+        raise ValueError(f"Unknown POS backend {name!r} (choose from {', '.join(POS_BACKENDS)})")
+    return f"{name}:{model_name or POS_BACKENDS[name].default_model()}"
+
+
+def set_pos_backend(name: str, model_name: Optional[str] = None, **options):
+    """Select the POS backend used when no tagger is given; loaded on first use.
+    
+    Call get_pos_backend() afterwards to load it now and fail early if its
+    dependencies are missing.
+    """
+    global _pos_backend
+    pos_backend_id(name, model_name)
+    _pos_backend = (name, model_name, tuple(sorted(options.items())))
+
+
+def get_pos_backend() -> PosBackend:
+    """The POS backend selected with set_pos_backend (BERT by default)."""
+    return load_pos_backend(*_pos_backend)
+
+
+def tag_tokens_batch(token_lists: List[List[str]], tagger=None) -> List[List[Optional[str]]]:
+    """POS tag per position for tokenize_preserve token lists.
+    
+    ``tagger`` is a PosBackend or a transformers token-classification
+    pipeline; get_pos_backend() if None. Repeated words keep their own tag at
+    each position. A backend that cannot be loaded raises; if tagging itself
+    fails, all tags are None.
+    """
+    if tagger is None:
+        tagger = get_pos_backend()
+    elif not isinstance(tagger, PosBackend):
+        tagger = BertPosBackend(tagger=tagger)
+    try:
+        return tagger.tag_batch(token_lists)
     except Exception as e:
         logger.warning("POS tagging failed: %r", e)
-        return {}
+        return [[None] * len(tokens) for tokens in token_lists]
+
+
+def tag_tokens(tokens: List[str], tagger=None) -> List[Optional[str]]:
+    """POS tag per position for one tokenize_preserve token list; see tag_tokens_batch."""
+    return tag_tokens_batch([tokens], tagger)[0]
+
+
+def extract_pos_tags(sentence: str, tagger=None) -> Dict[str, str]:
+    """Extract POS tags for all words in sentence (default tagger unless one is given).
+    
+    Keyed by casefolded word; a word tagged differently at two positions keeps
+    its last tag. Use tag_tokens for per-position tags.
+    """
+    tokens = tokenize_preserve(sentence)
+    return {
+        token.casefold(): tag
+        for token, tag in zip(tokens, tag_tokens(tokens, tagger))
+        if tag is not None
+    }
+
+
+def lookup_units(tokens: List[str], tags: List[Optional[str]],
+                 include_determinatives: bool = False) -> List[Tuple[str, Optional[str]]]:
+    """Distinct (casefolded word, POS tag) pairs to look up, in order of appearance.
+    
+    Words tagged DET are left out unless ``include_determinatives``.
+    """
+    units = []
+    seen = set()
+    for token, tag in zip(tokens, tags):
+        if is_word(token) and (include_determinatives or tag != 'DET'):
+            unit = (token.casefold(), tag)
+            if unit not in seen:
+                seen.add(unit)
+                units.append(unit)
+    return units
 
 
 # ========================= Acceptability Scoring =========================
 
-def score_word_in_context(sentence: str, target_word: str, target_position: Optional[int] = None) -> Dict:
-    """Score a word's acceptability in its sentence context."""
-    tokenizer, model = get_masked_lm()
+def score_word_in_context(sentence: str, target_word: str, target_position: Optional[int] = None,
+                          mlm: Optional[Tuple] = None) -> Dict:
+    """Score a word's acceptability in its sentence context (``mlm`` is a (tokenizer, model) pair)."""
+    tokenizer, model = mlm or get_masked_lm()
 
     words = sentence.split()
     
@@ -245,9 +1147,13 @@ def score_word_in_context(sentence: str, target_word: str, target_position: Opti
 
     mask_pos = mask_positions[0]
 
-    with torch.no_grad():
+    forward_start = time.perf_counter()
+    with torch.no_grad(), profile_stage("mlm_forward", 1):
         logits = model(**inputs).logits[0, mask_pos]
         probabilities = torch.softmax(logits, dim=0)
+    MLM_FORWARD_LATENCY.observe(time.perf_counter() - forward_start)
+    MLM_BATCH_SIZE.observe(1)
+    MLM_PADDING_RATIO.observe(0.0)
 
     target_tokens = tokenizer(target_word, add_special_tokens=False)['input_ids']
 
@@ -271,7 +1177,7 @@ def score_word_in_context(sentence: str, target_word: str, target_position: Opti
 
 
 def filter_by_acceptability(tokens: List[str], position: int, alternatives: Set[str],
-                          threshold: float = 2.0, debug: bool = False) -> Set[str]:
+                          threshold: float = 2.0, debug: bool = False, mlm: Optional[Tuple] = None) -> Set[str]:
     """Filter alternatives by linguistic acceptability at specific position."""
     if len(alternatives) <= 1:
         return alternatives
@@ -280,7 +1186,7 @@ def filter_by_acceptability(tokens: List[str], position: int, alternatives: Set[
     original_sentence = "".join(tokens)
     
     # Score original word at its specific position
-    original_score = score_word_in_context(original_sentence, original_word, position)
+    original_score = score_word_in_context(original_sentence, original_word, position, mlm)
     scores = {original_word: original_score}
     
     if debug:
@@ -302,7 +1208,7 @@ def filter_by_acceptability(tokens: List[str], position: int, alternatives: Set[
         test_tokens[position] = alt
         test_sentence = "".join(test_tokens)
         
-        score = score_word_in_context(test_sentence, alt, position)
+        score = score_word_in_context(test_sentence, alt, position, mlm)
         scores[alt] = score
         
         if debug:
@@ -326,6 +1232,7 @@ def filter_by_acceptability(tokens: List[str], position: int, alternatives: Set[
         
         if logit_diff <= threshold:
             filtered.add(word)
+            ALTERNATIVES.inc(decision="kept")
             if debug:
                 logger.debug(
                     "     ✅ KEEPING %s: logit diff %+0.3f <= %.2f",
@@ -334,6 +1241,7 @@ def filter_by_acceptability(tokens: List[str], position: int, alternatives: Set[
                     threshold,
                 )
         else:
+            ALTERNATIVES.inc(decision="rejected")
             if debug:
                 logger.debug(
                     "     ❌ REJECTING %s: logit diff %+0.3f > %.2f",
@@ -355,106 +1263,63 @@ def filter_by_acceptability(tokens: List[str], position: int, alternatives: Set[
 
 # ========================= Batched BERT Processing =========================
 
-def batch_score_alternatives(scoring_tasks: List[Dict]) -> Dict[str, Dict[str, Dict]]:
-    """Score multiple alternatives for multiple sentences in one BERT batch.
-    
-    Args:
-        scoring_tasks: List of dicts with keys:
-            - 'sentence_id': unique identifier for the sentence
-            - 'tokens': list of tokens
-            - 'position': position of word to score
-            - 'alternatives': set of alternatives to score
-            - 'original_word': the original word at position
-    
-    Returns:
-        Dict mapping sentence_id -> word -> {alternative: score_dict}
+def mask_window(word_ids: List[Optional[int]], mask_index: int, window: int,
+                max_tokens: int) -> Tuple[int, int]:
+    """Token span [start, end) of at most ``2 * window + 1`` tokens around the mask.
+
+    The span never exceeds ``max_tokens``, is shifted inwards at the text edges
+    so the mask is always inside it, and is shrunk to whole words so the cut
+    text tokenizes the same way. ``window`` 0 means ``max_tokens``.
     """
-    if not scoring_tasks:
-        return {}
-    
-    tokenizer, model = get_masked_lm()
-    
-    # Collect all masked sentences and track their metadata
-    masked_sentences = []
-    task_metadata = []
-    
-    for task in scoring_tasks:
-        sentence_id = task['sentence_id']
-        tokens = task['tokens']
-        position = task['position']
-        alternatives = task['alternatives']
-        original_word = task['original_word']
-        
-        # Create original sentence
-        original_sentence = "".join(tokens)
-        
-        # Score original word
-        words = original_sentence.split()
-        word_count = 0
-        for i in range(min(position, len(tokens))):
-            if is_word(tokens[i]):
-                word_count += 1
-        target_idx = word_count
-        
-        if target_idx < len(words):
-            # Add original word scoring
-            masked_words = words.copy()
-            masked_words[target_idx] = tokenizer.mask_token
-            masked_sentence = " ".join(masked_words)
-            
-            masked_sentences.append(masked_sentence)
-            task_metadata.append({
-                'sentence_id': sentence_id,
-                'word': original_word,
-                'is_original': True,
-                'target_idx': target_idx
-            })
-            
-            # Add alternative word scoring
-            for alt in alternatives:
-                if alt.lower() != original_word.lower():
-                    masked_sentences.append(masked_sentence)
-                    task_metadata.append({
-                        'sentence_id': sentence_id,
-                        'word': alt,
-                        'is_original': False,
-                        'target_idx': target_idx
-                    })
-    
-    if not masked_sentences:
-        return {}
-    
-    # Batch process all masked sentences
-    results = {}
-    batch_size = 32  # Process in smaller batches to avoid memory issues
+    limit = min(max_tokens, 2 * window + 1) if window > 0 else max_tokens
+    if len(word_ids) <= limit:
+        return 0, len(word_ids)
+    start = max(0, min(mask_index - limit // 2, len(word_ids) - limit))
+    end = start + limit
+    while 0 < start < mask_index and word_ids[start] == word_ids[start - 1]:
+        start += 1
+    while mask_index < end < len(word_ids) and word_ids[end] == word_ids[end - 1]:
+        end -= 1
+    return start, end
+
+
+def _score_contexts(contexts: List[Tuple[str, List[Tuple[str, int, str]]]], tokenizer, model,
+                    context_window: int, max_tokens: int, results: Dict[str, Dict[int, Dict]]):
+    """Run one forward pass over masked sentences and store the score of every target word."""
+    # Cut each sentence to a window of context around its mask, using the offset mapping
+    batch_sentences = [sentence for sentence, _ in contexts]
+    encoded = tokenizer(batch_sentences, add_special_tokens=False, return_offsets_mapping=True)
+    for k, input_ids in enumerate(encoded['input_ids']):
+        if tokenizer.mask_token_id in input_ids:
+            start, end = mask_window(encoded.word_ids(k), input_ids.index(tokenizer.mask_token_id),
+                                     context_window, max_tokens)
+            if end - start < len(input_ids):
+                offsets = encoded['offset_mapping'][k]
+                batch_sentences[k] = batch_sentences[k][offsets[start][0]:offsets[end - 1][1]]
+    
+    # Tokenize batch
+    inputs = tokenizer(batch_sentences, return_tensors="pt", padding=True, truncation=True)
     
-    for i in range(0, len(masked_sentences), batch_size):
-        batch_sentences = masked_sentences[i:i+batch_size]
-        batch_metadata = task_metadata[i:i+batch_size]
-        
-        # Tokenize batch
-        inputs = tokenizer(batch_sentences, return_tensors="pt", padding=True, truncation=True)
-        
-        with torch.no_grad():
+    with torch.no_grad():
+        forward_start = time.perf_counter()
+        with profile_stage("mlm_forward", len(contexts)) as stage:
+            stage.annotate(batch_size=len(contexts), seq_len=inputs.input_ids.shape[1])
             logits = model(**inputs).logits
+        MLM_FORWARD_LATENCY.observe(time.perf_counter() - forward_start)
+        MLM_BATCH_SIZE.observe(len(contexts))
+        MLM_PADDING_RATIO.observe(1.0 - inputs.attention_mask.sum().item() / inputs.attention_mask.numel())
+        
+        # Process each context in the batch
+        for j, (_, targets) in enumerate(contexts):
+            mask_positions = (inputs.input_ids[j] == tokenizer.mask_token_id).nonzero(as_tuple=True)[0]
+            if len(mask_positions) > 0:
+                word_logits = logits[j, mask_positions[0]]
+                probabilities = torch.softmax(word_logits, dim=0)
             
-            # Process each result in the batch
-            for j, (sentence, metadata) in enumerate(zip(batch_sentences, batch_metadata)):
-                sentence_id = metadata['sentence_id']
-                word = metadata['word']
-                target_idx = metadata['target_idx']
-                
-                # Find mask position in this sentence
-                sentence_inputs = tokenizer(sentence, return_tensors="pt")
-                mask_positions = (sentence_inputs.input_ids == tokenizer.mask_token_id).nonzero(as_tuple=True)[1]
-                
+            for sentence_id, position, word in targets:
                 if len(mask_positions) == 0:
                     score = {'logit': float('-inf'), 'probability': 0.0, 'rank': -1}
                 else:
-                    mask_pos = mask_positions[0]
-                    word_logits = logits[j, mask_pos]
-                    probabilities = torch.softmax(word_logits, dim=0)
-                    
                     # Score the target word
                     target_tokens = tokenizer(word, add_special_tokens=False)['input_ids']
                     
@@ -476,71 +1341,117 @@ def batch_score_alternatives(scoring_tasks: List[Dict]) -> Dict[str, Dict[str, D
                             'rank': -1,
                         }
                 
-                # Store result
-                if sentence_id not in results:
-                    results[sentence_id] = {}
-                results[sentence_id][word] = score
-    
-    return results
+                # Store result per position, so repeated words are scored in their own context
+                results.setdefault(sentence_id, {}).setdefault(position, {})[word] = score
 
 
-def batch_filter_by_acceptability(sentences_data: List[Dict], threshold: float = 2.0, debug: bool = False) -> Dict[str, Dict[int, Set[str]]]:
-    """Filter alternatives for multiple sentences using batched BERT processing.
+def batch_score_alternatives(scoring_tasks: Iterable[Dict], mlm: Optional[Tuple] = None,
+                             context_window: Optional[int] = None) -> Dict[str, Dict[str, Dict]]:
+    """Score multiple alternatives for multiple sentences in one BERT batch.
+    
+    The target position is masked, so the original word and all its alternatives
+    share one masked context; each distinct context gets a single forward pass
+    and every word is read from its logits. Each context is cut to
+    ``context_window`` subword tokens on either side of the mask (default
+    MLM_CONTEXT_WINDOW), so long texts cost a bounded amount per target and
+    targets beyond the model's maximum length are still scored.
+    
+    Masked sentences are built as the tasks are read and scored 32 at a time,
+    so only one forward batch of them is held in memory, however many tasks
+    there are. A context repeated after its batch was scored is scored again.
     
     Args:
-        sentences_data: List of dicts with keys:
-            - 'sentence_id': unique identifier
+        scoring_tasks: Iterable of dicts with keys:
+            - 'sentence_id': unique identifier for the sentence
             - 'tokens': list of tokens
-            - 'word_alternatives': dict mapping position -> set of alternatives
+            - 'position': position of word to score
+            - 'alternatives': set of alternatives to score
+            - 'original_word': the original word at position
+        mlm: (tokenizer, model) pair; the default masked LM if None
+        context_window: subword tokens kept on each side of the mask; 0 keeps
+            as much as the model accepts
     
     Returns:
-        Dict mapping sentence_id -> position -> filtered_alternatives
+        Dict mapping sentence_id -> position -> {word: score_dict}, where the
+        words are the original word and its alternatives at that position
     """
-    if not sentences_data:
+    scoring_tasks = iter(scoring_tasks)
+    first_task = next(scoring_tasks, None)
+    if first_task is None:
         return {}
+    scoring_tasks = itertools.chain([first_task], scoring_tasks)
     
-    # Prepare scoring tasks
-    scoring_tasks = []
-    for sentence_data in sentences_data:
-        sentence_id = sentence_data['sentence_id']
-        tokens = sentence_data['tokens']
-        word_alternatives = sentence_data['word_alternatives']
-        
-        for position, alternatives in word_alternatives.items():
-            if len(alternatives) > 1:
-                original_word = tokens[position]
-                scoring_tasks.append({
-                    'sentence_id': sentence_id,
-                    'tokens': tokens,
-                    'position': position,
-                    'alternatives': alternatives,
-                    'original_word': original_word
-                })
+    tokenizer, model = mlm or get_masked_lm()
+    if context_window is None:
+        context_window = MLM_CONTEXT_WINDOW
+    max_tokens = min(tokenizer.model_max_length, model.config.max_position_embeddings)
+    max_tokens -= tokenizer.num_special_tokens_to_add()
     
-    # Batch score all alternatives
-    batch_scores = batch_score_alternatives(scoring_tasks)
+    results = {}
+    batch_size = 32  # Distinct contexts per forward pass
     
-    # Filter based on threshold
-    filtered_results = {}
+    # Distinct masked sentences of the next batch, each with the (sentence_id, position, word) it scores
+    masked_sentences: Dict[str, List[Tuple[str, int, str]]] = {}
     
-    for sentence_data in sentences_data:
-        sentence_id = sentence_data['sentence_id']
-        tokens = sentence_data['tokens']
-        word_alternatives = sentence_data['word_alternatives']
+    for task in scoring_tasks:
+        tokens = task['tokens']
+        position = task['position']
+        original_word = task['original_word']
+        
+        # Mask the target word in the whitespace-split sentence
+        words = "".join(tokens).split()
+        target_idx = sum(1 for token in tokens[:position] if is_word(token))
+        if target_idx >= len(words):
+            continue
+        masked_words = words.copy()
+        masked_words[target_idx] = tokenizer.mask_token
+        masked_sentence = " ".join(masked_words)
         
-        filtered_results[sentence_id] = {}
+        if masked_sentence not in masked_sentences and len(masked_sentences) >= batch_size:
+            _score_contexts(list(masked_sentences.items()), tokenizer, model, context_window, max_tokens, results)
+            masked_sentences = {}
+        targets = masked_sentences.setdefault(masked_sentence, [])
         
-        for position, alternatives in word_alternatives.items():
+        targets.append((task['sentence_id'], position, original_word))
+        for alt in task['alternatives']:
+            if alt.lower() != original_word.lower():
+                targets.append((task['sentence_id'], position, alt))
+    
+    if masked_sentences:
+        _score_contexts(list(masked_sentences.items()), tokenizer, model, context_window, max_tokens, results)
+    return results
+
+
+class ScoredSentence(NamedTuple):
+    """A sentence after lookup and scoring, before any logit threshold is applied.
+
+    ``alternatives`` maps token positions to their candidate alternatives and
+    ``scores`` maps the same positions to {word: score_dict} for the original
+    word and each scored alternative. Filtering at any threshold is then cheap
+    and needs no model. ``lookup_failed`` is set when an Ordbank lookup for
+    one of its words failed, so its output may lack alternatives.
+    """
+    tokens: List[str]
+    alternatives: Dict[int, Set[str]]
+    scores: Dict[int, Dict[str, Dict]]
+    lookup_failed: bool = False
+
+    def filtered(self, threshold: float, debug: bool = False,
+                 record_metrics: bool = False) -> Dict[int, Set[str]]:
+        """Alternatives per position that are within ``threshold`` logits of the original."""
+        filtered_results = {}
+        
+        for position, alternatives in self.alternatives.items():
             if len(alternatives) <= 1:
-                filtered_results[sentence_id][position] = alternatives
+                filtered_results[position] = alternatives
                 continue
             
-            original_word = tokens[position]
-            scores = batch_scores.get(sentence_id, {})
+            original_word = self.tokens[position]
+            scores = self.scores.get(position, {})
             
             if original_word not in scores:
                 # Fallback to original alternatives if scoring failed
-                filtered_results[sentence_id][position] = alternatives
+                filtered_results[position] = alternatives
                 continue
             
             original_score = scores[original_word]
@@ -575,6 +1486,8 @@ def batch_filter_by_acceptability(sentences_data: List[Dict], threshold: float =
                     
                     if logit_diff <= threshold:
                         filtered.add(alt)
+                        if record_metrics:
+                            ALTERNATIVES.inc(decision="kept")
                         if debug:
                             logger.debug(
                                 "     ✅ KEEPING %s: logit diff %+0.3f <= %.2f",
@@ -583,6 +1496,8 @@ def batch_filter_by_acceptability(sentences_data: List[Dict], threshold: float =
                                 threshold,
                             )
                     else:
+                        if record_metrics:
+                            ALTERNATIVES.inc(decision="rejected")
                         if debug:
                             logger.debug(
                                 "     ❌ REJECTING %s: logit diff %+0.3f > %.2f",
@@ -591,7 +1506,7 @@ def batch_filter_by_acceptability(sentences_data: List[Dict], threshold: float =
                                 threshold,
                             )
             
-            filtered_results[sentence_id][position] = filtered
+            filtered_results[position] = filtered
             
             if debug:
                 rejected = len(alternatives) - len(filtered)
@@ -600,220 +1515,978 @@ def batch_filter_by_acceptability(sentences_data: List[Dict], threshold: float =
                     len(filtered),
                     rejected,
                 )
+        
+        return filtered_results
+
+    def render(self, threshold: float, record_metrics: bool = False) -> str:
+        """Output line for this sentence at one logit threshold."""
+        return render_sentence(self.tokens, self.filtered(threshold, record_metrics=record_metrics))
+
+    def logit_diffs(self) -> List[Dict]:
+        """Per-position logit differences, for applying thresholds later without the model.
+
+        One entry per position with alternatives: the token index, the original
+        word, whether it was scored, and {alternative: original logit - alternative
+        logit}. Unscored positions keep all alternatives at any threshold. See
+        apply_logit_diffs.
+        """
+        annotations = []
+        for position in sorted(self.alternatives):
+            alternatives = self.alternatives[position]
+            if len(alternatives) <= 1:
+                continue
+            original_word = self.tokens[position]
+            scores = self.scores.get(position, {})
+            scored = original_word in scores
+            diffs = {}
+            for alt in sorted(alternatives):
+                if alt.lower() == original_word.lower():
+                    continue
+                if not scored:
+                    diffs[alt] = None
+                elif alt in scores:
+                    diffs[alt] = scores[original_word]['logit'] - scores[alt]['logit']
+            annotations.append({"index": position, "word": original_word, "scored": scored, "diffs": diffs})
+        return annotations
+
+
+def apply_logit_diffs(sentence: str, logit_diffs: List[Dict], threshold: float) -> str:
+    """Render a sentence from ScoredSentence.logit_diffs() at a new threshold, without the model.
+
+    Gives the same output as processing ``sentence`` with ``logit_threshold=threshold``.
+    """
+    tokens = tokenize_preserve(preprocess_punctuation(sentence))
+    position_alternatives = {}
+    for entry in logit_diffs:
+        kept = {entry["word"]}
+        kept.update(alt for alt, diff in entry["diffs"].items()
+                    if not entry["scored"] or diff <= threshold)
+        position_alternatives[entry["index"]] = kept
+    return render_sentence(tokens, position_alternatives)
+
+
+def scoring_tasks_for(sentences_data: List[Dict]) -> Iterator[Dict]:
+    """Yield batch_score_alternatives tasks for every position with several alternatives."""
+    for sentence_data in sentences_data:
+        sentence_id = sentence_data['sentence_id']
+        tokens = sentence_data['tokens']
+        word_alternatives = sentence_data['word_alternatives']
+        
+        for position, alternatives in word_alternatives.items():
+            if len(alternatives) > 1:
+                original_word = tokens[position]
+                yield {
+                    'sentence_id': sentence_id,
+                    'tokens': tokens,
+                    'position': position,
+                    'alternatives': alternatives,
+                    'original_word': original_word
+                }
+
+
+def batch_filter_by_acceptability(sentences_data: List[Dict], threshold: float = 2.0, debug: bool = False,
+                                  mlm: Optional[Tuple] = None,
+                                  context_window: Optional[int] = None) -> Dict[str, Dict[int, Set[str]]]:
+    """Filter alternatives for multiple sentences using batched BERT processing.
+    
+    Args:
+        sentences_data: List of dicts with keys:
+            - 'sentence_id': unique identifier
+            - 'tokens': list of tokens
+            - 'word_alternatives': dict mapping position -> set of alternatives
+        mlm: (tokenizer, model) pair; the default masked LM if None
+        context_window: see batch_score_alternatives
+    
+    Returns:
+        Dict mapping sentence_id -> position -> filtered_alternatives
+    """
+    if not sentences_data:
+        return {}
+    
+    batch_scores = batch_score_alternatives(scoring_tasks_for(sentences_data), mlm, context_window)
     
-    return filtered_results
-
-
-def process_sentences_batch(sentences: List[str], lang: str, api_key: str, timeout: float,
-                           max_workers: int, verbosity: int = 0, logit_threshold: float = 2.0,
-                           include_imperatives: bool = False, include_determinatives: bool = False,
-                           include_gender_adj: bool = False, lemma_threshold: int = 1,
-                           include_number_ambiguous: bool = False) -> List[str]:
-    """Process multiple sentences with batched BERT processing for improved performance."""
-    
+    return {
+        sentence_data['sentence_id']: ScoredSentence(
+            sentence_data['tokens'],
+            sentence_data['word_alternatives'],
+            batch_scores.get(sentence_data['sentence_id'], {}),
+        ).filtered(threshold, debug, record_metrics=True)
+        for sentence_data in sentences_data
+    }
+
+
+def score_sentences_batch(sentences: List[str], lang: str, api_key: str, timeout: float,
+                          max_workers: int, verbosity: int = 0,
+                          include_imperatives: bool = False, include_determinatives: bool = False,
+                          include_gender_adj: bool = False, lemma_threshold: int = 1,
+                          include_number_ambiguous: bool = False, policy: Optional[str] = None,
+                          engine: Optional["AltMorph"] = None) -> List[ScoredSentence]:
+    """Look up and score alternatives for a batch without applying a logit threshold.
+    
+    The lookup and BERT work of process_sentences_batch, shared by threshold
+    sweeps: ScoredSentence.render gives the output for any threshold.
+    """
     if not sentences:
         return []
     
+    lemma_threshold, include_number_ambiguous = get_filter_policy(policy).apply(
+        lemma_threshold, include_number_ambiguous)
+    
+    client = engine.client if engine is not None else _default_client
+    tagger = engine.pos_tagger if engine is not None else None
     headers = {"x-api-key": api_key.strip()}
     
-    # Step 1: Process each sentence individually for API calls and POS tagging
+    # Step 1: Preprocess, tokenize and POS tag all sentences in batches
+    with profile_stage("preprocess", len(sentences)):
+        token_lists = [tokenize_preserve(preprocess_punctuation(sentence)) for sentence in sentences]
+    tag_lists = tag_tokens_batch(token_lists, tagger)
+    
+    # Step 2: Fetch alternatives per sentence, one lookup per (word, POS)
     sentences_data = []
     
-    for i, sentence in enumerate(sentences):
-        # Preprocess and tokenize
-        preprocessed = preprocess_punctuation(sentence)
-        tokens = tokenize_preserve(preprocessed)
-        
-        # POS tagging
-        unique_words = get_unique_words(tokens)
-        pos_tags = extract_pos_tags(preprocessed)
-        
-        # Filter determiners
-        if not include_determinatives:
-            filtered_words = []
-            for word in unique_words:
-                pos_tag = pos_tags.get(word)
-                if pos_tag != 'DET':
-                    filtered_words.append(word)
-            unique_words = filtered_words
-        
-        # Fetch alternatives from API
-        cache = {}
-        with cf.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {}
+    for i, (sentence, tokens, tags) in enumerate(zip(sentences, token_lists, tag_lists)):
+        with trace_span("sentence", index=i, chars=len(sentence)):
+            units = lookup_units(tokens, tags, include_determinatives)
             
-            for word in unique_words:
-                pos_tag = pos_tags.get(word)
-                future = executor.submit(get_alternatives, word, lang, headers, timeout, pos_tag,
-                                       False, include_imperatives, include_gender_adj,
-                                       lemma_threshold, include_number_ambiguous)
-                futures[future] = word
+            cache = {}
+            lookup_failed = False
+            with profile_stage("lookup", len(units)), \
+                    lookup_pool(engine, max_workers) as executor:
+                futures = {}
+                
+                for word, pos_tag in units:
+                    future = executor.submit(client.find_resolution, word, lang, headers, timeout, pos_tag)
+                    futures[future] = (word, pos_tag)
+                
+                for future in cf.as_completed(futures):
+                    unit = futures[future]
+                    try:
+                        resolution = future.result()
+                        lookup_failed |= resolution.failed
+                        alternatives = resolution.apply(include_imperatives, include_gender_adj,
+                                                        lemma_threshold, include_number_ambiguous)
+                        if alternatives:
+                            cache[unit] = alternatives
+                    except Exception as e:
+                        lookup_failed = True
+                        if verbosity >= 1:
+                            logger.warning("Error processing word '%s': %s", unit[0], e)
             
-            for future in cf.as_completed(futures):
-                word = futures[future]
-                try:
-                    alternatives = future.result()
-                    if alternatives:
-                        cache[word.casefold()] = alternatives
-                except Exception as e:
-                    if verbosity >= 1:
-                        logger.warning("Error processing word '%s': %s", word, e)
-        
-        # Collect word alternatives by position
-        word_alternatives = {}
-        for j, token in enumerate(tokens):
-            if is_word(token):
-                alternatives = cache.get(token.casefold())
-                if alternatives and len(alternatives) > 1:
-                    word_alternatives[j] = alternatives
-        
-        sentences_data.append({
-            'sentence_id': f"sent_{i}",
-            'original_sentence': sentence,
-            'tokens': tokens,
-            'word_alternatives': word_alternatives,
-            'has_alternatives': bool(word_alternatives)
-        })
-    
-    # Step 2: Batch BERT processing for all sentences with alternatives
+            # Collect word alternatives by position
+            word_alternatives = {}
+            for j, (token, tag) in enumerate(zip(tokens, tags)):
+                if is_word(token):
+                    alternatives = cache.get((token.casefold(), tag))
+                    if alternatives and len(alternatives) > 1:
+                        word_alternatives[j] = alternatives
+            
+            sentences_data.append({
+                'sentence_id': f"sent_{i}",
+                'original_sentence': sentence,
+                'tokens': tokens,
+                'word_alternatives': word_alternatives,
+                'has_alternatives': bool(word_alternatives),
+                'lookup_failed': lookup_failed,
+            })
+    
+    # Step 3: Batch BERT processing for all sentences with alternatives
     sentences_with_alternatives = [s for s in sentences_data if s['has_alternatives']]
     
+    batch_scores = {}
     if sentences_with_alternatives:
-        if verbosity >= 3:
-            logger.debug("\n🧠 BATCH ACCEPTABILITY FILTERING (threshold: %.2f)", logit_threshold)
+        mlm = engine.masked_lm if engine is not None else get_masked_lm()
+        context_window = engine.mlm_context_window if engine is not None else None
+        with profile_stage("scoring", len(sentences_with_alternatives)), model_lock(mlm[1]):
+            batch_scores = batch_score_alternatives(scoring_tasks_for(sentences_with_alternatives), mlm,
+                                                    context_window)
+    
+    SENTENCES_PROCESSED.inc(len(sentences_data))
+    return [
+        ScoredSentence(s['tokens'], s['word_alternatives'], batch_scores.get(s['sentence_id'], {}),
+                       s['lookup_failed'])
+        for s in sentences_data
+    ]
+
+
+def process_sentences_batch(sentences: List[str], lang: str, api_key: str, timeout: float,
+                           max_workers: int, verbosity: int = 0, logit_threshold: float = 2.0,
+                           include_imperatives: bool = False, include_determinatives: bool = False,
+                           include_gender_adj: bool = False, lemma_threshold: int = 1,
+                           include_number_ambiguous: bool = False, policy: Optional[str] = None,
+                           engine: Optional["AltMorph"] = None,
+                           logit_thresholds: Optional[List[float]] = None,
+                           sentence_cache: Optional[SentenceCache] = None) -> List:
+    """Process multiple sentences with batched BERT processing for improved performance.
+    
+    With ``engine``, its Ordbank client, lookup pool and models are used instead
+    of the module defaults.
+    
+    With ``logit_thresholds`` (sweep mode), lookups and scoring run once and each
+    result is a dict mapping every threshold to its output line; ``logit_threshold``
+    is then ignored and acceptability metrics are recorded at the first threshold.
+    
+    With ``sentence_cache``, sentences seen before (or repeated in the batch)
+    are answered from the cache and only the rest are processed.
+    """
+    
+    if not sentences:
+        return []
+    
+    if sentence_cache is not None:
+        lemma_threshold, include_number_ambiguous = get_filter_policy(policy).apply(
+            lemma_threshold, include_number_ambiguous)
+        config = engine.config if engine is not None else None
+        thresholds = list(logit_thresholds) if logit_thresholds is not None else logit_threshold
+        if config is not None:
+            pos_id = pos_backend_id(config.pos_backend or POS_BACKEND, config.pos_model)
+        else:
+            pos_id = pos_backend_id(*_pos_backend[:2])
+        mlm_model = (config and config.mlm_model) or MLM_MODEL
+        with profile_stage("sentence_cache", len(sentences)):
+            # Revisions keep a persistent cache from answering with an older model's output
+            backend, pos_model = pos_id.split(":", 1)
+            pos_id = f"{pos_id}@{model_revision(pos_model, hub=backend == 'bert')}"
+            mlm_id = f"{mlm_model}@{model_revision(mlm_model)}"
+            keys = [
+                sentence_cache_key(sentence, lang, thresholds, include_imperatives, include_determinatives,
+                                   include_gender_adj, lemma_threshold, include_number_ambiguous,
+                                   pos_id, mlm_id,
+                                   engine.mlm_context_window if engine is not None else MLM_CONTEXT_WINDOW)
+                for sentence in sentences
+            ]
+            results, missing = sentence_cache.lookup_batch(keys)
         
-        filtered_alternatives = batch_filter_by_acceptability(
-            sentences_with_alternatives, logit_threshold, verbosity >= 3
+        if missing:
+            with profile_batch(len(missing)):
+                scored = score_sentences_batch(
+                    [sentences[i] for i in missing.values()], lang, api_key, timeout, max_workers,
+                    verbosity, include_imperatives, include_determinatives, include_gender_adj,
+                    lemma_threshold, include_number_ambiguous, None, engine,
+                )
+                computed = render_scored(scored, logit_threshold, logit_thresholds, verbosity)
+            if logit_thresholds is not None:
+                # JSON has no float keys; store outputs in threshold order
+                computed = [[result[threshold] for threshold in logit_thresholds] for result in computed]
+            # Lines missing alternatives because of failed lookups are not kept
+            sentence_cache.put_many((key, result) for key, result, sentence in zip(missing, computed, scored)
+                                    if not sentence.lookup_failed)
+            by_key = dict(zip(missing, computed))
+            results = [by_key[key] if result is None else result for key, result in zip(keys, results)]
+        
+        if logit_thresholds is not None:
+            results = [dict(zip(logit_thresholds, result)) for result in results]
+        return results
+    
+    with profile_batch(len(sentences)):
+        scored = score_sentences_batch(
+            sentences, lang, api_key, timeout, max_workers, verbosity,
+            include_imperatives, include_determinatives, include_gender_adj,
+            lemma_threshold, include_number_ambiguous, policy, engine,
         )
-    else:
-        filtered_alternatives = {}
+        return render_scored(scored, logit_threshold, logit_thresholds, verbosity)
+
+
+def render_scored(scored: List[ScoredSentence], logit_threshold: float,
+                  logit_thresholds: Optional[List[float]] = None, verbosity: int = 0) -> List:
+    """Output line per scored sentence, or {threshold: line} with ``logit_thresholds``."""
+    with profile_stage("output", len(scored)):
+        if logit_thresholds is not None:
+            # Acceptability metrics are recorded once, at the first threshold
+            return [{threshold: sentence.render(threshold, record_metrics=(i == 0))
+                     for i, threshold in enumerate(logit_thresholds)}
+                    for sentence in scored]
+        
+        if verbosity >= 3 and any(sentence.scores for sentence in scored):
+            logger.debug("\n🧠 BATCH ACCEPTABILITY FILTERING (threshold: %.2f)", logit_threshold)
+        return [
+            render_sentence(sentence.tokens,
+                            sentence.filtered(logit_threshold, verbosity >= 3, record_metrics=True))
+            for sentence in scored
+        ]
+
+
+def process_documents_batch(documents: List[str], lang: str, api_key: str, timeout: float,
+                            max_workers: int, logit_thresholds: Optional[List[float]] = None,
+                            **options) -> List:
+    """Process multi-sentence texts (paragraphs, speeches) sentence by sentence.
+    
+    Each document is cut with split_sentences and all sentences go through one
+    process_sentences_batch call as independent items, so POS tagging and
+    scoring inputs stay sentence-sized however long the document is. Each
+    document's output is reassembled with its original whitespace. ``options``
+    are passed to process_sentences_batch; with ``logit_thresholds`` each
+    result is a dict mapping every threshold to its output line, as there.
+    """
+    spans = [split_sentences(document) for document in documents]
+    sentences = [document[start:end] for document, doc_spans in zip(documents, spans)
+                 for start, end in doc_spans]
+    lines = iter(process_sentences_batch(sentences, lang, api_key, timeout, max_workers,
+                                         logit_thresholds=logit_thresholds, **options))
     
-    # Step 3: Build output for each sentence
     results = []
+    for document, doc_spans in zip(documents, spans):
+        doc_lines = [next(lines) for _ in doc_spans]
+        if logit_thresholds is None:
+            results.append(render_document(document, doc_spans, doc_lines))
+        else:
+            results.append({
+                threshold: render_document(document, doc_spans, [line[threshold] for line in doc_lines])
+                for threshold in logit_thresholds
+            })
+    return results
+
+
+def iter_process(sentences: Iterable[str], lang: str, api_key: str, timeout: float,
+                 max_workers: int, max_in_flight: int = 256, batch_size: int = 50,
+                 engine: Optional["AltMorph"] = None, **options) -> Iterator:
+    """Process any iterable of sentences lazily, yielding results in input order.
     
-    for sentence_data in sentences_data:
-        sentence_id = sentence_data['sentence_id']
-        tokens = sentence_data['tokens']
+    At most ``max_in_flight`` sentences are held at once, counting those being
+    looked up, scored or waiting to be yielded, so memory stays bounded for
+    inputs of any length (files, streaming datasets, sockets). Sentences are
+    scored ``batch_size`` at a time and each batch's results are yielded as
+    soon as it is scored; the Ordbank lookups of the sentences read ahead run
+    in the background meanwhile (see LookupPrefetcher). ``options`` are passed
+    to process_sentences_batch.
+    """
+    batch_size = max(1, min(batch_size, max_in_flight))
+    iterator = iter(sentences)
+    queued = deque()  # (sentences, prefetch futures) read ahead of scoring
+    in_flight = 0
+    exhausted = False
+    client = engine.client if engine is not None else None
+    
+    with LookupPrefetcher(lang, api_key, timeout, max_workers, client) as prefetcher:
+        while True:
+            while not exhausted and in_flight < max_in_flight:
+                batch = list(itertools.islice(iterator, min(batch_size, max_in_flight - in_flight)))
+                if not batch:
+                    exhausted = True
+                    break
+                queued.append((batch, prefetcher.submit(batch)))
+                in_flight += len(batch)
+            if not queued:
+                return
+            
+            batch, futures = queued.popleft()
+            prefetcher.wait(futures)
+            yield from process_sentences_batch(batch, lang, api_key, timeout, max_workers,
+                                               engine=engine, **options)
+            in_flight -= len(batch)
+
+
+# ========================= Local Lexicon =========================
+
+LEXICON_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS lemmas (
+    lang TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    lemma TEXT,
+    word_class TEXT,
+    PRIMARY KEY (lang, id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS forms (
+    lang TEXT NOT NULL,
+    form TEXT NOT NULL,
+    lemma_id INTEGER NOT NULL,
+    PRIMARY KEY (lang, form, lemma_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS paradigms (
+    lang TEXT NOT NULL,
+    lemma_id INTEGER NOT NULL,
+    entries TEXT NOT NULL,
+    PRIMARY KEY (lang, lemma_id)
+) WITHOUT ROWID;
+"""
+
+
+class OrdbankLexicon:
+    """Read-only local Ordbank lexicon stored as an indexed SQLite file.
+
+    The file is produced by ``tools/build_lexicon.py`` and holds three indexes:
+    casefolded word form -> lemma ids, lemma id -> lemma record, and
+    lemma id -> paradigm entries. Lookups return the same shapes as the
+    Ordbank API so the rest of the pipeline is unchanged.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"Lexicon not found: {self.path}")
+        self._local = threading.local()
+        self.meta = dict(self._connection().execute("SELECT key, value FROM meta"))
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections must not be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            self._local.conn = conn
+        return conn
+
+    def search_lemmas(self, word: str, lang: str) -> List[Dict]:
+        """Return lemma records with any inflected form equal to ``word``."""
+        rows = self._connection().execute(
+            "SELECT l.id, l.lemma, l.word_class FROM forms f "
+            "JOIN lemmas l ON l.lang = f.lang AND l.id = f.lemma_id "
+            "WHERE f.lang = ? AND f.form = ? ORDER BY l.id",
+            (lang, word.casefold()),
+        ).fetchall()
+        return [{"id": lemma_id, "lemma": lemma, "word_class": word_class}
+                for lemma_id, lemma, word_class in rows]
+
+    def get_inflections(self, lemma_id: int, lang: str) -> List["Inflection"]:
+        """Return paradigm entries for a lemma in ``collect_inflections`` format."""
+        row = self._connection().execute(
+            "SELECT entries FROM paradigms WHERE lang = ? AND lemma_id = ?",
+            (lang, lemma_id),
+        ).fetchone()
+        if row is None:
+            return []
+        return [Inflection(lemma_id, word_form, tags) for word_form, tags in json.loads(row[0])]
+
+    def iter_forms(self, lang: str):
+        """Yield (casefolded form, word classes of lemmas containing it)."""
+        rows = self._connection().execute(
+            "SELECT f.form, l.word_class FROM forms f "
+            "JOIN lemmas l ON l.lang = f.lang AND l.id = f.lemma_id "
+            "WHERE f.lang = ? ORDER BY f.form",
+            (lang,),
+        )
+        current, word_classes = None, set()
+        for form, word_class in rows:
+            if form != current:
+                if current is not None:
+                    yield current, word_classes
+                current, word_classes = form, set()
+            if word_class:
+                word_classes.add(word_class)
+        if current is not None:
+            yield current, word_classes
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def set_lexicon(path: Optional[str]):
+    """Use a local lexicon file instead of the Ordbank API (None to disable)."""
+    global _lexicon
+    if _lexicon is not None:
+        _lexicon.close()
+    _lexicon = OrdbankLexicon(path) if path else None
+
+
+def get_lexicon() -> Optional[OrdbankLexicon]:
+    """Get the active local lexicon, if any."""
+    return _lexicon
+
+
+# ========================= Precompiled Alternatives =========================
+
+ALTERNATIVES_TABLE_MAGIC = b"ALTMTBL2"
+_RECORD_HEADER = struct.Struct("<HI")  # key length, value length
+_RESOLUTION_HEADER = struct.Struct("<BH")  # tag fact bits, lemma count
+_FIELD_SEP = "\x1f"
+
+
+def alternatives_table_key(word: str, lang: str, pos_filter: Optional[str]) -> bytes:
+    """Build the lookup key used by the precompiled alternatives table."""
+    return _FIELD_SEP.join((lang, word.casefold(), pos_filter or "")).encode("utf-8")
+
+
+def _pack_resolution(resolution: "Resolution") -> bytes:
+    bits = resolution.imperative | resolution.gender_dependent << 1 | resolution.number_ambiguous << 2
+    return (_RESOLUTION_HEADER.pack(bits, min(resolution.lemma_count, 0xFFFF))
+            + _FIELD_SEP.join(sorted(resolution.alternatives)).encode("utf-8"))
+
+
+def _unpack_resolution(value: bytes) -> "Resolution":
+    bits, lemma_count = _RESOLUTION_HEADER.unpack_from(value)
+    payload = value[_RESOLUTION_HEADER.size:].decode("utf-8")
+    alternatives = payload.split(_FIELD_SEP) if payload else []
+    return Resolution(frozenset(alternatives), lemma_count, bool(bits & 1), bool(bits & 2), bool(bits & 4))
+
+
+def write_alternatives_table(path, items, meta: Dict) -> int:
+    """Write (key, Resolution) pairs as a hash-indexed table for AlternativesTable.
+
+    Layout: magic, header length + JSON header, open-addressing slot array of
+    uint64 record offsets (0 = empty), then records of ``<HI`` key/value
+    lengths followed by the UTF-8 key and the value: ``<BH`` tag fact bits and
+    lemma count, then the ``\\x1f``-joined alternatives (empty if there are
+    none). Flags and lemma thresholds are applied at lookup time, so one
+    record serves all of them.
+    """
+    records = bytearray()
+    offsets = []
+    for key, resolution in items:
+        value = _pack_resolution(resolution)
+        offsets.append((zlib.crc32(key), len(records)))
+        records += _RECORD_HEADER.pack(len(key), len(value)) + key + value
+
+    slot_count = 1
+    while slot_count < 2 * max(len(offsets), 1):
+        slot_count *= 2
+    mask = slot_count - 1
+    slots = array("Q", bytes(8 * slot_count))
+    for key_hash, offset in offsets:
+        slot = key_hash & mask
+        while slots[slot]:
+            slot = (slot + 1) & mask
+        slots[slot] = offset + 1
+
+    header = json.dumps(dict(meta, count=len(offsets), slots=slot_count)).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(ALTERNATIVES_TABLE_MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        f.write(slots.tobytes())
+        f.write(records)
+    return len(offsets)
+
+
+class AlternativesTable:
+    """Read-only, memory-mapped table of precomputed ``get_alternatives`` results.
+
+    Built offline by ``tools/build_alternatives_table.py``. Lookups hash the key
+    and probe a slot array in the mapped file, so no paradigm processing happens
+    at runtime and processes on the same machine share the page cache.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(ALTERNATIVES_TABLE_MAGIC)] != ALTERNATIVES_TABLE_MAGIC:
+            raise ValueError(f"Not an alternatives table (or an older format; rebuild it with "
+                             f"tools/build_alternatives_table.py): {self.path}")
+        pos = len(ALTERNATIVES_TABLE_MAGIC)
+        (header_len,) = struct.unpack_from("<I", self._mm, pos)
+        pos += 4
+        self.meta = json.loads(self._mm[pos:pos + header_len].decode("utf-8"))
+        pos += header_len
+        self._slot_count = self.meta["slots"]
+        self._slots = memoryview(self._mm)[pos:pos + 8 * self._slot_count].cast("Q")
+        self._records = pos + 8 * self._slot_count
+        self._langs = set(self.meta.get("langs", []))
+
+    def covers(self, lang: str) -> bool:
+        """Whether the table was built for this language."""
+        return lang in self._langs
+
+    def get(self, word: str, lang: str, pos_filter: Optional[str] = None) -> "Resolution":
+        """Return the stored resolution, or NO_RESOLUTION if the word has no alternatives."""
+        key = alternatives_table_key(word, lang, pos_filter)
+        mask = self._slot_count - 1
+        slot = zlib.crc32(key) & mask
+        while True:
+            offset = self._slots[slot]
+            if not offset:
+                return NO_RESOLUTION
+            start = self._records + offset - 1
+            key_len, value_len = _RECORD_HEADER.unpack_from(self._mm, start)
+            start += _RECORD_HEADER.size
+            if self._mm[start:start + key_len] == key:
+                return _unpack_resolution(self._mm[start + key_len:start + key_len + value_len])
+            slot = (slot + 1) & mask
+
+    def close(self):
+        self._slots.release()
+        self._mm.close()
+
+
+def set_alternatives_table(path: Optional[str]):
+    """Answer get_alternatives from a precompiled table (None to disable)."""
+    global _alternatives_table
+    if _alternatives_table is not None:
+        _alternatives_table.close()
+    _alternatives_table = AlternativesTable(path) if path else None
+
+
+# ========================= Paradigm Index =========================
+
+_tag_bits: Dict[str, int] = {}
+_tag_bits_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def tag_mask(tags: Tuple[str, ...]) -> int:
+    """Bitmask of the atomic tags in a tag tuple (one bit per distinct tag)."""
+    mask = 0
+    for tag in tags:
+        bit = _tag_bits.get(tag)
+        if bit is None:
+            with _tag_bits_lock:
+                bit = _tag_bits.setdefault(tag, 1 << len(_tag_bits))
+        mask |= bit
+    return mask
+
+
+def tags_mask(*tags: str) -> int:
+    """Bitmask matching any of the given atomic tags."""
+    return tag_mask(tuple(tags))
+
+
+GENDER_MASK = tags_mask('Masc/Fem', 'Neuter')
+SINGULAR_MASK = tags_mask('Sing')
+PLURAL_MASK = tags_mask('Plur')
+IMPERATIVE_TAGS = ('Imp',)
+SIMPLE_VERB_TAGS = frozenset({('Past',), ('Pres',), ('Inf',), ('Imp',)})
+
+_interned_tags: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def intern_tags(tags) -> Tuple[str, ...]:
+    """Return the shared instance of a tag tuple."""
+    key = tuple(tags)
+    interned = _interned_tags.get(key)
+    if interned is None:
+        interned = tuple(sys.intern(tag) for tag in key)
+        interned = _interned_tags.setdefault(interned, interned)
+    return interned
+
+
+class Inflection:
+    """Compact inflection entry with interned word form and tag tuple.
+
+    Supports ``entry["word_form"]`` style access so it can stand in for the
+    ``{"lemma_id", "word_form", "tags"}`` dicts returned by the API.
+    """
+
+    __slots__ = ("lemma_id", "word_form", "tags")
+
+    def __init__(self, lemma_id: int, word_form: str, tags):
+        self.lemma_id = lemma_id
+        self.word_form = sys.intern(word_form)
+        self.tags = intern_tags(tags)
+
+    @classmethod
+    def from_dict(cls, entry: Dict) -> "Inflection":
+        return cls(entry["lemma_id"], entry["word_form"], entry["tags"])
+
+    def to_dict(self) -> Dict:
+        return {"lemma_id": self.lemma_id, "word_form": self.word_form, "tags": list(self.tags)}
+
+    def __getitem__(self, key: str):
+        return getattr(self, key)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Inflection):
+            return NotImplemented
+        return (self.lemma_id, self.word_form, self.tags) == (other.lemma_id, other.word_form, other.tags)
+
+    def __hash__(self) -> int:
+        return hash((self.lemma_id, self.word_form, self.tags))
+
+    def __repr__(self) -> str:
+        return f"Inflection({self.lemma_id!r}, {self.word_form!r}, {self.tags!r})"
+
+
+class Paradigm:
+    """Indexed inflection paradigm for one or more lemmas.
+
+    Holds the Inflection records together with a casefolded form -> tags
+    index and a tags -> forms index, so tag matching and alternative
+    collection are dictionary and set operations instead of linear scans.
+    """
+
+    __slots__ = ("lemma_ids", "inflections", "_form_tags", "_tag_forms")
+
+    def __init__(self, inflections: List, lemma_ids: Tuple[int, ...] = ()):
+        self.lemma_ids = tuple(lemma_ids)
+        self.inflections = [
+            inf if isinstance(inf, Inflection) else Inflection.from_dict(inf)
+            for inf in inflections
+        ]
+        self._form_tags: Dict[str, Set[Tuple[str, ...]]] = {}
+        self._tag_forms: Dict[Tuple[str, ...], List[str]] = {}
+        for inflection in self.inflections:
+            word_form, tags = inflection.word_form, inflection.tags
+            self._form_tags.setdefault(sys.intern(word_form.casefold()), set()).add(tags)
+            forms = self._tag_forms.setdefault(tags, [])
+            if word_form not in forms:
+                forms.append(word_form)
+
+    @classmethod
+    def merge(cls, paradigms: List["Paradigm"]) -> "Paradigm":
+        """Combine the paradigms of several lemmas into one index."""
+        if len(paradigms) == 1:
+            return paradigms[0]
+        inflections = [inf for paradigm in paradigms for inf in paradigm.inflections]
+        lemma_ids = tuple(lemma_id for paradigm in paradigms for lemma_id in paradigm.lemma_ids)
+        return cls(inflections, lemma_ids)
+
+    def __len__(self) -> int:
+        return len(self.inflections)
+
+    def has_form(self, word: str) -> bool:
+        """Whether any inflection equals ``word`` (casefolded)."""
+        return word.casefold() in self._form_tags
+
+    def tags_for(self, word: str) -> Set[Tuple[str, ...]]:
+        """All tag tuples carried by ``word`` in this paradigm."""
+        return self._form_tags.get(word.casefold(), set())
+
+    def forms_with_tags(self, tag_set) -> Set[str]:
+        """All word forms carrying one of the given tag tuples."""
+        return {form for tags in tag_set for form in self._tag_forms.get(tags, ())}
+
+
+class Resolution(NamedTuple):
+    """Flag-independent result of resolving one (word, lang, POS).
+
+    Holds the alternatives as if every include_* flag were on and no lemma
+    threshold applied, plus the facts those settings test. ``apply`` turns it
+    into the get_alternatives result for any flag combination without touching
+    Ordbank or paradigms, so one resolution serves every policy. ``failed``
+    marks a resolution cut short by a failed Ordbank request; it has no
+    alternatives and is never cached.
+    """
+    alternatives: FrozenSet[str]  # empty when the word never has alternatives
+    lemma_count: int
+    imperative: bool = False
+    gender_dependent: bool = False
+    number_ambiguous: bool = False
+    failed: bool = False
+
+    def apply(self, include_imperatives: bool = False, include_gender_adj: bool = False,
+              lemma_threshold: int = 1, include_number_ambiguous: bool = False,
+              debug: bool = False) -> Optional[Set[str]]:
+        """The alternatives under these flags, or None if the word gets none."""
+        if not self.alternatives:
+            return None
         
-        # Get filtered alternatives for this sentence
-        position_alternatives = filtered_alternatives.get(sentence_id, {})
+        # Filter by lemma threshold to avoid semantic confusion
+        if self.lemma_count > lemma_threshold:
+            if debug:
+                logger.debug("   🚫 LEMMA THRESHOLD: Word spans %d lemmas (threshold: %d) - avoiding semantic confusion", 
+                            self.lemma_count, lemma_threshold)
+            return None
         
-        # Build output with alternatives
-        output_parts = []
-        for i, token in enumerate(tokens):
-            if not is_word(token):
-                output_parts.append(token)
-            else:
-                alternatives = position_alternatives.get(i)
-                if alternatives and len(alternatives) > 1:
-                    sorted_alts = sorted(alternatives)
-                    output_parts.append("{" + ", ".join(sorted_alts) + "}")
-                else:
-                    output_parts.append(token)
+        if _flag_rejects(self.imperative, self.gender_dependent, self.number_ambiguous,
+                         include_imperatives, include_gender_adj, include_number_ambiguous, debug):
+            return None
         
-        raw_result = "".join(output_parts)
-        clean_result = postprocess_punctuation(raw_result)
-        results.append(clean_result)
-    
-    return results
+        return set(self.alternatives)
+
+
+NO_RESOLUTION = Resolution(frozenset(), 0)
+FAILED_RESOLUTION = Resolution(frozenset(), 0, failed=True)
 
 
 # ========================= Ordbank API =========================
 
-def http_get(url: str, headers: Dict[str, str], timeout: float) -> Optional[List]:
-    """HTTP GET with retries."""
-    for attempt in range(3):
-        try:
-            response = SESSION.get(url, headers=headers, timeout=timeout)
-            if response.status_code == 200:
-                return response.json()
-            logger.debug(
-                "HTTP %s for %s (attempt %d/3)",
-                response.status_code,
-                url,
-                attempt + 1,
-            )
-        except requests.RequestException as e:
-            logger.debug("Request failed (attempt %d/3): %r", attempt + 1, e)
-            if attempt < 2:
-                time.sleep(0.75)
-    return None
+class OrdbankClient:
+    """Ordbank access with its own HTTP session, file cache and paradigm index.
 
+    Answers lookups from a precompiled alternatives table or a local lexicon
+    when given one, otherwise from the file cache and then the API. AltMorph
+    engines each own a client; the module-level functions below use a default
+    client configured by set_cache_enabled, set_lexicon and
+    set_alternatives_table.
+    """
 
-def search_lemmas(word: str, lang: str, headers: Dict[str, str], timeout: float,
-                 pos_filter: Optional[str] = None, debug: bool = False) -> List[Dict]:
-    """Search for lemmas matching the word."""
-    # Check cache first
-    cache_key = make_cache_key("lemmas", word.casefold(), lang, pos_filter or "None")
-    cached_result = load_from_cache(cache_key)
-    if cached_result is not None:
-        if debug:
-            logger.debug("💾 CACHE HIT: lemmas for '%s' (POS: %s)", word, pos_filter or 'None')
-        return cached_result
-    
-    if debug:
-        logger.debug("🌐 CACHE MISS: fetching lemmas for '%s' from API", word)
-    
-    query = requests.utils.quote(word.casefold())
-    url = (f"{API_BASE}/lemmas?query={query}&stubs=false&include_dict_links=true"
-           f"&extended_vocabulary=true&language={lang}&search_inflection=true")
-    
-    result = http_get(url, headers, timeout) or []
-    
-    # Filter by POS if specified
-    if pos_filter and result:
-        result = [lemma for lemma in result 
-                 if lemma.get('word_class') == pos_filter]
-        if debug:
-            logger.debug(
-                "POS filtering: %d lemmas remain after filtering for %s",
-                len(result),
-                pos_filter,
-            )
-    
-    # Save to cache
-    save_to_cache(cache_key, result)
-    
-    return result
+    def __init__(self, api_base: str = API_BASE, cache_dir=None, cache_enabled: bool = True,
+                 lexicon: Optional["OrdbankLexicon"] = None,
+                 alternatives_table: Optional["AlternativesTable"] = None,
+                 max_connections: int = 10):
+        self.api_base = api_base
+        self.cache_dir = Path(cache_dir) if cache_dir else Path.home() / ".ordbank_cache"
+        self.cache_enabled = cache_enabled
+        self.lexicon = lexicon
+        self.alternatives_table = alternatives_table
+        self.paradigms: Dict[Tuple[int, str], Paradigm] = {}
+        self.resolutions: Dict[Tuple[str, str, Optional[str]], Resolution] = {}
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def ensure_cache_dir(self):
+        """Ensure cache directory exists."""
+        if self.cache_enabled:
+            self.cache_dir.mkdir(exist_ok=True)
+
+    def delete_cache(self):
+        """Delete all cache files."""
+        self.paradigms.clear()
+        self.resolutions.clear()
+        if self.cache_dir.exists():
+            cache_files = list(self.cache_dir.glob("*.json"))
+            file_count = len(cache_files)
+            for cache_file in cache_files:
+                cache_file.unlink()
+            logger.info("Cache cleared: deleted %d files", file_count)
+        else:
+            logger.info("Cache cleared: no cache directory found")
+
+    def load_from_cache(self, cache_key: str) -> Optional[any]:
+        """Load data from cache file."""
+        if not self.cache_enabled:
+            return None
+        
+        cache_file = self.cache_dir / f"{cache_key}.json"
+        with profile_stage("cache_read") as stage:
+            if cache_file.exists():
+                try:
+                    with open(cache_file, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                        CACHE_HITS.inc(kind=cache_key.split("_", 1)[0])
+                        stage.add(1)
+                        stage.annotate(key=cache_key, hit=True)
+                        return data
+                except (json.JSONDecodeError, IOError) as e:
+                    logger.warning("Failed to load cache file %s: %s", cache_file, e)
+                    # Delete corrupted cache file
+                    cache_file.unlink(missing_ok=True)
+            stage.annotate(key=cache_key, hit=False)
+        
+        CACHE_MISSES.inc(kind=cache_key.split("_", 1)[0])
+        return None
 
+    def save_to_cache(self, cache_key: str, data: any):
+        """Save data to cache file."""
+        if not self.cache_enabled:
+            return
+        
+        self.ensure_cache_dir()
+        cache_file = self.cache_dir / f"{cache_key}.json"
+        try:
+            with profile_stage("cache_write", 1), open(cache_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        except IOError as e:
+            logger.warning("Failed to save cache file %s: %s", cache_file, e)
+
+    def http_get(self, url: str, headers: Dict[str, str], timeout: float) -> Optional[List]:
+        """HTTP GET with retries."""
+        with profile_stage("http") as stage:
+            for attempt in range(3):
+                stage.add(1)
+                error = None
+                with trace_span("http_attempt", url=url, attempt=attempt + 1) as span:
+                    request_start = time.perf_counter()
+                    try:
+                        response = self.session.get(url, headers=headers, timeout=timeout)
+                        HTTP_LATENCY.observe(time.perf_counter() - request_start)
+                        HTTP_REQUESTS.inc(status=response.status_code)
+                        span.annotate(status=response.status_code)
+                        if response.status_code == 200:
+                            return response.json()
+                        logger.debug(
+                            "HTTP %s for %s (attempt %d/3)",
+                            response.status_code,
+                            url,
+                            attempt + 1,
+                        )
+                    except requests.RequestException as e:
+                        HTTP_LATENCY.observe(time.perf_counter() - request_start)
+                        HTTP_REQUESTS.inc(status="error")
+                        span.annotate(error=repr(e))
+                        logger.debug("Request failed (attempt %d/3): %r", attempt + 1, e)
+                        error = e
+                if error is not None and attempt < 2:
+                    with trace_span("http_backoff", seconds=0.75):
+                        time.sleep(0.75)
+        return None
 
-def collect_inflections(lemma_ids: List[int], lang: str, headers: Dict[str, str], 
-                       timeout: float, debug: bool = False) -> List[Dict]:
-    """Collect all inflections for given lemma IDs."""
-    inflections = []
+    def lookup_lemmas(self, word: str, lang: str, headers: Dict[str, str], timeout: float,
+                      debug: bool = False) -> Optional[List[Dict]]:
+        """Look up all lemmas containing the word, without POS filtering.
+        
+        Uses the local lexicon if set, otherwise the cache and then the API.
+        Returns None if the API request failed; failures are not cached.
+        """
+        if self.lexicon is not None:
+            return self.lexicon.search_lemmas(word, lang)
+        
+        # Check cache first
+        cache_key = make_cache_key("lemmas", word.casefold(), lang)
+        cached_result = self.load_from_cache(cache_key)
+        if cached_result is not None:
+            if debug:
+                logger.debug("💾 CACHE HIT: lemmas for '%s'", word)
+            return cached_result
+        
+        if debug:
+            logger.debug("🌐 CACHE MISS: fetching lemmas for '%s' from API", word)
+        
+        query = requests.utils.quote(word.casefold())
+        url = (f"{self.api_base}/lemmas?query={query}&stubs=false&include_dict_links=true"
+               f"&extended_vocabulary=true&language={lang}&search_inflection=true")
+        
+        result = self.http_get(url, headers, timeout)
+        if result is None:
+            return None
+        if not isinstance(result, list):
+            result = []
+        
+        # Save to cache
+        self.save_to_cache(cache_key, result)
+        
+        return result
 
-    for lemma_id in lemma_ids:
+    def search_lemmas(self, word: str, lang: str, headers: Dict[str, str], timeout: float,
+                     pos_filter: Optional[str] = None, debug: bool = False) -> List[Dict]:
+        """Search for lemmas matching the word."""
+        result = self.lookup_lemmas(word, lang, headers, timeout, debug) or []
+        
+        # Filter by POS if specified
+        if pos_filter and result:
+            result = [lemma for lemma in result 
+                     if lemma.get('word_class') == pos_filter]
+            if debug:
+                logger.debug(
+                    "POS filtering: %d lemmas remain after filtering for %s",
+                    len(result),
+                    pos_filter,
+                )
+        
+        return result
+
+    def lookup_inflections(self, lemma_id: int, lang: str, headers: Dict[str, str],
+                           timeout: float, debug: bool = False) -> Optional[List[Inflection]]:
+        """Look up the inflections of one lemma via lexicon, cache or API.
+        
+        Returns None if the API request failed; failures are not cached.
+        """
+        if self.lexicon is not None:
+            return self.lexicon.get_inflections(lemma_id, lang)
+        
         # Check cache first for this specific lemma
         cache_key = make_cache_key("inflections", lemma_id, lang)
-        cached_entries = load_from_cache(cache_key)
+        cached_entries = self.load_from_cache(cache_key)
         
         if cached_entries is not None:
             if debug:
                 logger.debug("💾 CACHE HIT: inflections for lemma %d", lemma_id)
-            inflections.extend(cached_entries)
-            continue
+            return [Inflection.from_dict(entry) for entry in cached_entries]
         
         if debug:
             logger.debug("🌐 CACHE MISS: fetching inflections for lemma %d from API", lemma_id)
         
         # Use the correct API endpoint - query by ID, not direct access
-        url = (f"{API_BASE}/lemmas?query={lemma_id}&stubs=false&include_dict_links=true"
+        url = (f"{self.api_base}/lemmas?query={lemma_id}&stubs=false&include_dict_links=true"
                f"&extended_vocabulary=true&language={lang}&search_inflection=false")
 
-        data = http_get(url, headers, timeout)
+        data = self.http_get(url, headers, timeout)
+        if data is None:
+            return None
         if not isinstance(data, list) or not data:
             # Cache empty result to avoid repeated API calls for non-existent lemmas
-            save_to_cache(cache_key, [])
-            continue
+            self.save_to_cache(cache_key, [])
+            return []
 
         lemma_data = data[0]  # Take first result
 
         entries = [
-            {
-                "lemma_id": lemma_id,
-                "word_form": entry.get("word_form"),
-                "tags": tuple(entry.get("tags", [])),
-            }
+            Inflection(lemma_id, entry.get("word_form"), entry.get("tags", []))
             for paradigm in lemma_data.get("paradigm_info", [])
             for entry in paradigm.get("inflection", [])
             if isinstance(entry.get("word_form"), str)
@@ -821,66 +2494,279 @@ def collect_inflections(lemma_ids: List[int], lang: str, headers: Dict[str, str]
         ]
         
         # Save to cache
-        save_to_cache(cache_key, entries)
-        inflections.extend(entries)
+        self.save_to_cache(cache_key, [entry.to_dict() for entry in entries])
+        
+        return entries
+
+    def collect_inflections(self, lemma_ids: List[int], lang: str, headers: Dict[str, str], 
+                           timeout: float, debug: bool = False) -> Optional[List[Inflection]]:
+        """Collect all inflections for given lemma IDs, or None if a lookup failed."""
+        inflections = []
+        for lemma_id in lemma_ids:
+            entries = self.lookup_inflections(lemma_id, lang, headers, timeout, debug)
+            if entries is None:
+                return None
+            inflections.extend(entries)
+        return inflections
+
+    def get_paradigm(self, lemma_id: int, lang: str, headers: Dict[str, str], timeout: float,
+                     debug: bool = False) -> Optional[Paradigm]:
+        """Get the indexed paradigm for a lemma, keeping it in memory once built.
+        
+        Returns None if the inflections could not be fetched; nothing is kept,
+        so a later call retries.
+        """
+        key = (lemma_id, lang)
+        paradigm = self.paradigms.get(key)
+        if paradigm is None:
+            inflections = self.collect_inflections([lemma_id], lang, headers, timeout, debug)
+            if inflections is None:
+                return None
+            paradigm = Paradigm(inflections, (lemma_id,))
+            if self.cache_enabled:
+                self.paradigms[key] = paradigm
+        return paradigm
+
+    def resolve_alternatives(self, word: str, lang: str, headers: Dict[str, str], timeout: float,
+                             pos_filter: Optional[str] = None, debug: bool = False) -> Resolution:
+        """Resolve a word once per (word, lang, POS), independent of the include_* flags.
+        
+        Results are kept in memory (unless caching is disabled); failed
+        lookups are not, so a later call retries them.
+        """
+        key = (word.casefold(), lang, pos_filter)
+        resolution = self.resolutions.get(key)
+        if resolution is not None:
+            return resolution
+        
+        # Search for lemmas
+        lemmas = self.lookup_lemmas(word, lang, headers, timeout, debug)
+        if lemmas is None:
+            return FAILED_RESOLUTION
+        if pos_filter:
+            lemmas = [lemma for lemma in lemmas if lemma.get('word_class') == pos_filter]
+        resolution = self._resolve(word, lang, headers, timeout, pos_filter, lemmas, debug)
+        if self.cache_enabled and not resolution.failed:
+            self.resolutions[key] = resolution
+        return resolution
+
+    def _resolve(self, word: str, lang: str, headers: Dict[str, str], timeout: float,
+                 pos_filter: Optional[str], lemmas: List[Dict], debug: bool) -> Resolution:
+        if not lemmas:
+            return NO_RESOLUTION
+
+        if debug:
+            logger.debug("📝 FOUND %d LEMMAS for %s", len(lemmas), word)
+            for i, lemma in enumerate(lemmas):
+                logger.debug("   [%d] ID: %s, lemma: %s, class: %s", 
+                            i+1, lemma.get("id"), lemma.get("lemma"), lemma.get("word_class"))
+        
+        # Find all lemmas that contain the target word
+        matching_paradigms = []
+        
+        for lemma in lemmas:
+            if "id" not in lemma:
+                continue
+                
+            lemma_id = int(lemma["id"])
+            paradigm = self.get_paradigm(lemma_id, lang, headers, timeout, debug)
+            if paradigm is None:
+                if debug:
+                    logger.debug("   💥 LEMMA %d: inflection lookup failed", lemma_id)
+                return FAILED_RESOLUTION
+            
+            # Check if this lemma contains our target word
+            if paradigm.has_form(word):
+                matching_paradigms.append(paradigm)
+                if debug:
+                    logger.debug("   ✅ LEMMA %d: Contains '%s' (%d inflections)", 
+                                lemma_id, word, len(paradigm))
+            elif debug:
+                logger.debug("   ❌ LEMMA %d: Does NOT contain '%s'", lemma_id, word)
+        
+        if not matching_paradigms:
+            if debug:
+                logger.debug("   💥 NO LEMMAS contain the target word '%s'", word)
+            return NO_RESOLUTION
+
+        # Combine all alternatives from matching lemmas
+        combined = Paradigm.merge(matching_paradigms)
+        
+        if debug:
+            logger.debug("📋 COMBINED INFLECTIONS from %d matching lemmas:", len(matching_paradigms))
+            for i, inf in enumerate(combined.inflections):
+                logger.debug("   [%d] word_form='%s', tags=%s", i+1, inf["word_form"], inf["tags"])
+            logger.debug("   Total: %d inflections", len(combined))
+        
+        # Find matching grammatical tags; the include_* flags are applied later
+        matching_tags = set(combined.tags_for(word))
+        if debug:
+            logger.debug("🏷️ FINDING TAGS FOR: %s", word)
+            for tags in matching_tags:
+                logger.debug("   Found match: %s -> %s", word, tags)
+        imperative, gender_dependent, number_ambiguous = classify_tags(matching_tags, pos_filter)
+        matching_tags = prioritize_tags(matching_tags, debug)
+        
+        # Collect alternatives with matching tags
+        alternatives = combined.forms_with_tags(matching_tags)
+        
+        if debug:
+            logger.debug("🔍 COLLECTING ALTERNATIVES WITH MATCHING TAGS:")
+            for tags in matching_tags:
+                logger.debug("   ✅ %s (tags: %s)", sorted(combined.forms_with_tags([tags])), tags)
+            logger.debug("   Final alternatives: %s", sorted(alternatives))
+        
+        # Only keep alternatives if there are real ones
+        if len({alt.casefold() for alt in alternatives}) <= 1:
+            alternatives = set()
+
+        return Resolution(frozenset(alternatives), len(matching_paradigms),
+                          imperative, gender_dependent, number_ambiguous)
+
+    def find_resolution(self, word: str, lang: str, headers: Dict[str, str], timeout: float,
+                        pos_filter: Optional[str] = None, debug: bool = False) -> Resolution:
+        """Resolve a word from the precompiled table if it covers ``lang``, else resolve_alternatives."""
+        with trace_span("get_alternatives", word=word, pos=pos_filter):
+            table = self.alternatives_table
+            if table is not None and table.covers(lang):
+                return table.get(word, lang, pos_filter)
+            return self.resolve_alternatives(word, lang, headers, timeout, pos_filter, debug)
+
+    def get_alternatives(self, word: str, lang: str, headers: Dict[str, str], timeout: float,
+                        pos_filter: Optional[str] = None, debug: bool = False, 
+                        include_imperatives: bool = False, include_gender_adj: bool = False,
+                        lemma_threshold: int = 1, include_number_ambiguous: bool = False) -> Optional[Set[str]]:
+        """Get alternative forms for a word.
+        
+        Resolves the word once (precompiled table, memory or Ordbank) and then
+        applies the flags and lemma threshold as a constant-time post-filter.
+        """
+        resolution = self.find_resolution(word, lang, headers, timeout, pos_filter, debug)
+        return resolution.apply(include_imperatives, include_gender_adj, lemma_threshold,
+                                include_number_ambiguous, debug)
+
+    def close(self):
+        """Close the HTTP session, lexicon and table; the file cache is kept."""
+        self.session.close()
+        if self.lexicon is not None:
+            self.lexicon.close()
+        if self.alternatives_table is not None:
+            self.alternatives_table.close()
+        self.paradigms.clear()
+        self.resolutions.clear()
+
+
+class _ModuleClient(OrdbankClient):
+    """Default client behind the module-level functions.
+
+    Reads the module settings (SESSION, API_BASE, set_cache_enabled,
+    set_lexicon, set_alternatives_table) on every call, so changing them
+    affects later lookups.
+    """
 
-    return inflections
+    def __init__(self):
+        self.paradigms = _paradigm_cache
+        self.resolutions = _resolution_cache
 
+    session = property(lambda self: SESSION)
+    api_base = property(lambda self: API_BASE)
+    cache_dir = property(lambda self: _cache_dir)
+    cache_enabled = property(lambda self: _cache_enabled)
+    lexicon = property(lambda self: _lexicon)
+    alternatives_table = property(lambda self: _alternatives_table)
 
-def find_matching_tags(target_word: str, inflections: List[Dict], pos_tag: Optional[str] = None,
-                      debug: bool = False, include_imperatives: bool = False, 
-                      include_gender_adj: bool = False, include_number_ambiguous: bool = False) -> Set[Tuple[str, ...]]:
-    """Find grammatical tags that match the target word."""
-    target_lower = target_word.casefold()
-    matching_tags = set()
+    def close(self):
+        pass
+
+
+_default_client = _ModuleClient()
+
+
+def http_get(url: str, headers: Dict[str, str], timeout: float) -> Optional[List]:
+    """HTTP GET with retries."""
+    return _default_client.http_get(url, headers, timeout)
+
+
+def lookup_lemmas(word: str, lang: str, headers: Dict[str, str], timeout: float,
+                  debug: bool = False) -> Optional[List[Dict]]:
+    """Look up all lemmas containing the word, without POS filtering.
     
-    if debug:
-        logger.debug("🏷️ FINDING TAGS FOR: %s", target_word)
+    Uses the local lexicon if set, otherwise the cache and then the API.
+    Returns None if the API request failed; failures are not cached.
+    """
+    return _default_client.lookup_lemmas(word, lang, headers, timeout, debug)
+
+
+def search_lemmas(word: str, lang: str, headers: Dict[str, str], timeout: float,
+                 pos_filter: Optional[str] = None, debug: bool = False) -> List[Dict]:
+    """Search for lemmas matching the word."""
+    return _default_client.search_lemmas(word, lang, headers, timeout, pos_filter, debug)
+
+
+def lookup_inflections(lemma_id: int, lang: str, headers: Dict[str, str],
+                       timeout: float, debug: bool = False) -> Optional[List[Inflection]]:
+    """Look up the inflections of one lemma via lexicon, cache or API.
     
-    for inflection in inflections:
-        if inflection["word_form"].casefold() == target_lower:
-            matching_tags.add(inflection["tags"])
+    Returns None if the API request failed; failures are not cached.
+    """
+    return _default_client.lookup_inflections(lemma_id, lang, headers, timeout, debug)
+
+
+def collect_inflections(lemma_ids: List[int], lang: str, headers: Dict[str, str], 
+                       timeout: float, debug: bool = False) -> Optional[List[Inflection]]:
+    """Collect all inflections for given lemma IDs, or None if a lookup failed."""
+    return _default_client.collect_inflections(lemma_ids, lang, headers, timeout, debug)
+
+
+def get_paradigm(lemma_id: int, lang: str, headers: Dict[str, str], timeout: float,
+                 debug: bool = False) -> Optional[Paradigm]:
+    """Get the indexed paradigm for a lemma, or None if its inflections could not be fetched."""
+    return _default_client.get_paradigm(lemma_id, lang, headers, timeout, debug)
+
+
+def classify_tags(matching_tags: Set[Tuple[str, ...]], pos_tag: Optional[str]) -> Tuple[bool, bool, bool]:
+    """What the include_* flags test: (imperative, gender-dependent ADJ, number-ambiguous NOUN)."""
+    imperative = IMPERATIVE_TAGS in matching_tags
+    masks = [tag_mask(tags) for tags in matching_tags]
+    gender_dependent = pos_tag == 'ADJ' and any(mask & GENDER_MASK for mask in masks)
+    number_ambiguous = (pos_tag == 'NOUN'
+                        and any(mask & SINGULAR_MASK for mask in masks)
+                        and any(mask & PLURAL_MASK for mask in masks))
+    return imperative, gender_dependent, number_ambiguous
+
+
+def prioritize_tags(matching_tags: Set[Tuple[str, ...]], debug: bool = False) -> Set[Tuple[str, ...]]:
+    """Prefer simple verb tags when a word matches several tag tuples."""
+    if len(matching_tags) > 1:
+        simple_tags = matching_tags & SIMPLE_VERB_TAGS
+        if simple_tags:
             if debug:
-                logger.debug("   Found match: %s -> %s", inflection["word_form"], inflection["tags"])
+                logger.debug("   Prioritized simple verb tags: %s", simple_tags)
+            return simple_tags
+    return matching_tags
+
+
+def find_matching_tags(target_word: str, inflections, pos_tag: Optional[str] = None,
+                      debug: bool = False, include_imperatives: bool = False, 
+                      include_gender_adj: bool = False, include_number_ambiguous: bool = False) -> Set[Tuple[str, ...]]:
+    """Find grammatical tags that match the target word.
     
-    # Filter out imperatives unless explicitly requested
-    if not include_imperatives:
-        has_imperative = any(len(tags) == 1 and tags[0] == 'Imp' 
-                            for tags in matching_tags)
-        if has_imperative:
-            if debug:
-                logger.debug("   Word could be imperative - skipping alternatives (use --include_imperatives to override)")
-            return set()
+    ``inflections`` is a Paradigm or a list of inflection entries.
+    """
+    paradigm = inflections if isinstance(inflections, Paradigm) else Paradigm(inflections)
+    matching_tags = set(paradigm.tags_for(target_word))
     
-    # Filter out gender-dependent adjectives unless explicitly requested
-    if pos_tag == 'ADJ' and not include_gender_adj:
-        has_gender_variants = any(
-            any(gender_marker in str(tags) for gender_marker in ['Masc/Fem', 'Neuter'])
-            for tags in matching_tags
-        )
-        if has_gender_variants:
-            if debug:
-                logger.debug("   ADJ has gender-dependent forms - skipping alternatives (use --include_gender_adj for agreement forms)")
-            return set()
+    if debug:
+        logger.debug("🏷️ FINDING TAGS FOR: %s", target_word)
+        for tags in matching_tags:
+            logger.debug("   Found match: %s -> %s", target_word, tags)
     
-    # Filter out number-ambiguous nouns unless explicitly requested
-    if pos_tag == 'NOUN' and not include_number_ambiguous:
-        has_singular = any('Sing' in str(tags) for tags in matching_tags)
-        has_plural = any('Plur' in str(tags) for tags in matching_tags)
-        if has_singular and has_plural:
-            if debug:
-                logger.debug("   NOUN has both singular and plural forms - skipping alternatives (use --include_number_ambiguous to override)")
-            return set()
+    imperative, gender_dependent, number_ambiguous = classify_tags(matching_tags, pos_tag)
+    if _flag_rejects(imperative, gender_dependent, number_ambiguous, include_imperatives,
+                     include_gender_adj, include_number_ambiguous, debug):
+        return set()
     
-    # Prioritize simple verb tags over complex ones
-    if len(matching_tags) > 1:
-        simple_verb_tags = {'Past', 'Pres', 'Inf', 'Imp'}
-        simple_tags = {tags for tags in matching_tags 
-                      if len(tags) == 1 and tags[0] in simple_verb_tags}
-        if simple_tags:
-            if debug:
-                logger.debug("   Prioritized simple verb tags: %s", simple_tags)
-            matching_tags = simple_tags
+    matching_tags = prioritize_tags(matching_tags, debug)
     
     if debug:
         logger.debug("   Final matching tags: %s", matching_tags)
@@ -888,98 +2774,45 @@ def find_matching_tags(target_word: str, inflections: List[Dict], pos_tag: Optio
     return matching_tags
 
 
-def get_alternatives(word: str, lang: str, headers: Dict[str, str], timeout: float,
-                    pos_filter: Optional[str] = None, debug: bool = False, 
-                    include_imperatives: bool = False, include_gender_adj: bool = False,
-                    lemma_threshold: int = 1, include_number_ambiguous: bool = False) -> Optional[Set[str]]:
-    """Get alternative forms for a word."""
-    # Search for lemmas
-    lemmas = search_lemmas(word, lang, headers, timeout, pos_filter, debug)
-    if not lemmas:
-        return None
-
-    if debug:
-        logger.debug("📝 FOUND %d LEMMAS for %s", len(lemmas), word)
-        for i, lemma in enumerate(lemmas):
-            logger.debug("   [%d] ID: %s, lemma: %s, class: %s", 
-                        i+1, lemma.get("id"), lemma.get("lemma"), lemma.get("word_class"))
-    
-    # Find all lemmas that contain the target word
-    matching_lemmas = []
-    target_word_lower = word.casefold()
+def _flag_rejects(imperative: bool, gender_dependent: bool, number_ambiguous: bool,
+                  include_imperatives: bool, include_gender_adj: bool,
+                  include_number_ambiguous: bool, debug: bool = False) -> bool:
+    """Whether the include_* flags rule out alternatives for a word with these tag facts."""
+    # Filter out imperatives unless explicitly requested
+    if imperative and not include_imperatives:
+        if debug:
+            logger.debug("   Word could be imperative - skipping alternatives (use --include_imperatives to override)")
+        return True
     
-    for lemma in lemmas:
-        if "id" not in lemma:
-            continue
-            
-        lemma_id = int(lemma["id"])
-        inflections = collect_inflections([lemma_id], lang, headers, timeout, debug)
-        
-        # Check if this lemma contains our target word
-        contains_word = any(inf["word_form"].casefold() == target_word_lower 
-                           for inf in inflections)
-        
-        if contains_word:
-            matching_lemmas.append({
-                "id": lemma_id, 
-                "inflections": inflections,
-                "lemma_info": lemma
-            })
-            if debug:
-                logger.debug("   ✅ LEMMA %d: Contains '%s' (%d inflections)", 
-                            lemma_id, word, len(inflections))
-        elif debug:
-            logger.debug("   ❌ LEMMA %d: Does NOT contain '%s'", lemma_id, word)
+    # Filter out gender-dependent adjectives unless explicitly requested
+    if gender_dependent and not include_gender_adj:
+        if debug:
+            logger.debug("   ADJ has gender-dependent forms - skipping alternatives (use --include_gender_adj for agreement forms)")
+        return True
     
-    if not matching_lemmas:
+    # Filter out number-ambiguous nouns unless explicitly requested
+    if number_ambiguous and not include_number_ambiguous:
         if debug:
-            logger.debug("   💥 NO LEMMAS contain the target word '%s'", word)
-        return None
+            logger.debug("   NOUN has both singular and plural forms - skipping alternatives (use --include_number_ambiguous to override)")
+        return True
+    
+    return False
 
-    # Filter by lemma threshold to avoid semantic confusion
-    if len(matching_lemmas) > lemma_threshold:
-        if debug:
-            logger.debug("   🚫 LEMMA THRESHOLD: Word spans %d lemmas (threshold: %d) - avoiding semantic confusion", 
-                        len(matching_lemmas), lemma_threshold)
-        return None
 
-    # Combine all alternatives from matching lemmas
-    all_inflections = []
-    for lemma_data in matching_lemmas:
-        all_inflections.extend(lemma_data["inflections"])
-    
-    if debug:
-        logger.debug("📋 COMBINED INFLECTIONS from %d matching lemmas:", len(matching_lemmas))
-        for i, inf in enumerate(all_inflections):
-            logger.debug("   [%d] word_form='%s', tags=%s", i+1, inf["word_form"], inf["tags"])
-        logger.debug("   Total: %d inflections", len(all_inflections))
-    
-    # Find matching grammatical tags
-    matching_tags = find_matching_tags(word, all_inflections, pos_filter, debug, 
-                                     include_imperatives, include_gender_adj, include_number_ambiguous)
-    if not matching_tags:
-        return None
+def resolve_alternatives(word: str, lang: str, headers: Dict[str, str], timeout: float,
+                         pos_filter: Optional[str] = None, debug: bool = False) -> "Resolution":
+    """Unfiltered alternatives for a word plus the tag facts the flags need (see Resolution)."""
+    return _default_client.resolve_alternatives(word, lang, headers, timeout, pos_filter, debug)
 
-    # Collect alternatives with matching tags
-    alternatives = set()
-    if debug:
-        logger.debug("🔍 COLLECTING ALTERNATIVES WITH MATCHING TAGS:")
-    for inflection in all_inflections:
-        if inflection["tags"] in matching_tags:
-            alternatives.add(inflection["word_form"])
-            if debug:
-                logger.debug("   ✅ %s (tags: %s)", inflection["word_form"], inflection["tags"])
-        elif debug:
-            logger.debug("   ❌ %s (tags: %s) - doesn't match", inflection["word_form"], inflection["tags"])
-    
-    if debug:
-        logger.debug("   Final alternatives: %s", sorted(alternatives))
-    
-    # Only return if we have real alternatives
-    if len({alt.casefold() for alt in alternatives}) <= 1:
-        return None
 
-    return alternatives
+def get_alternatives(word: str, lang: str, headers: Dict[str, str], timeout: float,
+                    pos_filter: Optional[str] = None, debug: bool = False, 
+                    include_imperatives: bool = False, include_gender_adj: bool = False,
+                    lemma_threshold: int = 1, include_number_ambiguous: bool = False) -> Optional[Set[str]]:
+    """Get alternative forms for a word."""
+    return _default_client.get_alternatives(word, lang, headers, timeout, pos_filter, debug,
+                                            include_imperatives, include_gender_adj,
+                                            lemma_threshold, include_number_ambiguous)
 
 
 # ========================= Text Processing =========================
@@ -1023,6 +2856,48 @@ def case_match(original: str, target: str) -> str:
     return target
 
 
+# Sentence ends: terminal punctuation and closing quotes/brackets, followed by
+# whitespace and an uppercase letter (optionally after an opening quote or dash)
+SENTENCE_END = re.compile(r'[.!?…]+["»”’\')\]]*(?=\s+[«"“‘\'(\[–—-]*[A-ZÆØÅ])')
+
+# Words ending in "." that rarely end a sentence (matched lowercase, without the final ".")
+ABBREVIATIONS = frozenset({
+    "bl.a", "ca", "dok", "dr", "dvs", "ekskl", "etc", "ev", "evt", "f.eks", "fr", "hr", "iht",
+    "inkl", "innst", "jf", "jfr", "kap", "kl", "m.fl", "m.m", "mht", "mill", "mrd", "nr", "o.l",
+    "pga", "pkt", "prof", "prop", "pst", "repr", "st", "t.o.m", "vedr",
+})
+
+
+def split_sentences(text: str) -> List[Tuple[int, int]]:
+    """Split text into sentence spans ``(start, end)`` with exact character offsets.
+
+    Splits after ".", "!", "?" or "…" when whitespace and an uppercase letter
+    follow, except after common Norwegian abbreviations and single-letter
+    initials. Spans exclude the whitespace between sentences, so joining
+    ``text[start:end]`` with the original gaps restores the text exactly.
+    """
+    spans = []
+    
+    def add(start: int, end: int):
+        chunk = text[start:end]
+        stripped = chunk.strip()
+        if stripped:
+            start += len(chunk) - len(chunk.lstrip())
+            spans.append((start, start + len(stripped)))
+    
+    start = 0
+    for match in SENTENCE_END.finditer(text):
+        if match.group().startswith("."):
+            previous = re.search(r'\S*$', text[start:match.start()]).group()
+            previous = previous.lstrip('«"“‘\'([–—-').casefold()
+            if previous in ABBREVIATIONS or (len(previous) == 1 and previous.isalpha()):
+                continue
+        add(start, match.end())
+        start = match.end()
+    add(start, len(text))
+    return spans
+
+
 def get_unique_words(tokens: List[str]) -> List[str]:
     """Extract unique word forms from tokens."""
     unique_words = []
@@ -1038,159 +2913,633 @@ def get_unique_words(tokens: List[str]) -> List[str]:
     return unique_words
 
 
+# ========================= Output Rendering =========================
+
+def format_alternatives(token: str, alternatives: Set[str]) -> str:
+    """Format one word's alternatives as "{Original, other, ...}" in the token's casing."""
+    cased_alts = [case_match(token, alt) for alt in alternatives]
+    normalized = {alt.casefold(): alt for alt in cased_alts}
+    normalized.setdefault(token.casefold(), token)
+    
+    # Order: original first, then others sorted
+    original = case_match(token, normalized[token.casefold()])
+    others = sorted([
+        case_match(token, alt) for key, alt in normalized.items()
+        if key != token.casefold()
+    ], key=str.casefold)
+    
+    return "{" + ", ".join([original] + others) + "}"
+
+
+def render_sentence(tokens: List[str], position_alternatives: Dict[int, Set[str]]) -> str:
+    """Build the quoted output line for a tokenized sentence.
+    
+    Shared by process_sentence and process_sentences_batch so both produce
+    identical output. Words with more than one alternative at their position
+    are replaced by format_alternatives; all other tokens are kept as is.
+    """
+    output_parts = []
+    for i, token in enumerate(tokens):
+        alternatives = position_alternatives.get(i)
+        if not is_word(token) or not alternatives or len(alternatives) <= 1:
+            output_parts.append(token)
+        else:
+            output_parts.append(format_alternatives(token, alternatives))
+    
+    # Join output parts and remove extra spaces from preprocessing
+    return '"' + postprocess_punctuation("".join(output_parts)) + '"'
+
+
+def render_document(text: str, spans: List[Tuple[int, int]], lines: List[str]) -> str:
+    """Reassemble one quoted output line from per-sentence lines and split_sentences spans.
+
+    The text between sentences is copied from ``text``, so the original
+    whitespace is kept.
+    """
+    parts = []
+    previous = 0
+    for (start, end), line in zip(spans, lines):
+        parts.append(text[previous:start])
+        parts.append(line[1:-1])
+        previous = end
+    parts.append(text[previous:])
+    return '"' + "".join(parts) + '"'
+
+
+# ========================= Cache Warming =========================
+
+def configure_http_pool(max_workers: int):
+    """Size the shared HTTP connection pool for ``max_workers`` concurrent requests."""
+    adapter = requests.adapters.HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+    SESSION.mount("https://", adapter)
+    SESSION.mount("http://", adapter)
+
+
+def warm_word(word: str, lang: str, headers: Dict[str, str], timeout: float,
+              pos_filter: Optional[str] = None) -> str:
+    """Resolve one word form into the cache.
+    
+    Returns 'known' if a lemma contains the form, 'unknown' if Ordbank has no
+    such form, or 'failed' if a request failed (nothing is cached, so a later
+    run retries it).
+    """
+    lemmas = lookup_lemmas(word, lang, headers, timeout)
+    if lemmas is None:
+        return "failed"
+    if pos_filter:
+        lemmas = [lemma for lemma in lemmas if lemma.get('word_class') == pos_filter]
+    
+    status = "unknown"
+    for lemma in lemmas:
+        if "id" not in lemma:
+            continue
+        inflections = lookup_inflections(int(lemma["id"]), lang, headers, timeout)
+        if inflections is None:
+            return "failed"
+        if any(inf.word_form.casefold() == word for inf in inflections):
+            status = "known"
+    return status
+
+
+def collect_vocabulary(input_file: str, field: str = "text", with_pos: bool = False) -> Dict[Tuple[str, Optional[str]], int]:
+    """Count distinct (word form, POS) units in a JSONL corpus, one count per line."""
+    counts: Dict[Tuple[str, Optional[str]], int] = {}
+    with open(input_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                text = json.loads(line).get(field)
+            except (json.JSONDecodeError, AttributeError):
+                continue
+            if not isinstance(text, str) or not text.strip():
+                continue
+            
+            tokens = tokenize_preserve(preprocess_punctuation(text))
+            tags = tag_tokens(tokens) if with_pos else [None] * len(tokens)
+            for unit in lookup_units(tokens, tags, include_determinatives=True):
+                counts[unit] = counts.get(unit, 0) + 1
+    return counts
+
+
+def warm_cache(input_file: str, lang: str, api_key: str, timeout: float, max_workers: int,
+               field: str = "text", with_pos: bool = False, verbosity: int = 1) -> Dict:
+    """Resolve every distinct word form of a corpus into the Ordbank cache.
+    
+    Forms are resolved most frequent first with up to ``max_workers`` requests
+    in flight. Resolved forms are written to the cache as they complete, so an
+    interrupted run resumes by running it again: cached forms return instantly.
+    """
+    headers = {"x-api-key": api_key.strip()}
+    configure_http_pool(max_workers)
+    
+    start_time = time.time()
+    counts = collect_vocabulary(input_file, field, with_pos)
+    units = sorted(counts, key=lambda unit: (-counts[unit], unit[0], unit[1] or ""))
+    total = len(units)
+    if verbosity >= 1:
+        print(f"📚 Vocabulary: {total} distinct forms, {sum(counts.values())} occurrences "
+              f"({time.time() - start_time:.1f}s)", file=sys.stderr)
+    
+    forms = {"known": 0, "unknown": 0, "failed": 0}
+    occurrences = {"known": 0, "unknown": 0, "failed": 0}
+    reset_cache_stats()
+    warm_start = time.time()
+    last_report = warm_start
+    done = 0
+    
+    def report_progress():
+        elapsed = time.time() - warm_start
+        rate = done / elapsed if elapsed > 0 else 0.0
+        eta = (total - done) / rate if rate > 0 else 0.0
+        print(f"🔥 Warming: {done}/{total} ({done / max(total, 1) * 100:.1f}%) | {rate:.1f} forms/sec | "
+              f"ETA {eta:.0f}s | known {forms['known']}, unknown {forms['unknown']}, "
+              f"failed {forms['failed']}", file=sys.stderr)
+    
+    with cf.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+        unit_iter = iter(units)
+        while True:
+            # Keep a bounded number of lookups in flight
+            for unit in unit_iter:
+                pending[executor.submit(warm_word, unit[0], lang, headers, timeout, unit[1])] = unit
+                if len(pending) >= max_workers * 4:
+                    break
+            if not pending:
+                break
+            finished, _ = cf.wait(pending, return_when=cf.FIRST_COMPLETED)
+            for future in finished:
+                unit = pending.pop(future)
+                try:
+                    status = future.result()
+                except Exception as e:
+                    logger.debug("Warming '%s' failed: %r", unit[0], e)
+                    status = "failed"
+                forms[status] += 1
+                occurrences[status] += counts[unit]
+                done += 1
+            if verbosity >= 1 and time.time() - last_report >= 5.0:
+                report_progress()
+                last_report = time.time()
+    
+    if verbosity >= 1:
+        report_progress()
+    
+    total_occurrences = sum(occurrences.values())
+    stats = get_cache_stats()
+    return {
+        "input_file": input_file,
+        "lang": lang,
+        "pos_tagged": with_pos,
+        "distinct_forms": total,
+        "occurrences": total_occurrences,
+        "forms": forms,
+        "occurrences_by_status": occurrences,
+        "token_coverage": occurrences["known"] / total_occurrences if total_occurrences else 0.0,
+        "cache_hits": stats["hits"],
+        "cache_misses": stats["misses"],
+        "elapsed_seconds": round(time.time() - start_time, 3),
+    }
+
+
+class LookupPrefetcher:
+    """Resolve the words of upcoming batches in the background.
+
+    Batch drivers submit the texts of batches they have read ahead, and wait
+    for a batch just before processing it. Meanwhile a thread pool fetches
+    their lemmas and paradigms into the client's caches, so Ordbank latency
+    overlaps with BERT scoring of the current batch and the batch's own
+    lookups are answered from memory and the file cache.
+
+    Words are resolved without POS, which fetches every lemma a POS-filtered
+    lookup can need without tagging the text twice. Nothing is prefetched when
+    a local lexicon or alternatives table answers lookups, or with caching
+    disabled, since prefetched results would not be kept.
+    """
+
+    def __init__(self, lang: str, api_key: str, timeout: float, max_workers: int,
+                 client: Optional[OrdbankClient] = None):
+        self.lang = lang
+        self.headers = {"x-api-key": api_key.strip()}
+        self.timeout = timeout
+        self.client = client if client is not None else _default_client
+        self.executor = cf.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="altmorph-prefetch")
+        self.pending: Dict[str, cf.Future] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def active(self) -> bool:
+        client = self.client
+        table = client.alternatives_table
+        return (client.cache_enabled and client.lexicon is None
+                and not (table is not None and table.covers(self.lang)))
+
+    def submit(self, texts: List[str]) -> List[cf.Future]:
+        """Start resolving the distinct words of ``texts``; returns the futures to wait for."""
+        if not self.active:
+            return []
+        futures = []
+        for text in texts:
+            tokens = tokenize_preserve(preprocess_punctuation(text))
+            for word, _ in lookup_units(tokens, [None] * len(tokens), include_determinatives=True):
+                future = self.pending.get(word)
+                if future is None:
+                    future = self.executor.submit(self.client.resolve_alternatives, word, self.lang,
+                                                  self.headers, self.timeout)
+                    self.pending[word] = future
+                    future.add_done_callback(lambda _, word=word: self.pending.pop(word, None))
+                futures.append(future)
+        return futures
+
+    def wait(self, futures: List[cf.Future]):
+        """Block until the lookups of one submitted batch are done; failures are retried later."""
+        with profile_stage("prefetch_wait", len(futures)):
+            cf.wait(futures)
+
+    def close(self):
+        """Cancel lookups that have not started and wait for the running ones."""
+        for future in list(self.pending.values()):
+            future.cancel()
+        self.executor.shutdown(wait=True)
+
+
+# ========================= Filter Policies =========================
+
+# Lemma threshold that never triggers
+UNLIMITED_LEMMAS = sys.maxsize
+
+
+class FilterPolicy(NamedTuple):
+    """Named lexical filtering behaviour.
+    
+    Fields left as None keep the value passed by the caller; set fields
+    override it. Policies only change which alternatives are generated, so
+    every policy runs on the same batched scoring, caches and lexicon.
+    """
+    name: str
+    description: str
+    lemma_threshold: Optional[int] = None
+    include_number_ambiguous: Optional[bool] = None
+
+    def apply(self, lemma_threshold: int, include_number_ambiguous: bool) -> Tuple[int, bool]:
+        """Return (lemma_threshold, include_number_ambiguous) with this policy's overrides."""
+        if self.lemma_threshold is not None:
+            lemma_threshold = self.lemma_threshold
+        if self.include_number_ambiguous is not None:
+            include_number_ambiguous = self.include_number_ambiguous
+        return lemma_threshold, include_number_ambiguous
+
+
+FILTER_POLICIES = {
+    "default": FilterPolicy(
+        "default", "Flags as given (lemma threshold, number-ambiguity filter)"),
+    "lemma_fixed": FilterPolicy(
+        "lemma_fixed", "Keep number-ambiguous nouns; lemma threshold as given",
+        include_number_ambiguous=True),
+    "gender_fixed": FilterPolicy(
+        "gender_fixed", "Keep number-ambiguous nouns; no lemma threshold",
+        lemma_threshold=UNLIMITED_LEMMAS, include_number_ambiguous=True),
+}
+
+
+def register_filter_policy(policy: FilterPolicy):
+    """Make a custom policy available by name (CLI --policy, policy= arguments)."""
+    FILTER_POLICIES[policy.name] = policy
+
+
+def get_filter_policy(name: Optional[str]) -> FilterPolicy:
+    """Look up a policy by name; None means "default"."""
+    try:
+        return FILTER_POLICIES[name or "default"]
+    except KeyError:
+        raise ValueError(f"Unknown filter policy {name!r} (choose from {', '.join(FILTER_POLICIES)})")
+
+
 # ========================= Main Processing =========================
 
+def lookup_pool(engine: Optional["AltMorph"], max_workers: int):
+    """Thread pool for Ordbank lookups: the engine's persistent pool, else one per call."""
+    if engine is not None:
+        return contextlib.nullcontext(engine.executor)
+    return cf.ThreadPoolExecutor(max_workers=max_workers)
+
+
 def process_sentence(sentence: str, lang: str, api_key: str, timeout: float,
                     max_workers: int, verbosity: int = 0, logit_threshold: float = 2.0, 
                     include_imperatives: bool = False, include_determinatives: bool = False,
                     include_gender_adj: bool = False, lemma_threshold: int = 1, 
-                    include_number_ambiguous: bool = False) -> str:
-    """Process sentence and return alternatives."""
+                    include_number_ambiguous: bool = False, policy: Optional[str] = None,
+                    engine: Optional["AltMorph"] = None) -> str:
+    """Process sentence and return alternatives.
     
-    headers = {"x-api-key": api_key.strip()}
-    
-    # Preprocess: add spaces before punctuation for proper tokenization
-    preprocessed = preprocess_punctuation(sentence)
-    tokens = tokenize_preserve(preprocessed)
-
-    if verbosity >= 2:
-        logger.debug("\n🎯 PROCESSING: %s", sentence)
-        logger.debug("   Language: %s, Threshold: %.2f, Lemma threshold: %d", lang, logit_threshold, lemma_threshold)
+    With ``engine``, its Ordbank client, lookup pool and models are used instead
+    of the module defaults.
+    """
     
-    # Extract unique words and get POS tags (using preprocessed text for consistency)
-    unique_words = get_unique_words(tokens)
-    pos_tags = extract_pos_tags(preprocessed)
+    lemma_threshold, include_number_ambiguous = get_filter_policy(policy).apply(
+        lemma_threshold, include_number_ambiguous)
+    client = engine.client if engine is not None else _default_client
+    tagger = engine.pos_tagger if engine is not None else None
     
-    if verbosity >= 2:
-        logger.debug("\n📝 WORDS: %s", unique_words)
-        logger.debug("\n🏷️ POS TAGS:")
-        for word, pos in pos_tags.items():
-            logger.debug("   %s: %s", word, pos)
-    
-    # Filter out determiners unless explicitly requested
-    if not include_determinatives:
-        filtered_words = []
-        for word in unique_words:
-            pos_tag = pos_tags.get(word)
-            if pos_tag == 'DET':
-                if verbosity >= 2:
-                    logger.debug("   🚫 SKIPPING %s: POS=DET (use --include_determinatives to override)", word)
-            else:
-                filtered_words.append(word)
-        unique_words = filtered_words
+    with trace_span("sentence", chars=len(sentence)):
+        headers = {"x-api-key": api_key.strip()}
         
-        if verbosity >= 2 and len(filtered_words) < len(get_unique_words(tokens)):
-            logger.debug("   📋 FILTERED WORDS: %s", unique_words)
-    
-    # Fetch alternatives from API
-    cache = {}
-    with cf.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {}
+        # Preprocess: add spaces before punctuation for proper tokenization
+        with profile_stage("preprocess", 1):
+            preprocessed = preprocess_punctuation(sentence)
+            tokens = tokenize_preserve(preprocessed)
+
+        if verbosity >= 2:
+            logger.debug("\n🎯 PROCESSING: %s", sentence)
+            logger.debug("   Language: %s, Threshold: %.2f, Lemma threshold: %d", lang, logit_threshold, lemma_threshold)
         
-        for word in unique_words:
-            pos_tag = pos_tags.get(word)
-            if verbosity >= 2:
-                logger.debug("\n📡 API LOOKUP: %s (POS: %s)", word, pos_tag or 'None')
-            
-            future = executor.submit(get_alternatives, word, lang, headers, timeout, pos_tag, 
-                                   verbosity >= 2, include_imperatives, include_gender_adj, 
-                                   lemma_threshold, include_number_ambiguous)
-            futures[future] = word
+        # POS tag every position and collect the (word, POS) pairs to look up
+        tags = tag_tokens(tokens, tagger)
+        all_units = lookup_units(tokens, tags, include_determinatives=True)
+        units = lookup_units(tokens, tags, include_determinatives)
         
-        for future in cf.as_completed(futures):
-            word = futures[future]
-            try:
-                result = future.result()
-                cache[word] = result
-                if verbosity >= 2:
-                    if result:
-                        logger.debug(
-                            "   ✅ %s: %d alternatives: %s",
-                            word,
-                            len(result),
-                            sorted(result),
-                        )
-                    else:
-                        logger.debug("   ❌ %s: No alternatives found", word)
-            except Exception as e:
-                cache[word] = None
+        if verbosity >= 2:
+            logger.debug("\n📝 WORDS: %s", get_unique_words(tokens))
+            logger.debug("\n🏷️ POS TAGS:")
+            for word, pos in all_units:
+                logger.debug("   %s: %s", word, pos)
+        
+        # Determiners are filtered out unless explicitly requested
+        if verbosity >= 2 and len(units) < len(all_units):
+            for word, pos in all_units:
+                if pos == 'DET':
+                    logger.debug("   🚫 SKIPPING %s: POS=DET (use --include_determinatives to override)", word)
+            logger.debug("   📋 FILTERED WORDS: %s", [word for word, _ in units])
+        
+        # Fetch alternatives from API
+        cache = {}
+        with profile_stage("lookup", len(units)), \
+                lookup_pool(engine, max_workers) as executor:
+            futures = {}
+            
+            for word, pos_tag in units:
                 if verbosity >= 2:
-                    logger.debug("   💥 %s: Failed: %s", word, e)
-    
-    # Apply acceptability filtering
-    position_alternatives = {}
-    has_alternatives = any(
-        (alts := cache.get(token.casefold())) and len(alts) > 1
-        for token in tokens
-        if is_word(token)
-    )
-    
-    if has_alternatives:
-        if verbosity >= 3:
-            logger.debug("\n🧠 ACCEPTABILITY FILTERING (threshold: %.2f)", logit_threshold)
+                    logger.debug("\n📡 API LOOKUP: %s (POS: %s)", word, pos_tag or 'None')
+                
+                future = executor.submit(client.get_alternatives, word, lang, headers, timeout, pos_tag, 
+                                       verbosity >= 2, include_imperatives, include_gender_adj, 
+                                       lemma_threshold, include_number_ambiguous)
+                futures[future] = (word, pos_tag)
+            
+            for future in cf.as_completed(futures):
+                unit = futures[future]
+                word = unit[0]
+                try:
+                    result = future.result()
+                    cache[unit] = result
+                    if verbosity >= 2:
+                        if result:
+                            logger.debug(
+                                "   ✅ %s: %d alternatives: %s",
+                                word,
+                                len(result),
+                                sorted(result),
+                            )
+                        else:
+                            logger.debug("   ❌ %s: No alternatives found", word)
+                except Exception as e:
+                    cache[unit] = None
+                    if verbosity >= 2:
+                        logger.debug("   💥 %s: Failed: %s", word, e)
         
-        for i, token in enumerate(tokens):
+        # Collect word alternatives by position
+        word_alternatives = {}
+        for i, (token, tag) in enumerate(zip(tokens, tags)):
             if is_word(token):
-                alternatives = cache.get(token.casefold())
+                alternatives = cache.get((token.casefold(), tag))
                 if alternatives and len(alternatives) > 1:
-                    
-                    if verbosity >= 3:
-                        context = "".join(
-                            f"[{t}]" if j == i else t
-                            for j, t in enumerate(tokens)
-                        )
-                        logger.debug("\n🔍 ANALYZING: %s (position %d)", token, i)
-                        logger.debug("   Context: %s", context)
-                        logger.debug("   Alternatives: %s", sorted(alternatives))
-                    
-                    filtered = filter_by_acceptability(
-                        tokens, i, alternatives, logit_threshold, verbosity >= 3
+                    word_alternatives[i] = alternatives
+        
+        # Apply acceptability filtering: all positions are scored in one batch
+        scores = {}
+        if word_alternatives:
+            if verbosity >= 3:
+                logger.debug("\n🧠 ACCEPTABILITY FILTERING (threshold: %.2f)", logit_threshold)
+                for i, alternatives in sorted(word_alternatives.items()):
+                    context = "".join(
+                        f"[{t}]" if j == i else t
+                        for j, t in enumerate(tokens)
                     )
-                    position_alternatives[i] = filtered
-    
-    # Build output with alternatives
-    output_parts = []
-    for i, token in enumerate(tokens):
-        if not is_word(token):
-            output_parts.append(token)
-            continue
-
-        # Use position-specific alternatives if available
-        alternatives = position_alternatives.get(i) or cache.get(token.casefold())
+                    logger.debug("\n🔍 ANALYZING: %s (position %d)", tokens[i], i)
+                    logger.debug("   Context: %s", context)
+                    logger.debug("   Alternatives: %s", sorted(alternatives))
+            
+            mlm = engine.masked_lm if engine is not None else get_masked_lm()
+            context_window = engine.mlm_context_window if engine is not None else None
+            sentence_data = {'sentence_id': "sent_0", 'tokens': tokens, 'word_alternatives': word_alternatives}
+            with profile_stage("scoring", 1), model_lock(mlm[1]):
+                scores = batch_score_alternatives(scoring_tasks_for([sentence_data]), mlm,
+                                                  context_window).get("sent_0", {})
         
-        if not alternatives or len(alternatives) <= 1:
-            output_parts.append(token)
-            continue
-
-        # Format alternatives with proper casing
-        cased_alts = [case_match(token, alt) for alt in alternatives]
-        normalized = {alt.casefold(): alt for alt in cased_alts}
-        normalized.setdefault(token.casefold(), token)
+        position_alternatives = ScoredSentence(tokens, word_alternatives, scores).filtered(
+            logit_threshold, verbosity >= 3, record_metrics=True)
         
-        # Order: original first, then others sorted
-        original = case_match(token, normalized[token.casefold()])
-        others = sorted([
-            case_match(token, alt) for key, alt in normalized.items()
-            if key != token.casefold()
-        ], key=str.casefold)
+        with profile_stage("output", 1):
+            result = render_sentence(tokens, position_alternatives)
         
-        ordered = [original] + others
-        output_parts.append("{" + ", ".join(ordered) + "}")
-    
-    # Join output parts and remove extra spaces from preprocessing
-    raw_result = "".join(output_parts)
-    clean_result = postprocess_punctuation(raw_result)
-    result = '"' + clean_result + '"'
-    
-    if verbosity >= 2:
-        logger.debug("\n✨ RESULT: %s", result)
-    
-    return result
+        SENTENCES_PROCESSED.inc()
+        if verbosity >= 2:
+            logger.debug("\n✨ RESULT: %s", result)
+        
+        return result
+
+
+# ========================= Engine =========================
+
+class AltMorphConfig(NamedTuple):
+    """Settings for one AltMorph engine; defaults match the command line."""
+    lang: str = "nob"
+    api_key: str = ""
+    timeout: float = 6.0
+    max_workers: int = 4
+    verbosity: int = 0
+    logit_threshold: float = 3.0
+    include_imperatives: bool = False
+    include_determinatives: bool = False
+    include_gender_adj: bool = False
+    lemma_threshold: int = 1
+    include_number_ambiguous: bool = False
+    policy: str = "default"
+    batch_size: int = 50
+    cache_enabled: bool = True
+    cache_dir: Optional[str] = None
+    lexicon: Optional[str] = None
+    alternatives_table: Optional[str] = None
+    api_base: Optional[str] = None
+    pos_backend: Optional[str] = None
+    pos_model: Optional[str] = None
+    mlm_model: Optional[str] = None
+    mlm_context_window: Optional[int] = None
+    sentence_cache_size: int = 0
+    sentence_cache_path: Optional[str] = None
+    max_in_flight: int = 256
+
+
+# Config fields passed straight through to process_sentence / process_sentences_batch
+_PROCESSING_FIELDS = (
+    "lang", "api_key", "timeout", "max_workers", "verbosity", "logit_threshold",
+    "include_imperatives", "include_determinatives", "include_gender_adj",
+    "lemma_threshold", "include_number_ambiguous", "policy",
+)
+
+
+class AltMorph:
+    """Self-contained AltMorph engine for embedding in services.
+
+    Owns its configuration, Ordbank client (HTTP session, file cache, paradigm
+    index, optional lexicon and alternatives table) and lookup thread pool, so
+    several engines with different languages, thresholds or data sources can
+    run in one process. Models are loaded once per process and shared by all
+    engines naming the same model. Profiling, tracing and metrics stay
+    process-wide.
+
+    Example:
+        with AltMorph(lang="nno", logit_threshold=2.0) as engine:
+            engine.process("Jenta kasta ballen.")
+            engine.process_batch(sentences)
+    """
+
+    def __init__(self, config: Optional[AltMorphConfig] = None, **overrides):
+        config = (config or AltMorphConfig())._replace(**overrides)
+        get_filter_policy(config.policy)  # fail fast on unknown policy names
+        self.config = config
+        self.client = OrdbankClient(
+            api_base=config.api_base or API_BASE,
+            cache_dir=config.cache_dir,
+            cache_enabled=config.cache_enabled,
+            lexicon=OrdbankLexicon(config.lexicon) if config.lexicon else None,
+            alternatives_table=AlternativesTable(config.alternatives_table) if config.alternatives_table else None,
+            max_connections=config.max_workers,
+        )
+        self.executor = cf.ThreadPoolExecutor(max_workers=config.max_workers,
+                                              thread_name_prefix="altmorph-lookup")
+        self.sentence_cache = None
+        if config.sentence_cache_size or config.sentence_cache_path:
+            self.sentence_cache = SentenceCache(config.sentence_cache_size, config.sentence_cache_path)
+        self._options = {name: getattr(config, name) for name in _PROCESSING_FIELDS}
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def __repr__(self) -> str:
+        state = "closed" if self._closed else "open"
+        return f"AltMorph(lang={self.config.lang!r}, policy={self.config.policy!r}, {state})"
+
+    @property
+    def pos_tagger(self) -> PosBackend:
+        """The POS backend (loaded on first use, shared across engines)."""
+        return load_pos_backend(self.config.pos_backend or POS_BACKEND, self.config.pos_model)
+
+    @property
+    def masked_lm(self) -> Tuple[AutoTokenizer, AutoModelForMaskedLM]:
+        """The (tokenizer, model) pair for scoring (loaded on first use, shared across engines)."""
+        return load_masked_lm(self.config.mlm_model or MLM_MODEL)
+
+    @property
+    def mlm_context_window(self) -> int:
+        """Subword tokens of context on each side of the mask (MLM_CONTEXT_WINDOW by default)."""
+        if self.config.mlm_context_window is None:
+            return MLM_CONTEXT_WINDOW
+        return self.config.mlm_context_window
+
+    def warm_up(self) -> "AltMorph":
+        """Load both models now rather than on the first sentence."""
+        self._check_open()
+        self.pos_tagger
+        self.masked_lm
+        return self
+
+    def _check_open(self):
+        if self._closed:
+            raise RuntimeError("AltMorph engine is closed")
+
+    def process(self, sentence: str) -> str:
+        """Process one sentence."""
+        self._check_open()
+        return process_sentence(sentence, engine=self, **self._options)
+
+    def process_batch(self, sentences: List[str]) -> List[str]:
+        """Process sentences with batched scoring, ``batch_size`` at a time."""
+        self._check_open()
+        results = []
+        size = max(1, self.config.batch_size)
+        for start in range(0, len(sentences), size):
+            results.extend(process_sentences_batch(sentences[start:start + size], engine=self,
+                                                   sentence_cache=self.sentence_cache, **self._options))
+        return results
+
+    def iter_process(self, sentences: Iterable[str], max_in_flight: Optional[int] = None) -> Iterator[str]:
+        """Process an iterable lazily, yielding results in input order as batches finish.
+
+        Holds at most ``max_in_flight`` sentences (config.max_in_flight by
+        default) and scores ``batch_size`` at a time while the lookups of the
+        sentences read ahead run in the background. See iter_process.
+        """
+        self._check_open()
+        yield from iter_process(sentences, max_in_flight=max_in_flight or self.config.max_in_flight,
+                                batch_size=self.config.batch_size, engine=self,
+                                sentence_cache=self.sentence_cache, **self._options)
+
+    def process_documents(self, documents: List[str]) -> List[str]:
+        """Process multi-sentence texts sentence by sentence, ``batch_size`` documents at a time.
+
+        See process_documents_batch.
+        """
+        self._check_open()
+        results = []
+        size = max(1, self.config.batch_size)
+        for start in range(0, len(documents), size):
+            results.extend(process_documents_batch(documents[start:start + size], engine=self,
+                                                   sentence_cache=self.sentence_cache, **self._options))
+        return results
+
+    async def aprocess(self, sentence: str) -> str:
+        """Process one sentence without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.process, sentence)
+
+    async def aprocess_batch(self, sentences: List[str]) -> List[str]:
+        """Process sentences with batched scoring without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.process_batch, sentences)
+
+    def delete_cache(self):
+        """Delete this engine's file cache and in-memory paradigms."""
+        self.client.delete_cache()
+
+    def close(self):
+        """Stop the lookup pool and release the HTTP session, lexicon and table.
+
+        Models stay loaded for other engines. Safe to call more than once.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self.executor.shutdown(wait=True)
+        self.client.close()
+        if self.sentence_cache is not None:
+            self.sentence_cache.close()
 
 
 # ========================= CLI =========================
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: Optional[List[str]] = None, policy: str = "default") -> argparse.Namespace:
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(
         description="AltMorph: Context-aware Norwegian morphological alternative generator"
@@ -1219,19 +3568,67 @@ def parse_args() -> argparse.Namespace:
                        help="Include gender-dependent adjective alternatives (default: False)")
     parser.add_argument("--include_number_ambiguous", action="store_true",
                        help="Include alternatives for number-ambiguous nouns (default: False)")
+    parser.add_argument("--policy", default=policy, choices=sorted(FILTER_POLICIES),
+                       help=f"Filter policy; overrides lemma/number flags (default: {policy})")
     parser.add_argument("--batch_size", type=int, default=50,
                        help="Batch size for processing multiple sentences (default: 50)")
     parser.add_argument("--no-cache", action="store_true",
                        help="Disable caching (always fetch from API)")
     parser.add_argument("--delete-cache", action="store_true",
                        help="Delete all cache files and exit")
-    return parser.parse_args()
-
-
-def main():
-    """Main entry point."""
-    args = parse_args()
-    
+    parser.add_argument("--alternatives_table", default=os.getenv("ALTMORPH_ALTERNATIVES_TABLE", ""),
+                       help="Precompiled table from tools/build_alternatives_table.py for O(1) lookups")
+    parser.add_argument("--lexicon", default=os.getenv("ORDBANK_LEXICON", ""),
+                       help="Local lexicon built by tools/build_lexicon.py; replaces the Ordbank API "
+                            "(or set ORDBANK_LEXICON)")
+    parser.add_argument("--pos_backend", default=POS_BACKEND, choices=sorted(POS_BACKENDS),
+                       help=f"POS tagger: bert (NbAiLab/nb-bert-base-pos) or spacy (nb_core_news_lg) "
+                            f"(default: {POS_BACKEND})")
+    parser.add_argument("--profile", action="store_true",
+                       help="Time pipeline stages and print a summary table to stderr")
+    parser.add_argument("--profile_output",
+                       help="Write the stage profile as JSON to this file (implies --profile)")
+    parser.add_argument("--trace",
+                       help="Write Chrome Trace Event JSON (chrome://tracing, Perfetto) to this file")
+    return parser.parse_args(argv)
+
+
+def parse_cache_args(argv: List[str]) -> argparse.Namespace:
+    """Parse arguments for the ``altmorph cache`` subcommands."""
+    parser = argparse.ArgumentParser(
+        prog="altmorph cache",
+        description="Manage the Ordbank cache"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    warm = subparsers.add_parser("warm", help="Resolve a corpus vocabulary into the cache")
+    warm.add_argument("--input", required=True,
+                      help="JSONL corpus to collect word forms from")
+    warm.add_argument("--field", default="text",
+                      help="JSON field holding the text (default: text)")
+    warm.add_argument("--lang", default="nob", choices=["nob", "nno"],
+                      help="Language code (default: nob)")
+    warm.add_argument("--api_key", default=os.getenv("ORDBANK_API_KEY", ""),
+                      help="Ordbank API key (or set ORDBANK_API_KEY)")
+    warm.add_argument("--timeout", type=float, default=6.0,
+                      help="HTTP timeout per request (default: 6.0)")
+    warm.add_argument("--max_workers", type=int, default=8,
+                      help="Parallel API requests (default: 8)")
+    warm.add_argument("--pos", action="store_true",
+                      help="POS-tag the corpus and report coverage per (form, POS)")
+    warm.add_argument("--report",
+                      help="Write the coverage report as JSON to this file")
+    warm.add_argument("--verbosity", type=int, default=1, choices=[0, 1, 2, 3],
+                      help="Verbosity level (default: 1)")
+    
+    clear = subparsers.add_parser("clear", help="Delete all cache files")
+    clear.add_argument("--verbosity", type=int, default=1, choices=[0, 1, 2, 3],
+                       help="Verbosity level (default: 1)")
+    return parser.parse_args(argv)
+
+
+def configure_logging(verbosity: int):
+    """Configure logging for a verbosity level."""
     # Map verbosity to logging levels
     log_levels = {
         0: logging.ERROR,    # quiet - only errors
@@ -1241,19 +3638,73 @@ def main():
     }
 
     # Configure clean logging for verbosity levels
-    if args.verbosity >= 2:
+    if verbosity >= 2:
         # Clean format for verbosity output - no timestamps or level names
         logging.basicConfig(
-            level=log_levels.get(args.verbosity, logging.ERROR),
+            level=log_levels.get(verbosity, logging.ERROR),
             format="%(message)s"
         )
     else:
         # Standard format for errors and basic info
         logging.basicConfig(
-            level=log_levels.get(args.verbosity, logging.ERROR),
+            level=log_levels.get(verbosity, logging.ERROR),
             format="%(asctime)s %(levelname)s %(message)s"
         )
 
+
+def cache_main(argv: List[str]) -> int:
+    """Entry point for ``altmorph cache ...``."""
+    args = parse_cache_args(argv)
+    configure_logging(args.verbosity)
+    
+    if args.command == "clear":
+        delete_cache()
+        print("Cache cleared successfully.")
+        return 0
+    
+    if not args.api_key:
+        logger.error("Missing API key. Use --api_key or set ORDBANK_API_KEY.")
+        return 2
+    
+    try:
+        report = warm_cache(
+            input_file=args.input,
+            lang=args.lang,
+            api_key=args.api_key,
+            timeout=args.timeout,
+            max_workers=max(1, args.max_workers),
+            field=args.field,
+            with_pos=args.pos,
+            verbosity=args.verbosity
+        )
+    except KeyboardInterrupt:
+        logger.warning("Interrupted. Run the same command again to resume.")
+        return 130
+    
+    forms = report["forms"]
+    print(f"\n🎯 Cache warm complete: {report['distinct_forms']} forms in {report['elapsed_seconds']:.1f}s")
+    print(f"   ✅ Known:   {forms['known']}")
+    print(f"   ❔ Unknown: {forms['unknown']}")
+    print(f"   ⚠️  Failed:  {forms['failed']} (rerun to retry)")
+    print(f"   📊 Token coverage: {report['token_coverage'] * 100:.1f}% of {report['occurrences']} occurrences")
+    print(f"   🌐 API lookups: {report['cache_misses']} ({report['cache_hits']} already cached)")
+    
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    
+    return 1 if forms["failed"] else 0
+
+
+def main(argv: Optional[List[str]] = None, policy: str = "default"):
+    """Main entry point; ``policy`` is the default for --policy."""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "cache":
+        sys.exit(cache_main(argv[1:]))
+    
+    args = parse_args(argv, policy)
+    configure_logging(args.verbosity)
+
     # Handle cache management
     if hasattr(args, 'delete_cache') and args.delete_cache:
         delete_cache()
@@ -1270,10 +3721,24 @@ def main():
         if args.verbosity >= 2:
             logger.info("🚫 Cache disabled")
 
-    if not args.api_key:
+    if args.alternatives_table:
+        set_alternatives_table(args.alternatives_table)
+    
+    set_pos_backend(args.pos_backend)
+    
+    if args.lexicon:
+        set_lexicon(args.lexicon)
+        if args.verbosity >= 2:
+            logger.info("📚 Using local lexicon: %s", args.lexicon)
+    elif not args.api_key:
         logger.error("Missing API key. Use --api_key or set ORDBANK_API_KEY.")
         sys.exit(2)
 
+    if args.profile or args.profile_output:
+        set_profiler(StageProfiler())
+    if args.trace:
+        set_tracer(TraceRecorder())
+
     try:
         result = process_sentence(
             sentence=args.sentence,
@@ -1287,10 +3752,18 @@ def main():
             include_determinatives=args.include_determinatives,
             include_gender_adj=args.include_gender_adj,
             lemma_threshold=args.lemma_threshold,
-            include_number_ambiguous=args.include_number_ambiguous
+            include_number_ambiguous=args.include_number_ambiguous,
+            policy=args.policy
         )
         print(result)
         
+        if _profiler is not None:
+            print(_profiler.summary_table(), file=sys.stderr)
+            if args.profile_output:
+                _profiler.write_report(args.profile_output)
+        if _tracer is not None:
+            _tracer.write(args.trace)
+        
         # Report cache statistics in verbose mode
         if args.verbosity >= 3 and _cache_enabled:
             stats = get_cache_stats()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Check that process_sentences_batch renders exactly what process_sentence does.
+
+Runs every sentence of a fixture corpus through both paths against the mock
+Ordbank server and the tiny models (or the real models with ``--models real``)
+and prints each mismatch. Exits with status 1 if any sentence differs.
+
+Usage Examples:
+    python benchmarks/check_parity.py
+    python benchmarks/check_parity.py --synthetic 200 --batch_size 16
+    python benchmarks/check_parity.py --include_number_ambiguous --logit_threshold 1.5
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from corpus import make_corpus  # noqa: E402
+from mock_ordbank import start_server  # noqa: E402
+
+PARITY_CORPUS = BENCH_DIR / "fixtures" / "parity_corpus.jsonl"
+
+
+def load_corpus(path: Path):
+    with path.open("r", encoding="utf-8") as f:
+        return [json.loads(line)["text"] for line in f if line.strip()]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare process_sentence and process_sentences_batch output")
+    parser.add_argument("--corpus", default=str(PARITY_CORPUS), help="JSONL file with 'text' fields")
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="Also check this many synthetic sentences (default: 0)")
+    parser.add_argument("--batch_size", type=int, default=8, help="Batch size for the batched path")
+    parser.add_argument("--models", choices=["tiny", "real"], default="tiny",
+                        help="Tiny BERT models or the real NbAiLab models (default: tiny)")
+    parser.add_argument("--model_dir", default=str(BENCH_DIR / ".models"), help="Where tiny models are stored")
+    parser.add_argument("--logit_threshold", type=float, default=3.0, help="Acceptability threshold")
+    parser.add_argument("--lemma_threshold", type=int, default=1, help="Lemma threshold")
+    parser.add_argument("--include_number_ambiguous", action="store_true")
+    parser.add_argument("--include_gender_adj", action="store_true")
+    parser.add_argument("--include_imperatives", action="store_true")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+
+    server, base_url, _ = start_server()
+    os.environ["ORDBANK_API_BASE"] = base_url
+    if args.models == "tiny":
+        from tiny_models import build_tiny_models
+        mlm_dir, pos_dir = build_tiny_models(Path(args.model_dir))
+        os.environ["ALTMORPH_MLM_MODEL"] = str(mlm_dir)
+        os.environ["ALTMORPH_POS_MODEL"] = str(pos_dir)
+
+    import altmorph
+    altmorph._cache_dir = Path(tempfile.mkdtemp(prefix="altmorph-parity-"))
+
+    sentences = load_corpus(Path(args.corpus)) + make_corpus(args.synthetic, seed=1)
+    options = dict(
+        lang="nob",
+        api_key="parity",
+        timeout=6.0,
+        max_workers=4,
+        logit_threshold=args.logit_threshold,
+        lemma_threshold=args.lemma_threshold,
+        include_number_ambiguous=args.include_number_ambiguous,
+        include_gender_adj=args.include_gender_adj,
+        include_imperatives=args.include_imperatives,
+    )
+
+    expected = [altmorph.process_sentence(sentence, **options) for sentence in sentences]
+    actual = []
+    for i in range(0, len(sentences), args.batch_size):
+        actual.extend(altmorph.process_sentences_batch(sentences[i:i + args.batch_size], **options))
+    server.shutdown()
+
+    mismatches = 0
+    for sentence, single, batched in zip(sentences, expected, actual):
+        if single != batched:
+            mismatches += 1
+            print(f"❌ {sentence}\n   process_sentence:        {single}\n   process_sentences_batch: {batched}")
+
+    with_alternatives = sum("{" in line for line in expected)
+    print(f"{len(sentences) - mismatches}/{len(sentences)} identical "
+          f"({with_alternatives} with alternatives), {mismatches} mismatches")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
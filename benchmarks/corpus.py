@@ -0,0 +1,61 @@
+"""Synthetic Norwegian corpora built from the benchmark fixture vocabulary."""
+
+import json
+import random
+from pathlib import Path
+from typing import List
+
+SUBJECTS = ["Katta", "Katten", "Jenta", "Jenten", "Gutten", "Hunden", "Presidenten", "Regjeringa", "Barnet"]
+VERBS = ["kasta", "kastet", "leste", "hoppa", "hoppet", "snakka", "snakket", "takka", "takket", "vedtok"]
+INTRANSITIVE = ["ligger", "løper", "sover", "springer", "lå", "sov", "sprang"]
+OBJECTS = ["ballen", "boka", "boken", "saka", "saken", "døra", "døren", "barna", "huset"]
+PLACES = ["matta", "matten", "stua", "stuen", "hytta", "hytten", "parken", "elva", "elven", "bygda", "veien", "vegen"]
+ADJECTIVES = ["store", "fine", "greie", "gamle"]
+
+TEMPLATES = [
+    "{subj} {verb} {obj}.",
+    "{subj} {intr} på {place}.",
+    "{subj} {verb} {obj} til gutten i {place}.",
+    "Den {adj} {subj_l} {intr} i {place}, og {subj_l2} {verb} {obj}.",
+    "Presidenten: Takk.",
+    "{subj} {verb} {obj} fordi {subj_l2} {intr} ved {place} hele dagen.",
+]
+
+
+def make_sentence(rng: random.Random) -> str:
+    template = rng.choice(TEMPLATES)
+    return template.format(
+        subj=rng.choice(SUBJECTS),
+        subj_l=rng.choice(SUBJECTS).lower(),
+        subj_l2=rng.choice(SUBJECTS).lower(),
+        verb=rng.choice(VERBS),
+        intr=rng.choice(INTRANSITIVE),
+        obj=rng.choice(OBJECTS),
+        place=rng.choice(PLACES),
+        adj=rng.choice(ADJECTIVES),
+    )
+
+
+def make_corpus(size: int, seed: int = 0, sentences_per_line: int = 1) -> List[str]:
+    """Generate ``size`` lines of one or more synthetic sentences."""
+    rng = random.Random(seed)
+    return [" ".join(make_sentence(rng) for _ in range(sentences_per_line)) for _ in range(size)]
+
+
+def write_jsonl(lines: List[str], path: Path) -> Path:
+    """Write lines as ``{"id", "text"}`` JSONL for the JSONL tool."""
+    with path.open("w", encoding="utf-8") as f:
+        for i, text in enumerate(lines):
+            f.write(json.dumps({"id": i, "text": text, "source": "synthetic"}, ensure_ascii=False) + "\n")
+    return path
+
+
+def vocabulary() -> List[str]:
+    """All word forms the generator can emit."""
+    words = set()
+    for group in (SUBJECTS, VERBS, INTRANSITIVE, OBJECTS, PLACES, ADJECTIVES):
+        words.update(group)
+        words.update(word.lower() for word in group)
+    for template in TEMPLATES:
+        words.update(part.strip(".,:") for part in template.split() if not part.startswith("{"))
+    return sorted(word for word in words if word)
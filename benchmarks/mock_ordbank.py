@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Local stand-in for the Ordbank ``/lemmas`` endpoint.
+
+Serves recorded lemma records (one API-shaped JSON object per line) so the
+pipeline can run without network access or an API key. Both query styles used
+by AltMorph are supported:
+
+- ``search_inflection=true``: word form lookup, returns lemma summaries
+- ``search_inflection=false``: lemma id lookup, returns the full record
+
+Usage:
+    python benchmarks/mock_ordbank.py --port 8765 --latency_ms 40
+    ORDBANK_API_BASE=http://127.0.0.1:8765 python altmorph.py --sentence "Katta ligger på matta." --api_key x
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES = Path(__file__).parent / "fixtures" / "ordbank_lemmas.jsonl"
+
+
+def load_fixtures(path: Path = FIXTURES) -> List[Dict]:
+    """Load recorded lemma records."""
+    with path.open("r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class OrdbankIndex:
+    """Form and id indexes over recorded lemma records."""
+
+    def __init__(self, records: List[Dict]):
+        self.by_id = {str(record["id"]): record for record in records}
+        self.by_form: Dict[str, List[Dict]] = {}
+        for record in records:
+            forms = {record["lemma"].casefold()}
+            forms.update(
+                entry["word_form"].casefold()
+                for paradigm in record.get("paradigm_info", [])
+                for entry in paradigm.get("inflection", [])
+            )
+            summary = {key: record[key] for key in ("id", "lemma", "word_class")}
+            for form in forms:
+                self.by_form.setdefault(form, []).append(summary)
+
+    def query(self, query: str, search_inflection: bool) -> List[Dict]:
+        if search_inflection:
+            return self.by_form.get(query.casefold(), [])
+        record = self.by_id.get(query)
+        return [record] if record else []
+
+
+def make_handler(index: OrdbankIndex, latency: float, stats: Dict[str, int]):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            if parsed.path.rstrip("/").split("/")[-1] != "lemmas":
+                self.send_error(404)
+                return
+            params = parse_qs(parsed.query)
+            query = params.get("query", [""])[0]
+            search_inflection = params.get("search_inflection", ["true"])[0] == "true"
+            if latency:
+                time.sleep(latency)
+            body = json.dumps(index.query(query, search_inflection), ensure_ascii=False).encode("utf-8")
+            stats["requests"] += 1
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+
+def start_server(port: int = 0, latency_ms: float = 0.0,
+                 fixtures: Optional[Path] = None) -> Tuple[ThreadingHTTPServer, str, Dict[str, int]]:
+    """Start the mock server in a daemon thread; returns (server, base URL, stats)."""
+    index = OrdbankIndex(load_fixtures(fixtures or FIXTURES))
+    stats = {"requests": 0}
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(index, latency_ms / 1000.0, stats))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}", stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve recorded Ordbank /lemmas fixtures locally")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (default: 8765)")
+    parser.add_argument("--latency_ms", type=float, default=0.0, help="Simulated latency per request")
+    parser.add_argument("--fixtures", default=str(FIXTURES), help="JSONL file with lemma records")
+    args = parser.parse_args()
+
+    server, base_url, _ = start_server(args.port, args.latency_ms, Path(args.fixtures))
+    print(f"Mock Ordbank serving {args.fixtures} at {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""Offline end-to-end throughput benchmarks for AltMorph.
+
+Starts the mock Ordbank server, points AltMorph at tiny BERT models
+(or the real ones with ``--models real``) and runs ``process_sentence``,
+``process_sentences_batch`` and the JSONL tool on a synthetic corpus. Reports
+sentences/s, per-stage time, p50/p95/p99 latency and peak RSS as JSON that can
+be compared across commits.
+
+Usage Examples:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --sentences 500 --batch_size 50 --latency_ms 30 --output results.json
+    python benchmarks/run_benchmarks.py --scenarios batch jsonl --cache cold
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+BENCH_DIR = Path(__file__).parent
+REPO_DIR = BENCH_DIR.parent
+sys.path.insert(0, str(REPO_DIR))
+
+from corpus import make_corpus, write_jsonl  # noqa: E402
+from mock_ordbank import start_server  # noqa: E402
+
+SCENARIOS = ["process_sentence", "batch", "jsonl"]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def start_profile(altmorph):
+    """Install a fresh altmorph stage profiler for one scenario."""
+    profiler = altmorph.StageProfiler()
+    altmorph.set_profiler(profiler)
+    return profiler
+
+
+def summarize(name: str, sentences: int, elapsed: float, latencies: List[float], profiler) -> Dict:
+    return {
+        "scenario": name,
+        "sentences": sentences,
+        "seconds": round(elapsed, 6),
+        "sentences_per_sec": round(sentences / elapsed, 3) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 3),
+            "p95": round(percentile(latencies, 95) * 1000, 3),
+            "p99": round(percentile(latencies, 99) * 1000, 3),
+        } if latencies else None,
+        "stages": profiler.report()["stages"],
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def run_process_sentence(altmorph, corpus: List[str], options: Dict) -> Dict:
+    latencies = []
+    profiler = start_profile(altmorph)
+    start = time.perf_counter()
+    for sentence in corpus:
+        t0 = time.perf_counter()
+        altmorph.process_sentence(sentence, **options)
+        latencies.append(time.perf_counter() - t0)
+    return summarize("process_sentence", len(corpus), time.perf_counter() - start, latencies, profiler)
+
+
+def run_batch(altmorph, corpus: List[str], options: Dict, batch_size: int) -> Dict:
+    latencies = []
+    profiler = start_profile(altmorph)
+    start = time.perf_counter()
+    for i in range(0, len(corpus), batch_size):
+        t0 = time.perf_counter()
+        altmorph.process_sentences_batch(corpus[i:i + batch_size], **options)
+        latencies.append(time.perf_counter() - t0)
+    result = summarize("process_sentences_batch", len(corpus), time.perf_counter() - start, latencies, profiler)
+    result["batch_size"] = batch_size
+    result["latency_unit"] = "batch"
+    return result
+
+
+def run_jsonl(altmorph, corpus: List[str], options: Dict, batch_size: int, workdir: Path) -> Dict:
+    spec = importlib.util.spec_from_file_location("process_jsonl", REPO_DIR / "tools" / "process_jsonl.py")
+    tool = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(tool)
+
+    input_file = write_jsonl(corpus, workdir / "bench_input.jsonl")
+    output_file = workdir / "bench_output.jsonl"
+    output_file.unlink(missing_ok=True)
+
+    profiler = start_profile(altmorph)
+    start = time.perf_counter()
+    tool.process_jsonl_file(
+        input_file=str(input_file),
+        output_file=str(output_file),
+        batch_size=batch_size,
+        **dict(options, verbosity=0),
+    )
+    result = summarize("process_jsonl", len(corpus), time.perf_counter() - start, [], profiler)
+    result["batch_size"] = batch_size
+    return result
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline AltMorph throughput benchmarks")
+    parser.add_argument("--sentences", type=int, default=200, help="Synthetic corpus size (default: 200)")
+    parser.add_argument("--sentences_per_line", type=int, default=1,
+                        help="Sentences per corpus line, for long inputs (default: 1)")
+    parser.add_argument("--batch_size", type=int, default=50, help="Batch size for batched scenarios")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS,
+                        help="Scenarios to run (default: all)")
+    parser.add_argument("--models", choices=["tiny", "real"], default="tiny",
+                        help="Tiny BERT models or the real NbAiLab models (default: tiny)")
+    parser.add_argument("--model_dir", default=str(BENCH_DIR / ".models"),
+                        help="Where tiny models are stored")
+    parser.add_argument("--latency_ms", type=float, default=0.0,
+                        help="Simulated Ordbank latency per request (default: 0)")
+    parser.add_argument("--cache", choices=["warm", "cold"], default="warm",
+                        help="Warm the Ordbank cache and models before measuring (default: warm)")
+    parser.add_argument("--max_workers", type=int, default=8, help="Parallel API requests (default: 8)")
+    parser.add_argument("--logit_threshold", type=float, default=3.0, help="Acceptability threshold")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus and model seed")
+    parser.add_argument("--output", help="Write results JSON to this file (default: stdout only)")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+
+    server, base_url, server_stats = start_server(latency_ms=args.latency_ms)
+    os.environ["ORDBANK_API_BASE"] = base_url
+    if args.models == "tiny":
+        from tiny_models import build_tiny_models
+        mlm_dir, pos_dir = build_tiny_models(Path(args.model_dir), args.seed)
+        os.environ["ALTMORPH_MLM_MODEL"] = str(mlm_dir)
+        os.environ["ALTMORPH_POS_MODEL"] = str(pos_dir)
+
+    import altmorph
+
+    workdir = Path(tempfile.mkdtemp(prefix="altmorph-bench-"))
+    altmorph._cache_dir = workdir / "ordbank_cache"
+
+    corpus = make_corpus(args.sentences, args.seed, args.sentences_per_line)
+    options = dict(
+        lang="nob",
+        api_key="benchmark",
+        timeout=6.0,
+        max_workers=args.max_workers,
+        logit_threshold=args.logit_threshold,
+    )
+
+    load_start = time.perf_counter()
+    altmorph.get_pos_tagger()
+    altmorph.get_masked_lm()
+    model_load = time.perf_counter() - load_start
+    if args.cache == "warm":
+        altmorph.process_sentences_batch(corpus, **options)
+
+    results = []
+    for scenario in args.scenarios:
+        if args.cache == "cold":
+            altmorph.delete_cache()
+        if scenario == "process_sentence":
+            results.append(run_process_sentence(altmorph, corpus, options))
+        elif scenario == "batch":
+            results.append(run_batch(altmorph, corpus, options, args.batch_size))
+        else:
+            results.append(run_jsonl(altmorph, corpus, options, args.batch_size, workdir))
+    altmorph.set_profiler(None)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "models": args.models,
+            "mlm_model": altmorph.MLM_MODEL,
+            "pos_model": altmorph.POS_MODEL,
+            "model_load_seconds": round(model_load, 3),
+            "sentences": args.sentences,
+            "sentences_per_line": args.sentences_per_line,
+            "batch_size": args.batch_size,
+            "latency_ms": args.latency_ms,
+            "cache": args.cache,
+            "mock_requests": server_stats["requests"],
+        },
+        "scenarios": results,
+    }
+    server.shutdown()
+
+    print(f"{'scenario':<26}{'sent/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'RSS MB':>10}",
+          file=sys.stderr)
+    for result in results:
+        latency = result["latency_ms"] or {}
+        cells = "".join(f"{latency[key]:>10.1f}" if key in latency else f"{'-':>10}" for key in ("p50", "p95", "p99"))
+        print(f"{result['scenario']:<26}{result['sentences_per_sec']:>10.1f}{cells}{result['peak_rss_mb']:>10.1f}",
+              file=sys.stderr)
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Tiny BERT models for offline benchmarks.
+
+The models have the same interfaces as ``NbAiLab/nb-bert-base`` and
+``NbAiLab/nb-bert-base-pos`` but only a few hundred thousand parameters. They
+use the real nb-bert-base tokenizer when it is available locally; otherwise a
+small WordPiece vocabulary is built from the fixtures and corpus vocabulary.
+The MLM is randomly initialized and the POS head is fitted for a few seconds on
+fixture word classes, so runs measure pipeline overhead, not quality.
+"""
+
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Dict, Tuple
+
+import torch
+from transformers import (AutoTokenizer, BertConfig, BertForMaskedLM,
+                          BertForTokenClassification, BertTokenizerFast)
+
+from corpus import make_corpus, vocabulary
+from mock_ordbank import load_fixtures
+
+POS_LABELS = ["NOUN", "VERB", "ADJ", "ADP", "PRON", "PUNCT"]
+SPECIAL_TOKENS = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+
+logger = logging.getLogger(__name__)
+
+
+def build_tokenizer(directory: Path):
+    """Use the nb-bert-base tokenizer if cached, else build a small WordPiece vocab."""
+    try:
+        return AutoTokenizer.from_pretrained("NbAiLab/nb-bert-base", local_files_only=True)
+    except Exception:
+        logger.info("nb-bert-base tokenizer not available locally; building a fixture vocabulary")
+
+    words = set(vocabulary())
+    for record in load_fixtures():
+        words.add(record["lemma"])
+        for paradigm in record.get("paradigm_info", []):
+            words.update(entry["word_form"] for entry in paradigm.get("inflection", []))
+    words.update(word.lower() for word in list(words))
+    words.update(word.capitalize() for word in list(words))
+    chars = sorted({char for word in words for char in word} | set(".,:;?!"))
+    vocab = SPECIAL_TOKENS + chars + [f"##{char}" for char in chars] + sorted(words - set(chars))
+
+    directory.mkdir(parents=True, exist_ok=True)
+    vocab_file = directory / "vocab.txt"
+    vocab_file.write_text("\n".join(vocab) + "\n", encoding="utf-8")
+    # Load through from_pretrained: newer transformers ignore a bare vocab_file
+    # argument and keep only the special tokens, which maps every word to [UNK]
+    tokenizer = BertTokenizerFast.from_pretrained(str(directory), do_lower_case=False)
+    assert len(tokenizer) == len(vocab), f"tokenizer has {len(tokenizer)} tokens, vocabulary {len(vocab)}"
+    return tokenizer
+
+
+def word_classes() -> Dict[str, str]:
+    """Word form -> word class from the fixtures, used to label POS training data."""
+    classes = {}
+    for record in load_fixtures():
+        for paradigm in record.get("paradigm_info", []):
+            for entry in paradigm.get("inflection", []):
+                classes.setdefault(entry["word_form"].casefold(), record["word_class"])
+    return classes
+
+
+def fit_pos_model(model, tokenizer, seed: int, steps: int = 150) -> None:
+    """Briefly train the POS head so tags follow the fixture word classes.
+
+    A randomly initialized tagger would assign random tags, and the POS filter
+    would then discard most lookups, leaving little scoring work to measure.
+    """
+    classes = word_classes()
+    label_ids = {label: i for i, label in enumerate(POS_LABELS)}
+    sentences = [re.findall(r"\w+|[^\w\s]", line) for line in make_corpus(256, seed + 1)]
+
+    def label(word: str) -> int:
+        if not any(char.isalpha() for char in word):
+            return label_ids["PUNCT"]
+        return label_ids[classes.get(word.casefold(), "ADP" if len(word) <= 3 else "PRON")]
+
+    optimizer = torch.optim.AdamW(model.parameters(), lr=5e-3)
+    model.train()
+    for step in range(steps):
+        batch = sentences[(step * 16) % len(sentences):][:16]
+        inputs = tokenizer(batch, is_split_into_words=True, padding=True, return_tensors="pt")
+        labels = torch.full(inputs["input_ids"].shape, -100)
+        for row, words in enumerate(batch):
+            previous = None
+            for col, word_id in enumerate(inputs.word_ids(row)):
+                if word_id is not None and word_id != previous:
+                    labels[row, col] = label(words[word_id])
+                previous = word_id
+        loss = model(**inputs, labels=labels).loss
+        loss.backward()
+        optimizer.step()
+        optimizer.zero_grad()
+    model.eval()
+
+
+def build_tiny_models(directory: Path, seed: int = 0) -> Tuple[Path, Path]:
+    """Create (or reuse) tiny MLM and POS models; returns their directories."""
+    mlm_dir = directory / "tiny-mlm"
+    pos_dir = directory / "tiny-pos"
+    if (mlm_dir / "config.json").exists() and (pos_dir / "config.json").exists():
+        return mlm_dir, pos_dir
+
+    torch.manual_seed(seed)
+    tokenizer = build_tokenizer(directory / "tokenizer")
+    config = dict(
+        vocab_size=len(tokenizer),
+        hidden_size=64,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=128,
+        max_position_embeddings=512,
+    )
+
+    mlm = BertForMaskedLM(BertConfig(**config))
+    mlm.save_pretrained(mlm_dir)
+    tokenizer.save_pretrained(mlm_dir)
+
+    pos = BertForTokenClassification(BertConfig(
+        **config,
+        num_labels=len(POS_LABELS),
+        id2label=dict(enumerate(POS_LABELS)),
+        label2id={label: i for i, label in enumerate(POS_LABELS)},
+    ))
+    fit_pos_model(pos, tokenizer, seed)
+    pos.save_pretrained(pos_dir)
+    tokenizer.save_pretrained(pos_dir)
+
+    (directory / "models.json").write_text(json.dumps({
+        "mlm": str(mlm_dir), "pos": str(pos_dir), "vocab_size": len(tokenizer),
+        "parameters": sum(p.numel() for p in mlm.parameters()),
+    }, indent=2), encoding="utf-8")
+    return mlm_dir, pos_dir
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Precompute get_alternatives results for every word form in a local lexicon.
+
+Runs the normal lemma search, paradigm scan and tag matching once per
+word form x POS x language and writes the unfiltered results, with the tag
+facts the include_* flags and lemma threshold test, to a read-only,
+memory-mapped table. AltMorph answers lookups from the table with
+``--alternatives_table`` instead of processing paradigms at runtime, for any
+flag combination and lemma threshold.
+
+POS values covered are "no POS" plus every word class of the lemmas that
+contain the form; any other POS has no lemmas and therefore no alternatives.
+
+Usage Examples:
+    python tools/build_alternatives_table.py --lexicon ordbank.lexicon --output ordbank.alt
+    python tools/build_alternatives_table.py --lexicon ordbank.lexicon --langs nob nno --output ordbank.alt
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import altmorph  # noqa: E402
+
+
+def iter_table_items(lexicon: altmorph.OrdbankLexicon, langs, verbosity: int):
+    """Yield (key, Resolution) for every form and POS that can have alternatives."""
+    client = altmorph.OrdbankClient(lexicon=lexicon)
+    start = time.time()
+    for lang in langs:
+        for count, (form, word_classes) in enumerate(lexicon.iter_forms(lang), 1):
+            for pos_filter in [None] + sorted(word_classes):
+                resolution = client.resolve_alternatives(form, lang, {}, 0.0, pos_filter)
+                if resolution.alternatives:
+                    yield altmorph.alternatives_table_key(form, lang, pos_filter), resolution
+            # Every key is visited once; only the paradigms are worth keeping
+            client.resolutions.clear()
+            if verbosity >= 1 and count % 10000 == 0:
+                logging.info("%s: %d forms processed (%.0f forms/sec)",
+                             lang, count, count / (time.time() - start))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Precompute AltMorph alternatives from a local lexicon")
+    parser.add_argument("--lexicon", required=True, help="Lexicon built by tools/build_lexicon.py")
+    parser.add_argument("--output", required=True, help="Alternatives table to write")
+    parser.add_argument("--langs", nargs="+", default=["nob"], choices=["nob", "nno"],
+                        help="Languages to precompute (default: nob)")
+    parser.add_argument("--verbosity", type=int, default=1, choices=[0, 1, 2], help="Verbosity level (default: 1)")
+    return parser.parse_args()
+
+
+def configure_logging(verbosity: int) -> None:
+    level = logging.WARNING
+    if verbosity == 1:
+        level = logging.INFO
+    elif verbosity >= 2:
+        level = logging.DEBUG
+    logging.basicConfig(level=level, format="%(levelname)s %(message)s")
+
+
+def main() -> None:
+    args = parse_args()
+    configure_logging(args.verbosity)
+
+    lexicon = altmorph.OrdbankLexicon(args.lexicon)
+    items = iter_table_items(lexicon, args.langs, args.verbosity)
+    count = altmorph.write_alternatives_table(
+        args.output, items, {"langs": args.langs, "lexicon": Path(args.lexicon).name},
+    )
+    lexicon.close()
+    logging.info("Wrote %d entries to %s", count, args.output)
+
+
+if __name__ == "__main__":
+    main()
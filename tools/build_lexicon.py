@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""Build a local Ordbank lexicon for offline AltMorph runs.
+
+Reads the downloadable Norsk ordbank files and writes an indexed SQLite lexicon
+(word form -> lemma ids -> paradigm entries with tags) that AltMorph can use
+instead of the Ordbank API via ``--lexicon``.
+
+Two input formats are supported:
+
+- ``fullform``: the tab-separated ``fullformsliste.txt`` (and optionally
+  ``lemma.txt``) from the Norsk ordbank release. Ordbank tags such as
+  ``subst appell mask ent be`` are mapped to the API tag vocabulary
+  (``NOUN`` / ``("Sing", "Def")``).
+- ``api``: JSON Lines where each line is a lemma record as returned by the
+  ``/lemmas`` endpoint (``id``, ``lemma``, ``word_class``, ``paradigm_info``).
+  This reproduces API behaviour exactly.
+
+Usage Examples:
+    python tools/build_lexicon.py --fullform ordbank_bm/fullformsliste.txt \\
+        --lemmas ordbank_bm/lemma.txt --lang nob --output nob.lexicon
+    python tools/build_lexicon.py --api_records lemmas_nno.jsonl --lang nno --output nno.lexicon
+"""
+
+import argparse
+import csv
+import json
+import logging
+import sqlite3
+import sys
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from altmorph import LEXICON_SCHEMA  # noqa: E402
+
+# Ordbank word classes (first TAG field) -> Universal POS used by the API
+WORD_CLASSES = {
+    "subst": "NOUN",
+    "verb": "VERB",
+    "adj": "ADJ",
+    "adv": "ADV",
+    "det": "DET",
+    "pron": "PRON",
+    "prep": "ADP",
+    "konj": "CCONJ",
+    "sbu": "SCONJ",
+    "interj": "INTJ",
+    "inf-merke": "PART",
+    "symb": "SYM",
+}
+
+# Ordbank inflection features -> API tags, in the order they appear in API tag tuples
+FEATURES = OrderedDict([
+    ("pos", "Pos"),
+    ("komp", "Cmp"),
+    ("sup", "Sup"),
+    ("inf", "Inf"),
+    ("pres", "Pres"),
+    ("pret", "Past"),
+    ("imp", "Imp"),
+    ("perf-part", "<PerfPart>"),
+    ("pres-part", "<PresPart>"),
+    ("m/f", "Masc/Fem"),
+    ("nøyt", "Neuter"),
+    ("ent", "Sing"),
+    ("fl", "Plur"),
+    ("ub", "Ind"),
+    ("be", "Def"),
+    ("pass", "Pass"),
+])
+
+# Lemma-level features that the API does not repeat on each inflection
+NOUN_LEMMA_FEATURES = {"mask", "fem", "nøyt"}
+
+
+def map_tag(tag: str) -> Tuple[Optional[str], Tuple[str, ...]]:
+    """Map an Ordbank TAG string to (word_class, API tag tuple)."""
+    parts = tag.split()
+    if not parts:
+        return None, ()
+    word_class = WORD_CLASSES.get(parts[0])
+    if parts[0] == "subst" and "prop" in parts:
+        word_class = "PROPN"
+    features = set(parts[1:])
+    if parts[0] == "subst":
+        features -= NOUN_LEMMA_FEATURES
+    tags = tuple(api_tag for feature, api_tag in FEATURES.items() if feature in features)
+    return word_class, tags
+
+
+def read_tsv(path: Path) -> Iterable[Dict[str, str]]:
+    """Yield rows of a tab-separated Ordbank file keyed by its header."""
+    with path.open("r", encoding="utf-8", newline="") as handle:
+        reader = csv.DictReader(handle, delimiter="\t", quoting=csv.QUOTE_NONE)
+        for row in reader:
+            yield {(key or "").strip().upper(): (value or "").strip() for key, value in row.items()}
+
+
+def load_fullform(fullform: Path, lemma_file: Optional[Path]) -> Dict[int, Dict]:
+    """Collect lemma records with paradigms from Ordbank full-form files."""
+    base_forms = {}
+    if lemma_file is not None:
+        for row in read_tsv(lemma_file):
+            if row.get("LEMMA_ID", "").isdigit():
+                base_forms[int(row["LEMMA_ID"])] = row.get("GRUNNFORM")
+
+    lemmas: Dict[int, Dict] = {}
+    for row in read_tsv(fullform):
+        lemma_id = row.get("LEMMA_ID", "")
+        word_form = row.get("OPPSLAG")
+        if not lemma_id.isdigit() or not word_form:
+            continue
+        word_class, tags = map_tag(row.get("TAG", ""))
+        record = lemmas.setdefault(int(lemma_id), {
+            "lemma": base_forms.get(int(lemma_id)) or word_form,
+            "word_class": word_class,
+            "entries": [],
+        })
+        entry = (word_form, tags)
+        if entry not in record["entries"]:
+            record["entries"].append(entry)
+    return lemmas
+
+
+def load_api_records(path: Path) -> Dict[int, Dict]:
+    """Collect lemma records with paradigms from API-shaped JSON Lines."""
+    lemmas: Dict[int, Dict] = {}
+    with path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            data = json.loads(line)
+            if "id" not in data:
+                continue
+            entries = [
+                (entry.get("word_form"), tuple(entry.get("tags", [])))
+                for paradigm in data.get("paradigm_info", [])
+                for entry in paradigm.get("inflection", [])
+                if isinstance(entry.get("word_form"), str)
+                   and isinstance(entry.get("tags", []), list)
+            ]
+            lemmas[int(data["id"])] = {
+                "lemma": data.get("lemma"),
+                "word_class": data.get("word_class"),
+                "entries": entries,
+            }
+    return lemmas
+
+
+def write_lexicon(output: Path, lang: str, lemmas: Dict[int, Dict], source: str) -> None:
+    """Write lemma records into the SQLite lexicon format read by OrdbankLexicon."""
+    conn = sqlite3.connect(str(output))
+    try:
+        conn.executescript(LEXICON_SCHEMA)
+        conn.execute("DELETE FROM lemmas WHERE lang = ?", (lang,))
+        conn.execute("DELETE FROM forms WHERE lang = ?", (lang,))
+        conn.execute("DELETE FROM paradigms WHERE lang = ?", (lang,))
+
+        lemma_rows: List[Tuple] = []
+        form_rows = set()
+        paradigm_rows: List[Tuple] = []
+        for lemma_id, record in lemmas.items():
+            lemma_rows.append((lang, lemma_id, record["lemma"], record["word_class"]))
+            paradigm_rows.append((
+                lang, lemma_id,
+                json.dumps([[form, list(tags)] for form, tags in record["entries"]],
+                           ensure_ascii=False, separators=(',', ':')),
+            ))
+            # The API also matches the lemma itself, not only its inflections
+            forms = {form for form, _ in record["entries"]}
+            if record["lemma"]:
+                forms.add(record["lemma"])
+            form_rows.update((lang, form.casefold(), lemma_id) for form in forms)
+
+        conn.executemany("INSERT OR REPLACE INTO lemmas VALUES (?, ?, ?, ?)", lemma_rows)
+        conn.executemany("INSERT OR REPLACE INTO forms VALUES (?, ?, ?)", sorted(form_rows))
+        conn.executemany("INSERT OR REPLACE INTO paradigms VALUES (?, ?, ?)", paradigm_rows)
+        conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (f"source:{lang}", source))
+        conn.commit()
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+    logging.info("Wrote %d lemmas, %d word forms for '%s' to %s",
+                 len(lemma_rows), len(form_rows), lang, output)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build a local Ordbank lexicon for offline AltMorph runs")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--fullform", help="Norsk ordbank fullformsliste.txt (tab-separated)")
+    source.add_argument("--api_records", help="JSONL file with one /lemmas API record per line")
+    parser.add_argument("--lemmas", help="Norsk ordbank lemma.txt for base forms (fullform only)")
+    parser.add_argument("--lang", required=True, choices=["nob", "nno"], help="Language of the input files")
+    parser.add_argument("--output", required=True, help="Lexicon file to create or update")
+    parser.add_argument("--verbosity", type=int, default=1, choices=[0, 1, 2], help="Verbosity level (default: 1)")
+    return parser.parse_args()
+
+
+def configure_logging(verbosity: int) -> None:
+    level = logging.WARNING
+    if verbosity == 1:
+        level = logging.INFO
+    elif verbosity >= 2:
+        level = logging.DEBUG
+    logging.basicConfig(level=level, format="%(levelname)s %(message)s")
+
+
+def main() -> None:
+    args = parse_args()
+    configure_logging(args.verbosity)
+
+    if args.fullform:
+        lemmas = load_fullform(Path(args.fullform), Path(args.lemmas) if args.lemmas else None)
+        source = Path(args.fullform).name
+    else:
+        lemmas = load_api_records(Path(args.api_records))
+        source = Path(args.api_records).name
+
+    write_lexicon(Path(args.output), args.lang, lemmas, source)
+
+
+if __name__ == "__main__":
+    main()
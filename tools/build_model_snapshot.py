@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Convert the AltMorph models into memory-mappable snapshots.
+
+Each worker process normally loads its own copy of the masked LM and the POS
+tagger. A snapshot stores the weights in one torch file that AltMorph maps
+read-only instead of reading into private memory, so N workers on one machine
+share a single physical copy through the page cache and start without
+loading weights. Point the usual model settings at the snapshot directories.
+
+Usage Examples:
+    python tools/build_model_snapshot.py --output /srv/altmorph-models
+    ALTMORPH_MLM_MODEL=/srv/altmorph-models/mlm ALTMORPH_POS_MODEL=/srv/altmorph-models/pos \\
+        python tools/process_jsonl.py --input_file in.jsonl --output_file out.jsonl
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import altmorph  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Write memory-mappable AltMorph model snapshots")
+    parser.add_argument("--output", required=True, help="Directory for the mlm/ and pos/ snapshots")
+    parser.add_argument("--mlm_model", default=altmorph.MLM_MODEL,
+                        help=f"Masked language model (default: {altmorph.MLM_MODEL})")
+    parser.add_argument("--pos_model", default=altmorph.POS_MODEL,
+                        help=f"POS tagging model (default: {altmorph.POS_MODEL})")
+    parser.add_argument("--verbosity", type=int, default=1, choices=[0, 1, 2], help="Verbosity level (default: 1)")
+    return parser.parse_args()
+
+
+def configure_logging(verbosity: int) -> None:
+    level = logging.WARNING
+    if verbosity == 1:
+        level = logging.INFO
+    elif verbosity >= 2:
+        level = logging.DEBUG
+    logging.basicConfig(level=level, format="%(levelname)s %(message)s")
+
+
+def main() -> None:
+    args = parse_args()
+    configure_logging(args.verbosity)
+    output = Path(args.output)
+
+    start = time.time()
+    tokenizer, model = altmorph.load_masked_lm(args.mlm_model)
+    mlm_dir = altmorph.save_model_snapshot(model, tokenizer, output / "mlm")
+    tagger = altmorph.load_pos_tagger(args.pos_model)
+    pos_dir = altmorph.save_model_snapshot(tagger.model, tagger.tokenizer, output / "pos")
+    logging.info("Wrote snapshots in %.1fs", time.time() - start)
+
+    print(f"export ALTMORPH_MLM_MODEL={mlm_dir}")
+    print(f"export ALTMORPH_POS_MODEL={pos_dir}")
+
+
+if __name__ == "__main__":
+    main()
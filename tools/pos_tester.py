@@ -7,8 +7,30 @@ Kompakt POS-tester for tre modeller:
   - flair/upos-multi         (Flair)
 
 Skriver en enkel tabell: Model | Text | POS
+
+Med --agreement corpus.jsonl sammenlignes AltMorphs POS-backends (bert, spacy)
+på et korpus slik produksjonsløpet ser det: samme tokenisering, én tag per
+ordposisjon. Rapporten viser andel ord der kandidaten er enig med referansen,
+per referansetag og de vanligste forvekslingene:
+  python tools/pos_tester.py --agreement corpus.jsonl --backends spacy --limit 2000
+
+Med --bench corpus.jsonl lastes hver backend én gang i en egen prosess, varmes
+opp og tagger korpuset med flere batchstørrelser. Rapporten viser setninger/s,
+tokens/s, p95-latens per batch, minnetopp for backendens prosess og enighet med
+referansen:
+  python tools/pos_tester.py --bench corpus.jsonl --backends bert spacy --batch_sizes 1 8 32 --limit 1000
 """
 import argparse
+import json
+import multiprocessing
+import resource
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
 def run_hf(text, model_name, agg):
     from transformers import pipeline
@@ -64,6 +86,160 @@ def run_flair(text, model_name):
         parts.append(f"{tok.text}/{val}:{score:.2f}")
     return f"{model_name} (label_type={lt})", " ".join(parts)
 
+def load_texts(path, field="text", limit=None):
+    """Tekstfelt fra en JSONL-fil (maks ``limit`` linjer)."""
+    texts = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if limit is not None and len(texts) >= limit:
+                break
+            try:
+                text = json.loads(line).get(field)
+            except (json.JSONDecodeError, AttributeError):
+                continue
+            if isinstance(text, str) and text.strip():
+                texts.append(text)
+    return texts
+
+def tag_agreement(token_lists, reference, candidate):
+    """Enighet per ordposisjon mellom to taglister (referanse, kandidat)."""
+    import altmorph
+    per_tag, confusions = Counter(), Counter()
+    agree = total = 0
+    for tokens, ref_tags, cand_tags in zip(token_lists, reference, candidate):
+        for token, ref, cand in zip(tokens, ref_tags, cand_tags):
+            if not altmorph.is_word(token) or ref is None:
+                continue
+            total += 1
+            per_tag[(ref, ref == cand)] += 1
+            if ref == cand:
+                agree += 1
+            else:
+                confusions[(ref, cand or "-")] += 1
+    tags = sorted({tag for tag, _ in per_tag}, key=lambda tag: -(per_tag[(tag, True)] + per_tag[(tag, False)]))
+    return {
+        "words": total,
+        "agreement": agree / total if total else 0.0,
+        "per_tag": {
+            tag: {"words": per_tag[(tag, True)] + per_tag[(tag, False)],
+                  "agreement": per_tag[(tag, True)] / (per_tag[(tag, True)] + per_tag[(tag, False)])}
+            for tag in tags
+        },
+        "confusions": [{"reference": ref, "candidate": cand, "count": count}
+                       for (ref, cand), count in confusions.most_common(10)],
+    }
+
+def run_agreement(args):
+    import altmorph
+    texts = load_texts(args.agreement, args.field, args.limit)
+    token_lists = [altmorph.tokenize_preserve(altmorph.preprocess_punctuation(t)) for t in texts]
+    reference = altmorph.load_pos_backend(args.reference).tag_batch(token_lists)
+    report = {"corpus": args.agreement, "sentences": len(texts), "reference": args.reference, "backends": {}}
+    for name in args.backends or [b for b in sorted(altmorph.POS_BACKENDS) if b != args.reference]:
+        try:
+            candidate = altmorph.load_pos_backend(name).tag_batch(token_lists)
+        except ImportError as e:
+            print(f"{name}: hoppet over: {e}\n")
+            report["backends"][name] = {"skipped": str(e)}
+            continue
+        result = tag_agreement(token_lists, reference, candidate)
+        report["backends"][name] = result
+
+        print(f"{name} vs {args.reference}: {result['agreement']:.1%} av {result['words']} ord")
+        print("Tag | Ord | Enighet")
+        print("---|---|---")
+        for tag, row in result["per_tag"].items():
+            print(f"{tag} | {row['words']} | {row['agreement']:.1%}")
+        if result["confusions"]:
+            print("Vanligste forvekslinger: " + ", ".join(
+                f"{c['reference']}→{c['candidate']} ({c['count']})" for c in result["confusions"]))
+        print()
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    return report
+
+def percentile(values, pct):
+    """Nearest-rank-persentil."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+def peak_rss_mb():
+    """Minnetopp (RSS) for prosessen i MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def bench_backend(backend, token_lists, batch_size, warmup):
+    """Tagg alle tokenlister i batcher; returnerer (tags, målinger)."""
+    backend.batch_size = batch_size
+    backend.tag_batch(token_lists[:max(warmup, batch_size)])
+    tags, latencies = [], []
+    start = time.perf_counter()
+    for i in range(0, len(token_lists), batch_size):
+        t0 = time.perf_counter()
+        tags.extend(backend.tag_batch(token_lists[i:i + batch_size]))
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+    words = sum(1 for tokens in token_lists for token in tokens if not token.isspace())
+    return tags, {
+        "batch_size": batch_size,
+        "seconds": round(elapsed, 4),
+        "sentences_per_sec": round(len(token_lists) / elapsed, 1) if elapsed else 0.0,
+        "tokens_per_sec": round(words / elapsed, 1) if elapsed else 0.0,
+        "p95_batch_ms": round(percentile(latencies, 95) * 1000, 2),
+    }
+
+def bench_process(name, token_lists, batch_sizes, warmup):
+    """Last og mål én backend; kjøres i egen prosess så minnetoppen bare gjelder denne backenden."""
+    import altmorph
+    load_start = time.perf_counter()
+    backend = altmorph.load_pos_backend(name)
+    result = {"load_seconds": round(time.perf_counter() - load_start, 3), "runs": []}
+    all_tags = []
+    for batch_size in batch_sizes:
+        tags, run = bench_backend(backend, token_lists, batch_size, warmup)
+        run["peak_rss_mb"] = round(peak_rss_mb(), 1)
+        result["runs"].append(run)
+        all_tags.append(tags)
+    return result, all_tags
+
+def run_bench(args):
+    import altmorph
+    texts = load_texts(args.bench, args.field, args.limit)
+    token_lists = [altmorph.tokenize_preserve(altmorph.preprocess_punctuation(t)) for t in texts]
+    names = args.backends or sorted(altmorph.POS_BACKENDS)
+    if args.reference not in names:
+        names = [args.reference] + names
+    report = {"corpus": args.bench, "sentences": len(texts), "reference": args.reference, "backends": {}}
+    reference = None
+
+    print("Backend | Batch | Setn/s | Tokens/s | p95 ms | Minnetopp MB | Enighet")
+    print("---|---|---|---|---|---|---")
+    for name in names:
+        # Ny prosess per backend: ru_maxrss vokser bare, så en felles prosess ville arve forrige topp
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            try:
+                result, all_tags = pool.submit(bench_process, name, token_lists, args.batch_sizes,
+                                               args.warmup).result()
+            except ImportError as e:
+                print(f"{name} | - | - | - | - | - | hoppet over: {e}")
+                report["backends"][name] = {"skipped": str(e)}
+                continue
+        for run, tags in zip(result["runs"], all_tags):
+            if name == args.reference and reference is None:
+                reference = tags
+            if reference is not None:
+                run["agreement"] = round(tag_agreement(token_lists, reference, tags)["agreement"], 4)
+            agreement = f"{run['agreement']:.1%}" if "agreement" in run else "-"
+            print(f"{name} | {run['batch_size']} | {run['sentences_per_sec']} | {run['tokens_per_sec']} | "
+                  f"{run['p95_batch_ms']} | {run['peak_rss_mb']} | {agreement}")
+        report["backends"][name] = result
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    return report
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--text", default="Jenta kasta ballen til gutten. Hinduen syntes den kasta han var i var grei")
@@ -72,8 +248,28 @@ def main():
     ap.add_argument("--hf_agg", choices=["none", "simple"], default="none")
     ap.add_argument("--spacy_model", default="nb_core_news_lg")
     ap.add_argument("--flair_model", default="flair/upos-multi")
+    ap.add_argument("--agreement", metavar="CORPUS.jsonl",
+                    help="Sammenlign AltMorphs POS-backends med referansen på et JSONL-korpus")
+    ap.add_argument("--reference", default="bert", help="Referansebackend (default: bert)")
+    ap.add_argument("--backends", nargs="+",
+                    help="Backends som sammenlignes (default: alle andre; med --bench: alle)")
+    ap.add_argument("--field", default="text", help="Tekstfelt i JSONL (default: text)")
+    ap.add_argument("--limit", type=int, help="Maks antall linjer fra korpuset")
+    ap.add_argument("--bench", metavar="CORPUS.jsonl",
+                    help="Mål gjennomstrømning og latens for AltMorphs POS-backends på et JSONL-korpus")
+    ap.add_argument("--batch_sizes", type=int, nargs="+", default=[1, 8, 32],
+                    help="Batchstørrelser for --bench (default: 1 8 32)")
+    ap.add_argument("--warmup", type=int, default=8, help="Setninger til oppvarming per kjøring (default: 8)")
+    ap.add_argument("--report", help="Skriv rapporten (--agreement eller --bench) som JSON hit")
     args = ap.parse_args()
 
+    if args.agreement:
+        run_agreement(args)
+        return
+    if args.bench:
+        run_bench(args)
+        return
+
     rows = []
     if args.which in ("all", "hf"):
         m, res = run_hf(args.text, args.hf_model, args.hf_agg)
@@ -25,6 +25,9 @@ Requirements:
 Output:
     - JSONL file with original fields plus "alt" field containing alternatives
     - Progress information based on verbosity level
+
+Parquet and Arrow IPC files (.parquet, .arrow, .feather) are read and written
+column-wise instead (requires pyarrow); see process_arrow_file.
 """
 
 import argparse
@@ -33,8 +36,17 @@ import logging
 import os
 import sys
 import time
+from collections import deque
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # only needed for Parquet/Arrow files
+    pa = pq = None
+
+ARROW_SUFFIXES = {".parquet", ".arrow", ".feather"}
 
 # Import altmorph functions from parent directory
 try:
@@ -47,7 +59,12 @@ try:
         print(f"Error: altmorph.py not found at {altmorph_path}")
         sys.exit(1)
     
-    from altmorph import process_sentences_batch
+    from altmorph import (FILTER_POLICIES, METRICS, POS_BACKEND, POS_BACKENDS, LookupPrefetcher,
+                          SentenceCache, StageProfiler, TraceRecorder, configure_http_pool,
+                          get_lexicon, get_pos_backend, get_profiler, get_tracer,
+                          process_documents_batch, process_sentences_batch, profile_batch,
+                          score_sentences_batch, set_lexicon, set_pos_backend, set_profiler,
+                          set_tracer, start_metrics_server)
 except ImportError as e:
     print(f"Error importing altmorph: {e}")
     print(f"Python path: {sys.path[:3]}...")  # Show first few paths
@@ -69,22 +86,91 @@ def count_output_lines(output_file: str) -> int:
         return 0
 
 
+def splice_fields(line: str, data: Dict[str, Any], fields: Dict[str, Any]) -> str:
+    """Append output fields to a JSON object line without re-encoding its original fields.
+    
+    Falls back to re-encoding the whole object if it is empty or already has
+    one of the fields, which are then replaced.
+    """
+    if not data or any(name in data for name in fields):
+        data.update(fields)
+        return json.dumps(data, ensure_ascii=False)
+    return line[:-1].rstrip() + ", " + json.dumps(fields, ensure_ascii=False)[1:]
+
+
+def alternatives_fields(sentences: List[str], options: Dict[str, Any], logit_threshold: float,
+                        logit_thresholds: Optional[List[float]] = None,
+                        logit_diffs: bool = False,
+                        sentence_cache: Optional[SentenceCache] = None,
+                        document_mode: bool = False) -> List[Dict[str, Any]]:
+    """Output fields for a batch: "alt", plus "alt_<T>" per sweep threshold and "alt_logit_diffs".
+    
+    Sweep thresholds and logit differences reuse one lookup and scoring pass.
+    Logit differences are not cached, so ``sentence_cache`` is unused with them.
+    In document mode each text is split into sentences (no logit differences).
+    """
+    process = process_documents_batch if document_mode else process_sentences_batch
+    if not logit_thresholds and not logit_diffs:
+        alt_texts = process(sentences, logit_threshold=logit_threshold,
+                            sentence_cache=sentence_cache, **options)
+        return [{"alt": alt_text} for alt_text in alt_texts]
+    
+    if not logit_diffs:
+        thresholds = [logit_threshold] + list(logit_thresholds)
+        rendered = process(sentences, logit_thresholds=thresholds,
+                           sentence_cache=sentence_cache, **options)
+        results = []
+        for lines in rendered:
+            fields = {"alt": lines[logit_threshold]}
+            for threshold in logit_thresholds:
+                fields[f"alt_{threshold:g}"] = lines[threshold]
+            results.append(fields)
+        return results
+    
+    with profile_batch(len(sentences)):
+        scored = score_sentences_batch(sentences=sentences, **options)
+    
+    results = []
+    for sentence in scored:
+        fields = {"alt": sentence.render(logit_threshold, record_metrics=True)}
+        for threshold in logit_thresholds or []:
+            fields[f"alt_{threshold:g}"] = sentence.render(threshold)
+        if logit_diffs:
+            fields["alt_logit_diffs"] = sentence.logit_diffs()
+        results.append(fields)
+    return results
+
+
 def process_jsonl_file(input_file: str, output_file: str, lang: str, api_key: str,
                       timeout: float, max_workers: int, verbosity: int, 
                       logit_threshold: float, include_imperatives: bool = False,
                       include_determinatives: bool = False, 
                       include_gender_adj: bool = False, 
                       lemma_threshold: int = 1, include_number_ambiguous: bool = False,
-                      batch_size: int = 50) -> None:
+                      batch_size: int = 50, metrics_file: Optional[str] = None,
+                      policy: Optional[str] = None, logit_thresholds: Optional[List[float]] = None,
+                      logit_diffs: bool = False, sentence_cache: Optional[SentenceCache] = None,
+                      document_mode: bool = False, prefetch_batches: int = 1) -> None:
     """
     Process JSONL file by adding morphological alternatives to each text field.
     Uses batched BERT processing for improved performance.
     Supports automatic resume by skipping already processed lines.
+    If metrics_file is set, Prometheus metrics are rewritten after every batch.
+    With logit_thresholds, an "alt_<T>" field is added per threshold; with
+    logit_diffs, per-alternative logit differences are added as "alt_logit_diffs".
+    With sentence_cache, repeated lines are answered from the cache.
+    With document_mode, each text is split into sentences that are processed as
+    separate batch items and reassembled with the original whitespace.
+    Up to prefetch_batches batches are read ahead and their Ordbank lookups
+    run in the background while the current batch is scored (0 disables).
     """
     if not Path(input_file).exists():
         raise FileNotFoundError(f"Input file not found: {input_file}")
     
-    if not api_key.strip():
+    if document_mode and logit_diffs:
+        raise ValueError("logit_diffs is not supported in document mode")
+    
+    if not api_key.strip() and get_lexicon() is None:
         raise ValueError("API key required. Set ORDBANK_API_KEY environment variable or use --api_key")
     
     # Check for resume
@@ -94,13 +180,70 @@ def process_jsonl_file(input_file: str, output_file: str, lang: str, api_key: st
     if existing_lines > 0 and verbosity >= 1:
         print(f"📋 RESUMING: Found {existing_lines} existing lines, starting from line {existing_lines + 1}")
     
+    options = dict(
+        lang=lang,
+        api_key=api_key,
+        timeout=timeout,
+        max_workers=max_workers,
+        verbosity=max(0, verbosity - 2),
+        include_imperatives=include_imperatives,
+        include_determinatives=include_determinatives,
+        include_gender_adj=include_gender_adj,
+        lemma_threshold=lemma_threshold,
+        include_number_ambiguous=include_number_ambiguous,
+        policy=policy,
+    )
+    
     processed_count = 0
     error_count = 0
     total_processed = existing_lines
     start_time = time.time()
+    if prefetch_batches > 0:
+        configure_http_pool(2 * max_workers)
+    queued = deque()  # (sentences, line data, prefetch futures) read ahead of processing
     
     with open(input_file, 'r', encoding='utf-8') as infile, \
-         open(output_file, file_mode, encoding='utf-8') as outfile:
+         open(output_file, file_mode, encoding='utf-8') as outfile, \
+         LookupPrefetcher(lang, api_key, timeout, max_workers) as prefetcher:
+        
+        def process_batch(sentence_batch, line_data_batch, futures):
+            nonlocal processed_count, total_processed, error_count
+            try:
+                prefetcher.wait(futures)
+                if verbosity >= 2:
+                    print(f"Processing batch of {len(sentence_batch)} sentences (lines {line_data_batch[0][0]}-{line_data_batch[-1][0]})")
+                
+                alt_fields = alternatives_fields(sentence_batch, options, logit_threshold,
+                                                 logit_thresholds, logit_diffs, sentence_cache,
+                                                 document_mode)
+                
+                # Write results
+                for (batch_line_num, batch_data, batch_line), fields in zip(line_data_batch, alt_fields):
+                    outfile.write(splice_fields(batch_line, batch_data, fields) + '\n')
+                    processed_count += 1
+                    total_processed += 1
+                
+                # Progress reporting and flushing
+                outfile.flush()  # Ensure data is written to disk
+                if metrics_file:
+                    METRICS.write_prometheus(metrics_file)
+                elapsed = time.time() - start_time
+                lines_per_sec = processed_count / elapsed if elapsed > 0 else 0
+                if verbosity >= 1 and processed_count % 100 == 0:
+                    print(f"✅ Progress: {total_processed} lines processed ({processed_count} new) | "
+                          f"{lines_per_sec:.1f} lines/sec | {error_count} errors")
+                
+            except Exception as e:
+                error_count += len(sentence_batch)
+                if verbosity >= 1:
+                    print(f"Error processing batch ending at line {line_data_batch[-1][0]}: {e}")
+        
+        def queue_batch(sentence_batch, line_data_batch):
+            # Start lookups for the new batch, then process the oldest once enough are read ahead
+            futures = prefetcher.submit(sentence_batch) if prefetch_batches > 0 else []
+            queued.append((sentence_batch, line_data_batch, futures))
+            if len(queued) > prefetch_batches:
+                process_batch(*queued.popleft())
         
         sentence_batch = []
         line_data_batch = []
@@ -134,51 +277,11 @@ def process_jsonl_file(input_file: str, output_file: str, lang: str, api_key: st
                 
                 # Add to batch
                 sentence_batch.append(text)
-                line_data_batch.append((line_num, data))
+                line_data_batch.append((line_num, data, line))
                 
-                # Process batch when full
+                # Queue batch when full
                 if len(sentence_batch) >= batch_size:
-                    # Process batch with AltMorph
-                    try:
-                        if verbosity >= 2:
-                            print(f"Processing batch of {len(sentence_batch)} sentences (lines {line_data_batch[0][0]}-{line_data_batch[-1][0]})")
-                        
-                        alt_texts = process_sentences_batch(
-                            sentences=sentence_batch,
-                            lang=lang,
-                            api_key=api_key,
-                            timeout=timeout,
-                            max_workers=max_workers,
-                            verbosity=max(0, verbosity - 2),
-                            logit_threshold=logit_threshold,
-                            include_imperatives=include_imperatives,
-                            include_determinatives=include_determinatives,
-                            include_gender_adj=include_gender_adj,
-                            lemma_threshold=lemma_threshold,
-                            include_number_ambiguous=include_number_ambiguous
-                        )
-                        
-                        # Write results
-                        for (batch_line_num, batch_data), alt_text in zip(line_data_batch, alt_texts):
-                            batch_data["alt"] = alt_text
-                            outfile.write(json.dumps(batch_data, ensure_ascii=False) + '\n')
-                            processed_count += 1
-                            total_processed += 1
-                        
-                        # Progress reporting and flushing
-                        outfile.flush()  # Ensure data is written to disk
-                        elapsed = time.time() - start_time
-                        lines_per_sec = processed_count / elapsed if elapsed > 0 else 0
-                        if verbosity >= 1 and processed_count % 100 == 0:
-                            print(f"✅ Progress: {total_processed} lines processed ({processed_count} new) | "
-                                  f"{lines_per_sec:.1f} lines/sec | {error_count} errors")
-                        
-                    except Exception as e:
-                        error_count += len(sentence_batch)
-                        if verbosity >= 1:
-                            print(f"Error processing batch ending at line {line_num}: {e}")
-                    
-                    # Reset batch
+                    queue_batch(sentence_batch, line_data_batch)
                     sentence_batch = []
                     line_data_batch = []
                     
@@ -194,38 +297,11 @@ def process_jsonl_file(input_file: str, output_file: str, lang: str, api_key: st
                     print(f"Error processing line {line_num}: {e}")
                 continue
         
-        # Process remaining sentences in final batch
+        # Queue the final partial batch and process everything read ahead
         if sentence_batch:
-            try:
-                if verbosity >= 2:
-                    print(f"Processing final batch of {len(sentence_batch)} sentences")
-                
-                alt_texts = process_sentences_batch(
-                    sentences=sentence_batch,
-                    lang=lang,
-                    api_key=api_key,
-                    timeout=timeout,
-                    max_workers=max_workers,
-                    verbosity=max(0, verbosity - 2),
-                    logit_threshold=logit_threshold,
-                    include_imperatives=include_imperatives,
-                    include_determinatives=include_determinatives,
-                    include_gender_adj=include_gender_adj,
-                    lemma_threshold=lemma_threshold,
-                    include_number_ambiguous=include_number_ambiguous
-                )
-                
-                # Write results
-                for (batch_line_num, batch_data), alt_text in zip(line_data_batch, alt_texts):
-                    batch_data["alt"] = alt_text
-                    outfile.write(json.dumps(batch_data, ensure_ascii=False) + '\n')
-                    processed_count += 1
-                    total_processed += 1
-                
-            except Exception as e:
-                error_count += len(sentence_batch)
-                if verbosity >= 1:
-                    print(f"Error processing final batch: {e}")
+            queue_batch(sentence_batch, line_data_batch)
+        while queued:
+            process_batch(*queued.popleft())
         
         # Final flush (inside the with block)
         try:
@@ -233,6 +309,9 @@ def process_jsonl_file(input_file: str, output_file: str, lang: str, api_key: st
         except Exception:
             pass  # File might already be closed
     
+    if metrics_file:
+        METRICS.write_prometheus(metrics_file)
+    
     # Final summary
     elapsed = time.time() - start_time
     if verbosity >= 1:
@@ -243,30 +322,231 @@ def process_jsonl_file(input_file: str, output_file: str, lang: str, api_key: st
         print(f"   ⏱️  Processing time: {elapsed:.1f}s")
         if processed_count > 0:
             print(f"   🚀 Average speed: {processed_count / elapsed:.1f} lines/sec")
+        if sentence_cache is not None and sentence_cache.lookups:
+            stats = sentence_cache.stats()
+            print(f"   🔁 Duplicate lines: {stats['lookups'] - stats['misses']}/{stats['lookups']} "
+                  f"({stats['duplicate_rate']:.1%}) answered from the sentence cache")
+
+
+
+def is_arrow_file(path: str) -> bool:
+    """Whether ``path`` is a Parquet or Arrow IPC file, judged by its suffix."""
+    return Path(path).suffix.lower() in ARROW_SUFFIXES
+
 
+def iter_record_batches(path: str, batch_size: int, columns: Optional[List[str]] = None):
+    """Yield record batches of at most ``batch_size`` rows, reading only ``columns``."""
+    if Path(path).suffix.lower() == ".parquet":
+        yield from pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=columns)
+        return
+    with pa.memory_map(path) as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            table = pa.Table.from_batches([reader.get_batch(i)])
+            if columns:
+                table = table.select(columns)
+            yield from table.to_batches(max_chunksize=batch_size)
 
-def main() -> None:
-    """Main entry point with argument parsing."""
+
+def field_columns(alt_fields: List[Optional[Dict[str, Any]]], names: List[str]) -> List:
+    """Arrow string columns for output fields; logit differences are stored as JSON."""
+    columns = []
+    for name in names:
+        values = []
+        for fields in alt_fields:
+            value = fields.get(name) if fields else None
+            if value is not None and not isinstance(value, str):
+                value = json.dumps(value, ensure_ascii=False)
+            values.append(value)
+        columns.append(pa.array(values, type=pa.string()))
+    return columns
+
+
+def process_arrow_file(input_file: str, output_file: str, lang: str, api_key: str,
+                       timeout: float, max_workers: int, verbosity: int,
+                       logit_threshold: float, batch_size: int = 50,
+                       metrics_file: Optional[str] = None,
+                       logit_thresholds: Optional[List[float]] = None,
+                       logit_diffs: bool = False, sentence_cache: Optional[SentenceCache] = None,
+                       document_mode: bool = False, prefetch_batches: int = 1,
+                       columns: Optional[List[str]] = None, row_group_size: int = 10000,
+                       **options) -> None:
+    """
+    Process a Parquet or Arrow IPC file column-wise.
+    Only the "text" column is converted to Python strings; all other columns
+    are passed through as Arrow data, and "alt" (plus "alt_<T>" per sweep
+    threshold and "alt_logit_diffs" as JSON) is added as string columns.
+    With columns, only those columns are read and written ("text" is always
+    read). Rows with empty or invalid text, or in a failed batch, get null
+    fields, so the output keeps every input row in order. Output is written
+    in row groups of row_group_size rows, to a temporary file that replaces
+    output_file when done and is removed if processing fails; there is no
+    resume. options are the AltMorph
+    settings of process_jsonl_file.
+    """
+    if pa is None:
+        raise ImportError("Parquet and Arrow files need pyarrow: pip install pyarrow")
+    if not Path(input_file).exists():
+        raise FileNotFoundError(f"Input file not found: {input_file}")
+    if document_mode and logit_diffs:
+        raise ValueError("logit_diffs is not supported in document mode")
+    if not api_key.strip() and get_lexicon() is None:
+        raise ValueError("API key required. Set ORDBANK_API_KEY environment variable or use --api_key")
+    
+    read_columns = None
+    if columns:
+        read_columns = list(columns) + ([] if "text" in columns else ["text"])
+    names = ["alt"] + [f"alt_{threshold:g}" for threshold in logit_thresholds or []]
+    if logit_diffs:
+        names.append("alt_logit_diffs")
+    options = dict(options, lang=lang, api_key=api_key, timeout=timeout, max_workers=max_workers,
+                   verbosity=max(0, verbosity - 2))
+    
+    processed_count = 0
+    error_count = 0
+    row_count = 0
+    start_time = time.time()
+    if prefetch_batches > 0:
+        configure_http_pool(2 * max_workers)
+    queued = deque()  # (record batch, texts, prefetch futures) read ahead of processing
+    pending_tables = []
+    pending_rows = 0
+    writer = None
+    temp_file = f"{output_file}.tmp"
+    
+    def open_writer(schema):
+        if Path(output_file).suffix.lower() == ".parquet":
+            return pq.ParquetWriter(temp_file, schema)
+        return pa.ipc.new_file(temp_file, schema)
+    
+    def write_pending(final: bool = False):
+        # Write whole row groups; the remainder waits for more rows unless this is the end
+        nonlocal writer, pending_tables, pending_rows
+        table = pa.concat_tables(pending_tables)
+        size = table.num_rows if final else table.num_rows - table.num_rows % row_group_size
+        if writer is None:
+            writer = open_writer(table.schema)
+        if isinstance(writer, pq.ParquetWriter):
+            writer.write_table(table.slice(0, size), row_group_size=row_group_size)
+        else:
+            writer.write_table(table.slice(0, size), max_chunksize=row_group_size)
+        rest = table.slice(size)
+        pending_tables, pending_rows = ([rest] if rest.num_rows else []), rest.num_rows
+    
+    try:
+        with LookupPrefetcher(lang, api_key, timeout, max_workers) as prefetcher:
+        
+            def process_batch(batch, texts, futures):
+                nonlocal processed_count, error_count, row_count, pending_rows
+                rows = [i for i, text in enumerate(texts) if isinstance(text, str) and text.strip()]
+                alt_fields: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+                try:
+                    prefetcher.wait(futures)
+                    if verbosity >= 2:
+                        print(f"Processing batch of {len(rows)} texts (rows {row_count + 1}-{row_count + len(texts)})")
+                    if rows:
+                        for i, fields in zip(rows, alternatives_fields([texts[i] for i in rows], options,
+                                                                       logit_threshold, logit_thresholds,
+                                                                       logit_diffs, sentence_cache,
+                                                                       document_mode)):
+                            alt_fields[i] = fields
+                    processed_count += len(rows)
+                except Exception as e:
+                    error_count += len(rows)
+                    if verbosity >= 1:
+                        print(f"Error processing batch ending at row {row_count + len(texts)}: {e}")
+                row_count += len(texts)
+            
+                table = pa.Table.from_batches([batch])
+                if columns and "text" not in columns:
+                    table = table.select([name for name in table.column_names if name != "text"])
+                for name, column in zip(names, field_columns(alt_fields, names)):
+                    if name in table.column_names:
+                        table = table.set_column(table.column_names.index(name), name, column)
+                    else:
+                        table = table.append_column(name, column)
+                pending_tables.append(table)
+                pending_rows += table.num_rows
+                if pending_rows >= row_group_size:
+                    write_pending()
+            
+                if metrics_file:
+                    METRICS.write_prometheus(metrics_file)
+                elapsed = time.time() - start_time
+                if verbosity >= 1 and processed_count and processed_count % 100 == 0:
+                    print(f"✅ Progress: {row_count} rows | {processed_count / elapsed:.1f} texts/sec | "
+                          f"{error_count} errors")
+        
+            for batch in iter_record_batches(input_file, batch_size, read_columns):
+                texts = batch.column(batch.schema.get_field_index("text")).to_pylist()
+                futures = []
+                if prefetch_batches > 0:
+                    futures = prefetcher.submit([text for text in texts if isinstance(text, str)])
+                queued.append((batch, texts, futures))
+                if len(queued) > prefetch_batches:
+                    process_batch(*queued.popleft())
+            while queued:
+                process_batch(*queued.popleft())
+    
+        if pending_tables:
+            write_pending(final=True)
+        if writer is None:
+            raise ValueError(f"No rows found in {input_file}")
+        writer.close()
+        writer = None
+        os.replace(temp_file, output_file)
+    finally:
+        # A failed or interrupted run leaves neither an open writer nor a partial temporary file
+        if writer is not None:
+            writer.close()
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+    
+    if metrics_file:
+        METRICS.write_prometheus(metrics_file)
+    
+    elapsed = time.time() - start_time
+    if verbosity >= 1:
+        print(f"\n🎯 Processing complete!")
+        print(f"   📊 Texts processed: {processed_count} of {row_count} rows")
+        print(f"   ⚠️  Errors encountered: {error_count}")
+        print(f"   ⏱️  Processing time: {elapsed:.1f}s")
+        if processed_count > 0:
+            print(f"   🚀 Average speed: {processed_count / elapsed:.1f} texts/sec")
+        if sentence_cache is not None and sentence_cache.lookups:
+            stats = sentence_cache.stats()
+            print(f"   🔁 Duplicate lines: {stats['lookups'] - stats['misses']}/{stats['lookups']} "
+                  f"({stats['duplicate_rate']:.1%}) answered from the sentence cache")
+
+
+def main(argv: Optional[List[str]] = None, policy: str = "default", max_workers: int = 4,
+         batch_size: int = 100) -> None:
+    """Main entry point with argument parsing; ``policy``, ``max_workers`` and
+    ``batch_size`` are the defaults for --policy, --max_workers and --batch_size."""
     parser = argparse.ArgumentParser(
         description="Process JSONL files with AltMorph morphological alternatives (batched processing)"
     )
     
     parser.add_argument("--input_file", required=True,
-                       help="Input JSONL file with 'text' fields")
+                       help="Input JSONL file with 'text' fields (or .parquet/.arrow/.feather with a 'text' column)")
     parser.add_argument("--output_file", required=True, 
-                       help="Output JSONL file with added 'alt' fields")
+                       help="Output JSONL file with added 'alt' fields (.parquet/.arrow/.feather for columnar input)")
     parser.add_argument("--lang", default="nob", choices=["nob", "nno"],
                        help="Language code (default: nob)")
     parser.add_argument("--api_key", default=os.getenv("ORDBANK_API_KEY", ""),
                        help="Ordbank API key (or set ORDBANK_API_KEY)")
     parser.add_argument("--timeout", type=float, default=6.0,
                        help="HTTP timeout per request (default: 6.0)")
-    parser.add_argument("--max_workers", type=int, default=4,
-                       help="Parallel API requests (default: 4)")
+    parser.add_argument("--max_workers", type=int, default=max_workers,
+                       help=f"Parallel API requests (default: {max_workers})")
     parser.add_argument("--verbosity", type=int, default=1, choices=[0, 1, 2, 3],
                        help="Verbosity level: 0=quiet, 1=normal, 2=verbose, 3=very verbose (default: 1)")
     parser.add_argument("--logit_threshold", type=float, default=3.0,
                        help="BERT acceptability threshold (default: 3.0)")
+    parser.add_argument("--logit_thresholds", type=float, nargs="+",
+                       help="Threshold sweep: score once and add an 'alt_<T>' field for each threshold")
+    parser.add_argument("--logit_diffs", action="store_true",
+                       help="Add per-alternative logit differences ('alt_logit_diffs') for thresholding later")
     parser.add_argument("--lemma_threshold", type=int, default=1,
                        help="Maximum lemmas before filtering to avoid semantic confusion (default: 1)")
     parser.add_argument("--include_imperatives", action="store_true",
@@ -277,10 +557,40 @@ def main() -> None:
                        help="Include gender-dependent adjective alternatives (default: False)")
     parser.add_argument("--include_number_ambiguous", action="store_true",
                        help="Include alternatives for number-ambiguous nouns (default: False)")
-    parser.add_argument("--batch_size", type=int, default=100,
-                       help="Batch size for processing sentences (default: 50)")
+    parser.add_argument("--policy", default=policy, choices=sorted(FILTER_POLICIES),
+                       help=f"Filter policy; overrides lemma/number flags (default: {policy})")
+    parser.add_argument("--lexicon", default=os.getenv("ORDBANK_LEXICON", ""),
+                       help="Local lexicon built by tools/build_lexicon.py; replaces the Ordbank API")
+    parser.add_argument("--pos_backend", default=POS_BACKEND, choices=sorted(POS_BACKENDS),
+                       help=f"POS tagger: bert or spacy (default: {POS_BACKEND})")
+    parser.add_argument("--pos_processes", type=int, default=1,
+                       help="Processes for spaCy POS tagging (nlp.pipe n_process; default: 1)")
+    parser.add_argument("--profile", action="store_true",
+                       help="Time pipeline stages per batch and print a summary table at the end")
+    parser.add_argument("--profile_output",
+                       help="Write the stage profile as JSON to this file (implies --profile)")
+    parser.add_argument("--trace",
+                       help="Write Chrome Trace Event JSON of all batches to this file")
+    parser.add_argument("--metrics_file",
+                       help="Write Prometheus text metrics to this file after every batch")
+    parser.add_argument("--metrics_port", type=int,
+                       help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics while running")
+    parser.add_argument("--document_mode", action="store_true",
+                       help="Split each text into sentences and process them as separate batch items")
+    parser.add_argument("--sentence_cache_size", type=int, default=100000,
+                       help="Finished lines kept in memory for repeated sentences; 0 disables (default: 100000)")
+    parser.add_argument("--sentence_cache",
+                       help="SQLite file that keeps finished lines across runs (clear it after data or model changes)")
+    parser.add_argument("--prefetch_batches", type=int, default=1,
+                       help="Batches read ahead whose Ordbank lookups run during scoring; 0 disables (default: 1)")
+    parser.add_argument("--columns", nargs="+",
+                       help="Parquet/Arrow: columns to read and pass through (default: all)")
+    parser.add_argument("--row_group_size", type=int, default=10000,
+                       help="Parquet/Arrow: rows per written row group (default: 10000)")
+    parser.add_argument("--batch_size", type=int, default=batch_size,
+                       help=f"Batch size for processing sentences (default: {batch_size})")
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     # Configure logging
     log_levels = {
@@ -296,7 +606,30 @@ def main() -> None:
     )
     
     try:
-        process_jsonl_file(
+        if args.lexicon:
+            set_lexicon(args.lexicon)
+        if args.pos_backend == "spacy":
+            set_pos_backend("spacy", n_process=args.pos_processes)
+        else:
+            set_pos_backend(args.pos_backend)
+        get_pos_backend()  # load now, so a missing backend stops the run instead of every batch
+        if args.profile or args.profile_output:
+            set_profiler(StageProfiler())
+        if args.trace:
+            set_tracer(TraceRecorder())
+        if args.metrics_port:
+            start_metrics_server(args.metrics_port)
+        sentence_cache = None
+        if args.sentence_cache_size > 0 or args.sentence_cache:
+            sentence_cache = SentenceCache(args.sentence_cache_size, args.sentence_cache)
+        
+        arrow = is_arrow_file(args.input_file)
+        if arrow != is_arrow_file(args.output_file):
+            parser.error("input and output must both be JSONL or both be Parquet/Arrow files")
+        process = process_arrow_file if arrow else process_jsonl_file
+        extra = dict(columns=args.columns, row_group_size=args.row_group_size) if arrow else {}
+        
+        process(
             input_file=args.input_file,
             output_file=args.output_file,
             lang=args.lang,
@@ -310,12 +643,33 @@ def main() -> None:
             include_gender_adj=args.include_gender_adj,
             lemma_threshold=args.lemma_threshold,
             include_number_ambiguous=args.include_number_ambiguous,
-            batch_size=args.batch_size
+            batch_size=args.batch_size,
+            metrics_file=args.metrics_file,
+            policy=args.policy,
+            logit_thresholds=args.logit_thresholds,
+            logit_diffs=args.logit_diffs,
+            sentence_cache=sentence_cache,
+            document_mode=args.document_mode,
+            prefetch_batches=args.prefetch_batches,
+            **extra
         )
         
+        profiler = get_profiler()
+        if profiler is not None:
+            print(f"\n⏱️  Stage profile:\n{profiler.summary_table()}")
+            if args.profile_output:
+                profiler.write_report(args.profile_output)
+                print(f"   💾 Profile written to {args.profile_output}")
+        
+        tracer = get_tracer()
+        if tracer is not None:
+            tracer.write(args.trace)
+            print(f"   🧵 Trace written to {args.trace} (open in https://ui.perfetto.dev)")
+        
     except KeyboardInterrupt:
         print("\n⚠️ Processing interrupted by user")
-        print("💾 Progress has been saved. You can resume by running the same command.")
+        if not is_arrow_file(args.input_file):
+            print("💾 Progress has been saved. You can resume by running the same command.")
         sys.exit(1)
     except Exception as e:
         print(f"Error: {e}")